@@ -0,0 +1,46 @@
+"""add document count by cc pair
+
+Revision ID: 8928d8a5a9cd
+Revises: 3bd4c84fe72f
+Create Date: 2025-03-04 10:12:31.518223
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "8928d8a5a9cd"
+down_revision = "3bd4c84fe72f"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "document_count_by_connector_credential_pair",
+        sa.Column("connector_id", sa.Integer(), nullable=False),
+        sa.Column("credential_id", sa.Integer(), nullable=False),
+        sa.Column("document_count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["connector_id"], ["connector.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(
+            ["credential_id"], ["credential.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("connector_id", "credential_id"),
+    )
+
+    # seed the counts, from here on they're maintained incrementally
+    op.execute(
+        """
+        INSERT INTO document_count_by_connector_credential_pair
+            (connector_id, credential_id, document_count)
+        SELECT connector_id, credential_id, COUNT(*)
+        FROM document_by_connector_credential_pair
+        WHERE has_been_indexed = TRUE
+        GROUP BY connector_id, credential_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("document_count_by_connector_credential_pair")
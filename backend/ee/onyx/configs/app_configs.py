@@ -41,6 +41,24 @@ CONFLUENCE_PERMISSION_DOC_SYNC_FREQUENCY = int(
 )
 NUM_PERMISSION_WORKERS = int(os.environ.get("NUM_PERMISSION_WORKERS") or 2)
 
+#####
+# Post Query Censoring
+#####
+# In seconds, how long the set of sources whose search results are censored is cached
+# in-process. Creating a cc pair with permission syncing invalidates it right away.
+# 0 disables the cache
+CENSORING_ENABLED_SOURCES_CACHE_TTL = float(
+    os.environ.get("CENSORING_ENABLED_SOURCES_CACHE_TTL") or 5 * 60
+)
+# In seconds, how long whether a user can read a Salesforce object is cached in-process.
+# Access revoked in Salesforce takes up to this long to apply. 0 disables the cache
+SALESFORCE_OBJECT_ACCESS_CACHE_TTL = float(
+    os.environ.get("SALESFORCE_OBJECT_ACCESS_CACHE_TTL") or 60
+)
+SALESFORCE_OBJECT_ACCESS_CACHE_MAX_SIZE = int(
+    os.environ.get("SALESFORCE_OBJECT_ACCESS_CACHE_MAX_SIZE") or 100_000
+)
+
 
 STRIPE_SECRET_KEY = os.environ.get("STRIPE_SECRET_KEY")
 STRIPE_PRICE_ID = os.environ.get("STRIPE_PRICE")
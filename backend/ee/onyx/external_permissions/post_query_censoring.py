@@ -1,5 +1,8 @@
+import threading
+import time
 from collections.abc import Callable
 
+from ee.onyx.configs.app_configs import CENSORING_ENABLED_SOURCES_CACHE_TTL
 from ee.onyx.db.connector_credential_pair import get_all_auto_sync_cc_pairs
 from ee.onyx.external_permissions.salesforce.postprocessing import (
     censor_salesforce_chunks,
@@ -8,10 +11,18 @@ from onyx.configs.constants import DocumentSource
 from onyx.context.search.pipeline import InferenceChunk
 from onyx.db.engine import get_session_context_manager
 from onyx.db.models import User
+from onyx.redis.redis_pool import get_redis_client
+from onyx.redis.redis_version_stamp import bump_version_stamp
+from onyx.redis.redis_version_stamp import get_version_stamp
 from onyx.utils.logger import setup_logger
+from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
+from shared_configs.contextvars import get_current_tenant_id
 
 logger = setup_logger()
 
+# Tenant prefixed by the Redis client
+_CENSORING_ENABLED_SOURCES_VERSION_KEY = "censoring_enabled_sources_version"
+
 DOC_SOURCE_TO_CHUNK_CENSORING_FUNCTION: dict[
     DocumentSource,
     # list of chunks to be censored and the user email. returns censored chunks
@@ -21,6 +32,34 @@ DOC_SOURCE_TO_CHUNK_CENSORING_FUNCTION: dict[
 }
 
 
+_censoring_enabled_sources_lock = threading.Lock()
+# tenant_id -> (version, expires_at, sources)
+_CENSORING_ENABLED_SOURCES_CACHE: dict[
+    str, tuple[str, float, frozenset[DocumentSource]]
+] = {}
+
+
+def _fetch_censoring_enabled_sources() -> set[DocumentSource]:
+    with get_session_context_manager() as db_session:
+        enabled_sync_connectors = get_all_auto_sync_cc_pairs(db_session)
+        return {
+            cc_pair.connector.source
+            for cc_pair in enabled_sync_connectors
+            if cc_pair.connector.source in DOC_SOURCE_TO_CHUNK_CENSORING_FUNCTION
+        }
+
+
+def _get_censoring_enabled_sources_version(tenant_id: str) -> str | None:
+    try:
+        return get_version_stamp(
+            get_redis_client(tenant_id=tenant_id),
+            _CENSORING_ENABLED_SOURCES_VERSION_KEY,
+        )
+    except Exception:
+        logger.exception("Failed to read the censoring enabled sources version")
+        return None
+
+
 def _get_all_censoring_enabled_sources() -> set[DocumentSource]:
     """
     Returns the set of sources that have censoring enabled.
@@ -31,14 +70,71 @@ def _get_all_censoring_enabled_sources() -> set[DocumentSource]:
     all chunks for that source will be censored, even if the connector that
     indexed that chunk is not sync. This was done to avoid getting the cc_pair
     for every single chunk.
+
+    The set is cached in-process for CENSORING_ENABLED_SOURCES_CACHE_TTL seconds and
+    dropped as soon as a sync cc_pair is added (see
+    invalidate_censoring_enabled_sources). A source whose last sync cc_pair is
+    removed may keep being censored until the entry expires, which only hides
+    results. If Redis is unavailable, nothing is cached.
     """
-    with get_session_context_manager() as db_session:
-        enabled_sync_connectors = get_all_auto_sync_cc_pairs(db_session)
-        return {
-            cc_pair.connector.source
-            for cc_pair in enabled_sync_connectors
-            if cc_pair.connector.source in DOC_SOURCE_TO_CHUNK_CENSORING_FUNCTION
-        }
+    if CENSORING_ENABLED_SOURCES_CACHE_TTL <= 0:
+        return _fetch_censoring_enabled_sources()
+
+    tenant_id = get_current_tenant_id()
+    version = _get_censoring_enabled_sources_version(tenant_id)
+    if version is None:
+        return _fetch_censoring_enabled_sources()
+
+    with _censoring_enabled_sources_lock:
+        entry = _CENSORING_ENABLED_SOURCES_CACHE.get(tenant_id)
+    if entry is not None:
+        entry_version, expires_at, sources = entry
+        if entry_version == version and expires_at > time.monotonic():
+            return set(sources)
+
+    # the version was read before the lookup, so a change made meanwhile is not
+    # hidden behind it
+    fetched_sources = _fetch_censoring_enabled_sources()
+    with _censoring_enabled_sources_lock:
+        _CENSORING_ENABLED_SOURCES_CACHE[tenant_id] = (
+            version,
+            time.monotonic() + CENSORING_ENABLED_SOURCES_CACHE_TTL,
+            frozenset(fetched_sources),
+        )
+    return fetched_sources
+
+
+def invalidate_censoring_enabled_sources() -> None:
+    """To be called after committing a new cc_pair with permission syncing. Done even
+    if the cache is disabled in this process since other processes may have it
+    enabled."""
+    tenant_id = get_current_tenant_id()
+    with _censoring_enabled_sources_lock:
+        _CENSORING_ENABLED_SOURCES_CACHE.pop(tenant_id, None)
+
+    try:
+        bump_version_stamp(
+            get_redis_client(tenant_id=tenant_id),
+            _CENSORING_ENABLED_SOURCES_VERSION_KEY,
+        )
+    except Exception:
+        logger.exception("Failed to bump the censoring enabled sources version")
+
+
+def _censor_chunks_for_source(
+    source: DocumentSource,
+    chunks_for_source: list[InferenceChunk],
+    user_email: str,
+) -> list[InferenceChunk]:
+    censor_chunks_for_source = DOC_SOURCE_TO_CHUNK_CENSORING_FUNCTION[source]
+    try:
+        return censor_chunks_for_source(chunks_for_source, user_email)
+    except Exception as e:
+        logger.exception(
+            f"Failed to censor chunks for source {source} so throwing out all"
+            f" chunks for this source and continuing: {e}"
+        )
+        return []
 
 
 # NOTE: This is only called if ee is enabled.
@@ -67,18 +163,16 @@ def _post_query_chunk_censoring(
             chunks_to_keep.append(chunk)
 
     # For each source, filter out the chunks using the permission
-    # check function for that source
-    # TODO: Use a threadpool/multiprocessing to process the sources in parallel
-    for source, chunks_for_source in chunks_to_process.items():
-        censor_chunks_for_source = DOC_SOURCE_TO_CHUNK_CENSORING_FUNCTION[source]
-        try:
-            censored_chunks = censor_chunks_for_source(chunks_for_source, user.email)
-        except Exception as e:
-            logger.exception(
-                f"Failed to censor chunks for source {source} so throwing out all"
-                f" chunks for this source and continuing: {e}"
-            )
-            continue
+    # check function for that source, the sources are checked in parallel
+    censored_chunks_per_source: list[
+        list[InferenceChunk]
+    ] = run_functions_tuples_in_parallel(
+        [
+            (_censor_chunks_for_source, (source, chunks_for_source, user.email))
+            for source, chunks_for_source in chunks_to_process.items()
+        ]
+    )
+    for censored_chunks in censored_chunks_per_source:
         chunks_to_keep.extend(censored_chunks)
 
     return chunks_to_keep
@@ -60,8 +60,8 @@ def _get_objects_access_for_user_email_from_salesforce(
     if user_id is None:
         return None
 
-    # This is the only query that is not cached in the function
-    # so it takes 0.1-0.2 seconds total
+    # Cached for a short time in the function, the uncached objects take 0.1-0.2
+    # seconds total since they are queried in parallel batches
     object_id_to_access = get_objects_access_for_user_id(
         salesforce_client, user_id, list(object_ids)
     )
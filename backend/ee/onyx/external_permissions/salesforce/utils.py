@@ -1,6 +1,12 @@
+import threading
+import time
+from collections import OrderedDict
+
 from simple_salesforce import Salesforce
 from sqlalchemy.orm import Session
 
+from ee.onyx.configs.app_configs import SALESFORCE_OBJECT_ACCESS_CACHE_MAX_SIZE
+from ee.onyx.configs.app_configs import SALESFORCE_OBJECT_ACCESS_CACHE_TTL
 from onyx.connectors.salesforce.sqlite_functions import get_user_id_by_email
 from onyx.connectors.salesforce.sqlite_functions import init_db
 from onyx.connectors.salesforce.sqlite_functions import NULL_ID_STRING
@@ -8,6 +14,8 @@ from onyx.connectors.salesforce.sqlite_functions import update_email_to_id_table
 from onyx.db.connector_credential_pair import get_connector_credential_pair_from_id
 from onyx.db.document import get_cc_pairs_for_document
 from onyx.utils.logger import setup_logger
+from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
+from shared_configs.contextvars import get_current_tenant_id
 
 logger = setup_logger()
 
@@ -113,22 +121,58 @@ def get_salesforce_user_id_from_email(
 
 _MAX_RECORD_IDS_PER_QUERY = 200
 
+_object_access_cache_lock = threading.Lock()
+# (tenant_id, salesforce user id, record id) -> (expires_at, has read access)
+_OBJECT_ACCESS_CACHE: OrderedDict[
+    tuple[str, str, str], tuple[float, bool]
+] = OrderedDict()
 
-def get_objects_access_for_user_id(
+
+def _get_cached_objects_access(
+    tenant_id: str, user_id: str, record_ids: list[str]
+) -> dict[str, bool]:
+    if SALESFORCE_OBJECT_ACCESS_CACHE_TTL <= 0:
+        return {}
+
+    now = time.monotonic()
+    cached_access: dict[str, bool] = {}
+    with _object_access_cache_lock:
+        for record_id in record_ids:
+            key = (tenant_id, user_id, record_id)
+            entry = _OBJECT_ACCESS_CACHE.get(key)
+            if entry is None:
+                continue
+            expires_at, has_access = entry
+            if expires_at <= now:
+                del _OBJECT_ACCESS_CACHE[key]
+                continue
+            _OBJECT_ACCESS_CACHE.move_to_end(key)
+            cached_access[record_id] = has_access
+    return cached_access
+
+
+def _cache_objects_access(
+    tenant_id: str, user_id: str, object_access: dict[str, bool]
+) -> None:
+    if SALESFORCE_OBJECT_ACCESS_CACHE_TTL <= 0:
+        return
+
+    expires_at = time.monotonic() + SALESFORCE_OBJECT_ACCESS_CACHE_TTL
+    with _object_access_cache_lock:
+        for record_id, has_access in object_access.items():
+            key = (tenant_id, user_id, record_id)
+            _OBJECT_ACCESS_CACHE[key] = (expires_at, has_access)
+            _OBJECT_ACCESS_CACHE.move_to_end(key)
+        while len(_OBJECT_ACCESS_CACHE) > SALESFORCE_OBJECT_ACCESS_CACHE_MAX_SIZE:
+            _OBJECT_ACCESS_CACHE.popitem(last=False)
+
+
+def _query_objects_access_for_user_id(
     salesforce_client: Salesforce,
     user_id: str,
     record_ids: list[str],
 ) -> dict[str, bool]:
-    """
-    Salesforce has a limit of 200 record ids per query. So we just truncate
-    the list of record ids to 200. We only ever retrieve 50 chunks at a time
-    so this should be fine (unlikely that we retrieve all 50 chunks contain
-    4 unique objects).
-    If we decide this isn't acceptable we can use multiple queries but they
-    should be in parallel so query time doesn't get too long.
-    """
-    truncated_record_ids = record_ids[:_MAX_RECORD_IDS_PER_QUERY]
-    record_ids_str = "'" + "','".join(truncated_record_ids) + "'"
+    record_ids_str = "'" + "','".join(record_ids) + "'"
     access_query = f"""
     SELECT RecordId, HasReadAccess
     FROM UserRecordAccess
@@ -136,7 +180,55 @@ def get_objects_access_for_user_id(
     AND UserId = '{user_id}'
     """
     result = salesforce_client.query_all(access_query)
-    return {record["RecordId"]: record["HasReadAccess"] for record in result["records"]}
+    object_access = {
+        record["RecordId"]: record["HasReadAccess"] for record in result["records"]
+    }
+    # records that aren't returned can't be read by the user
+    return {record_id: object_access.get(record_id, False) for record_id in record_ids}
+
+
+def get_objects_access_for_user_id(
+    salesforce_client: Salesforce,
+    user_id: str,
+    record_ids: list[str],
+) -> dict[str, bool]:
+    """
+    Whether the user can read each of the records. Access is cached in-process for
+    SALESFORCE_OBJECT_ACCESS_CACHE_TTL seconds since the same objects tend to come
+    up again in the user's next searches, so a revoked access may apply that much later.
+
+    Salesforce has a limit of 200 record ids per query, the records that aren't cached
+    are split into batches of 200 that are queried in parallel so query time doesn't
+    grow with the number of objects. If any query fails, the error is raised.
+    """
+    tenant_id = get_current_tenant_id()
+    unique_record_ids = list(dict.fromkeys(record_ids))
+
+    object_access = _get_cached_objects_access(tenant_id, user_id, unique_record_ids)
+    uncached_record_ids = [
+        record_id for record_id in unique_record_ids if record_id not in object_access
+    ]
+    if not uncached_record_ids:
+        return object_access
+
+    batches = [
+        uncached_record_ids[i : i + _MAX_RECORD_IDS_PER_QUERY]
+        for i in range(0, len(uncached_record_ids), _MAX_RECORD_IDS_PER_QUERY)
+    ]
+    batch_results: list[dict[str, bool]] = run_functions_tuples_in_parallel(
+        [
+            (_query_objects_access_for_user_id, (salesforce_client, user_id, batch))
+            for batch in batches
+        ]
+    )
+
+    queried_access: dict[str, bool] = {}
+    for batch_result in batch_results:
+        queried_access.update(batch_result)
+    _cache_objects_access(tenant_id, user_id, queried_access)
+
+    object_access.update(queried_access)
+    return object_access
 
 
 _CC_PAIR_ID_SALESFORCE_CLIENT_MAP: dict[int, Salesforce] = {}
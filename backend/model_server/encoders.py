@@ -28,10 +28,12 @@ from model_server.constants import DEFAULT_VERTEX_MODEL
 from model_server.constants import DEFAULT_VOYAGE_MODEL
 from model_server.constants import EmbeddingModelTextType
 from model_server.constants import EmbeddingProvider
+from model_server.micro_batching import get_micro_batcher
 from model_server.utils import simple_log_function_time
 from onyx.utils.logger import setup_logger
 from shared_configs.configs import API_BASED_EMBEDDING_TIMEOUT
 from shared_configs.configs import INDEXING_ONLY
+from shared_configs.configs import MODEL_SERVER_MICRO_BATCHING_ENABLED
 from shared_configs.configs import OPENAI_EMBEDDING_TIMEOUT
 from shared_configs.enums import EmbedTextType
 from shared_configs.enums import RerankerProvider
@@ -396,17 +398,30 @@ async def embed_text(
         local_model = get_embedding_model(
             model_name=model_name, max_context_length=max_context_length
         )
-        # Run CPU-bound embedding in a thread pool
-        embeddings_vectors = await asyncio.get_event_loop().run_in_executor(
-            None,
-            lambda: local_model.encode(
-                prefixed_texts, normalize_embeddings=normalize_embeddings
-            ),
-        )
-        embeddings = [
-            embedding if isinstance(embedding, list) else embedding.tolist()
-            for embedding in embeddings_vectors
-        ]
+        if MODEL_SERVER_MICRO_BATCHING_ENABLED:
+
+            def _encode_batch(batch_texts: list[str]) -> list[Embedding]:
+                return local_model.encode(
+                    batch_texts, normalize_embeddings=normalize_embeddings
+                ).tolist()
+
+            # Merged with concurrent requests for the same model into one forward pass
+            embeddings = await get_micro_batcher(
+                ("bi-encoder", model_name, max_context_length, normalize_embeddings),
+                _encode_batch,
+            ).submit(prefixed_texts)
+        else:
+            # Run CPU-bound embedding in a thread pool
+            embeddings_vectors = await asyncio.get_event_loop().run_in_executor(
+                None,
+                lambda: local_model.encode(
+                    prefixed_texts, normalize_embeddings=normalize_embeddings
+                ),
+            )
+            embeddings = [
+                embedding if isinstance(embedding, list) else embedding.tolist()
+                for embedding in embeddings_vectors
+            ]
 
         elapsed = time.monotonic() - start
         logger.info(
@@ -433,6 +448,16 @@ async def embed_text(
 @simple_log_function_time()
 async def local_rerank(query: str, docs: list[str], model_name: str) -> list[float]:
     cross_encoder = get_local_reranking_model(model_name)
+    if MODEL_SERVER_MICRO_BATCHING_ENABLED:
+
+        def _predict_batch(pairs: list[tuple[str, str]]) -> list[float]:
+            return cross_encoder.predict(pairs).tolist()  # type: ignore
+
+        # Merged with concurrent rerank requests into one forward pass
+        return await get_micro_batcher(
+            ("cross-encoder", model_name), _predict_batch
+        ).submit([(query, doc) for doc in docs])
+
     # Run CPU-bound reranking in a thread pool
     return await asyncio.get_event_loop().run_in_executor(
         None,
@@ -0,0 +1,142 @@
+import asyncio
+from collections.abc import Callable
+from collections.abc import Hashable
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+from typing import Generic
+from typing import TypeVar
+
+from onyx.utils.logger import setup_logger
+from shared_configs.configs import MODEL_SERVER_BATCH_WINDOW_MS
+from shared_configs.configs import MODEL_SERVER_MAX_BATCH_SIZE
+
+logger = setup_logger()
+
+ItemT = TypeVar("ItemT")
+ResultT = TypeVar("ResultT")
+
+
+@dataclass
+class _PendingRequest(Generic[ItemT, ResultT]):
+    items: list[ItemT]
+    future: "asyncio.Future[list[ResultT]]"
+
+
+class MicroBatcher(Generic[ItemT, ResultT]):
+    """Coalesces concurrent requests against the same local model into a single forward
+    pass. Each request's items are concatenated into one batch, `process_batch` is run once
+    in the default executor and every caller gets back the slice matching its own items.
+
+    Only one batch runs at a time per batcher, requests that arrive while it runs are
+    queued up and go out together in the next batch. An idle batcher waits up to
+    `batch_window` seconds for other requests to join before running."""
+
+    def __init__(
+        self,
+        name: str,
+        process_batch: Callable[[list[ItemT]], Sequence[ResultT]],
+        max_batch_size: int = MODEL_SERVER_MAX_BATCH_SIZE,
+        batch_window: float = MODEL_SERVER_BATCH_WINDOW_MS / 1000,
+    ) -> None:
+        self.name = name
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.batch_window = batch_window
+
+        self._pending: list[_PendingRequest[ItemT, ResultT]] = []
+        self._worker: asyncio.Task[None] | None = None
+
+    async def submit(self, items: list[ItemT]) -> list[ResultT]:
+        if not items:
+            return []
+
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[list[ResultT]] = loop.create_future()
+        self._pending.append(_PendingRequest(items=items, future=future))
+
+        if self._worker is None or self._worker.done():
+            self._worker = loop.create_task(self._run())
+
+        return await future
+
+    def _take_batch(self) -> list[_PendingRequest[ItemT, ResultT]]:
+        # always take at least one request, even if it alone exceeds the max batch size
+        batch = [self._pending.pop(0)]
+        num_items = len(batch[0].items)
+        while self._pending and (
+            num_items + len(self._pending[0].items) <= self.max_batch_size
+        ):
+            request = self._pending.pop(0)
+            batch.append(request)
+            num_items += len(request.items)
+        return batch
+
+    async def _process(self, batch: list[_PendingRequest[ItemT, ResultT]]) -> None:
+        # requests whose caller went away don't need to be computed
+        batch = [request for request in batch if not request.future.done()]
+        if not batch:
+            return
+
+        items = [item for request in batch for item in request.items]
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                None, self.process_batch, items
+            )
+        except Exception as e:
+            if len(batch) > 1:
+                # isolate the failing request(s) instead of failing everyone in the batch
+                logger.warning(
+                    f"Batch of {len(batch)} requests failed for {self.name}, "
+                    "retrying the requests individually"
+                )
+                for request in batch:
+                    await self._process([request])
+                return
+
+            if not batch[0].future.done():
+                batch[0].future.set_exception(e)
+            return
+
+        if len(results) != len(items):
+            error = RuntimeError(
+                f"Expected {len(items)} results from {self.name}, got {len(results)}"
+            )
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(error)
+            return
+
+        offset = 0
+        for request in batch:
+            num_items = len(request.items)
+            if not request.future.done():
+                request.future.set_result(list(results[offset : offset + num_items]))
+            offset += num_items
+
+        if len(batch) > 1:
+            logger.debug(
+                f"Coalesced {len(batch)} requests with {len(items)} items for {self.name}"
+            )
+
+    async def _run(self) -> None:
+        num_pending_items = sum(len(request.items) for request in self._pending)
+        if self.batch_window > 0 and num_pending_items < self.max_batch_size:
+            await asyncio.sleep(self.batch_window)
+
+        while self._pending:
+            await self._process(self._take_batch())
+
+
+_BATCHERS: dict[Hashable, MicroBatcher[Any, Any]] = {}
+
+
+def get_micro_batcher(
+    key: Hashable,
+    process_batch: Callable[[list[ItemT]], Sequence[ResultT]],
+) -> MicroBatcher[ItemT, ResultT]:
+    """Batchers are shared by everything with the same key, the key must capture anything
+    that `process_batch` depends on other than the items themselves."""
+    if key not in _BATCHERS:
+        _BATCHERS[key] = MicroBatcher(name=str(key), process_batch=process_batch)
+    return _BATCHERS[key]
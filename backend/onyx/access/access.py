@@ -1,12 +1,16 @@
+from typing import cast
+
 from sqlalchemy.orm import Session
 
 from onyx.access.models import DocumentAccess
+from onyx.access.user_acl_cache import get_user_acl_cache
 from onyx.access.utils import prefix_user_email
 from onyx.configs.constants import PUBLIC_DOC_PAT
 from onyx.db.document import get_access_info_for_document
 from onyx.db.document import get_access_info_for_documents
 from onyx.db.models import User
 from onyx.utils.variable_functionality import fetch_versioned_implementation
+from shared_configs.contextvars import get_current_tenant_id
 
 
 def _get_access_for_document(
@@ -105,4 +109,20 @@ def get_acl_for_user(user: User | None, db_session: Session | None = None) -> se
     versioned_acl_for_user_fn = fetch_versioned_implementation(
         "onyx.access.access", "_get_acl_for_user"
     )
-    return versioned_acl_for_user_fn(user, db_session)  # type: ignore
+
+    user_acl_cache = get_user_acl_cache()
+    if user is None or not user_acl_cache.enabled:
+        return versioned_acl_for_user_fn(user, db_session)  # type: ignore
+
+    tenant_id = get_current_tenant_id()
+    # must be read before the ACL is built, see UserAclCache
+    acl_version = user_acl_cache.get_version(tenant_id)
+    if acl_version is not None:
+        cached_acl = user_acl_cache.get(tenant_id, user.id, acl_version)
+        if cached_acl is not None:
+            return cached_acl
+
+    user_acl = cast(set[str], versioned_acl_for_user_fn(user, db_session))
+    if acl_version is not None:
+        user_acl_cache.set(tenant_id, user.id, acl_version, user_acl)
+    return user_acl
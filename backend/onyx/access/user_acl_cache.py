@@ -0,0 +1,130 @@
+import threading
+import time
+from collections import OrderedDict
+from uuid import UUID
+
+from prometheus_client import Counter
+
+from onyx.configs.app_configs import USER_ACL_CACHE_MAX_SIZE
+from onyx.configs.app_configs import USER_ACL_CACHE_TTL
+from onyx.redis.redis_pool import get_redis_client
+from onyx.redis.redis_version_stamp import bump_version_stamp
+from onyx.redis.redis_version_stamp import get_version_stamp
+from onyx.utils.logger import setup_logger
+from shared_configs.contextvars import get_current_tenant_id
+
+logger = setup_logger()
+
+# Tenant prefixed by the Redis client
+_USER_ACL_VERSION_KEY = "user_acl_version"
+
+USER_ACL_CACHE_LOOKUPS = Counter(
+    "onyx_user_acl_cache_lookups",
+    "User ACL lookups by whether the in-process cache served them",
+    ["result"],
+)
+
+
+class UserAclCache:
+    """Per process LRU cache of user ACLs with a TTL.
+
+    Entries are stamped with the tenant's ACL version, a version stamp in Redis that is
+    replaced after every change that can affect a user's ACL (user group membership,
+    external group syncs, user roles). Lookups read the current version and only use
+    entries with the same stamp, so invalidations apply to all processes right away.
+    Callers read the version before building an ACL, an ACL built while a change came
+    in is then stamped with the old version and is never served. If the version can't
+    be read from Redis, nothing is cached."""
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        # (tenant_id, user_id) -> (acl version, expires_at, acl)
+        self._entries: OrderedDict[
+            tuple[str, UUID], tuple[str, float, frozenset[str]]
+        ] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl > 0
+
+    def get_version(self, tenant_id: str) -> str | None:
+        try:
+            return get_version_stamp(
+                get_redis_client(tenant_id=tenant_id), _USER_ACL_VERSION_KEY
+            )
+        except Exception:
+            logger.exception("Failed to read the user ACL version from Redis")
+            return None
+
+    def get(self, tenant_id: str, user_id: UUID, version: str) -> set[str] | None:
+        if not self.enabled:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get((tenant_id, user_id))
+            if entry is not None:
+                entry_version, expires_at, acl = entry
+                if entry_version == version and expires_at > now:
+                    self._entries.move_to_end((tenant_id, user_id))
+                    self.hits += 1
+                    USER_ACL_CACHE_LOOKUPS.labels(result="hit").inc()
+                    return set(acl)
+                del self._entries[(tenant_id, user_id)]
+            self.misses += 1
+
+        USER_ACL_CACHE_LOOKUPS.labels(result="miss").inc()
+        return None
+
+    def set(self, tenant_id: str, user_id: UUID, version: str, acl: set[str]) -> None:
+        """`version` must be read before the ACL was built"""
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._entries[(tenant_id, user_id)] = (
+                version,
+                time.monotonic() + self.ttl,
+                frozenset(acl),
+            )
+            self._entries.move_to_end((tenant_id, user_id))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, tenant_id: str) -> None:
+        """Must be called after the change is committed. Done even if the cache is
+        disabled in this process (e.g. a background worker), since other processes
+        may have it enabled."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == tenant_id]:
+                del self._entries[key]
+
+        try:
+            bump_version_stamp(
+                get_redis_client(tenant_id=tenant_id), _USER_ACL_VERSION_KEY
+            )
+        except Exception:
+            logger.exception("Failed to bump the user ACL version in Redis")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_user_acl_cache = UserAclCache(max_size=USER_ACL_CACHE_MAX_SIZE, ttl=USER_ACL_CACHE_TTL)
+
+
+def get_user_acl_cache() -> UserAclCache:
+    return _user_acl_cache
+
+
+def invalidate_user_acls() -> None:
+    """To be called after committing a change to user group memberships, external
+    groups or user roles"""
+    _user_acl_cache.invalidate(get_current_tenant_id())
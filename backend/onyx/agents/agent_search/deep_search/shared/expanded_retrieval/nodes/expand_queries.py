@@ -37,8 +37,12 @@ from onyx.configs.agent_configs import (
     AGENT_TIMEOUT_CONNECT_LLM_QUERY_REWRITING_GENERATION,
 )
 from onyx.configs.agent_configs import AGENT_TIMEOUT_LLM_QUERY_REWRITING_GENERATION
+from onyx.db.engine import get_session_context_manager
 from onyx.llm.chat_llm import LLMRateLimitError
 from onyx.llm.chat_llm import LLMTimeoutError
+from onyx.natural_language_processing.query_embedding_cache import (
+    get_query_embedding_cache,
+)
 from onyx.prompts.agent_search import (
     QUERY_REWRITING_PROMPT,
 )
@@ -124,6 +128,21 @@ def expand_queries(
         log_result = agent_error.error_result
     # use subquestion as query if query generation fails
 
+    if rewritten_queries and get_query_embedding_cache().enabled:
+        # all of these queries are retrieved in parallel next, embed them in one go
+        # so that each retrieval finds its query embedding cached. Without the cache
+        # nothing would reuse them
+        queries_to_retrieve = [
+            query
+            for query in rewritten_queries
+            + [question or graph_config.inputs.search_request.query]
+            if query.strip()
+        ]
+        with get_session_context_manager() as db_session:
+            graph_config.tooling.retrieval_context.embed_queries(
+                queries_to_retrieve, db_session
+            )
+
     return QueryExpansionUpdate(
         expanded_queries=rewritten_queries,
         log_messages=[
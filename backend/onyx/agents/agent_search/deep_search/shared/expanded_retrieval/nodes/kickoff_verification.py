@@ -10,6 +10,7 @@ from onyx.agents.agent_search.deep_search.shared.expanded_retrieval.states impor
 from onyx.agents.agent_search.deep_search.shared.expanded_retrieval.states import (
     ExpandedRetrievalState,
 )
+from onyx.configs.agent_configs import AGENT_DOCUMENT_VERIFICATION_BATCH_SIZE
 
 
 def kickoff_verification(
@@ -17,7 +18,8 @@ def kickoff_verification(
     config: RunnableConfig,
 ) -> Command[Literal["verify_documents"]]:
     """
-    LangGraph node (Command node!) that kicks off the verification process for the retrieved documents.
+    LangGraph node (Command node!) that kicks off the verification process for the retrieved documents,
+    in batches of AGENT_DOCUMENT_VERIFICATION_BATCH_SIZE documents.
     Note that this is a Command node and does the routing as well. (At present, no state updates
     are done here, so this could be replaced with an edge. But we may choose to make state
     updates later.)
@@ -32,13 +34,18 @@ def kickoff_verification(
             Send(
                 node="verify_documents",
                 arg=DocVerificationInput(
-                    retrieved_document_to_verify=document,
+                    retrieved_documents_to_verify=retrieved_documents[
+                        batch_start : batch_start
+                        + AGENT_DOCUMENT_VERIFICATION_BATCH_SIZE
+                    ],
                     question=verification_question,
                     base_search=False,
                     sub_question_id=sub_question_id,
                     log_messages=[],
                 ),
             )
-            for document in retrieved_documents
+            for batch_start in range(
+                0, len(retrieved_documents), AGENT_DOCUMENT_VERIFICATION_BATCH_SIZE
+            )
         ],
     )
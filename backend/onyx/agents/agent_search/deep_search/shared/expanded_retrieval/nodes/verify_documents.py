@@ -1,7 +1,6 @@
 from datetime import datetime
 from typing import cast
 
-from langchain_core.messages import BaseMessage
 from langchain_core.messages import HumanMessage
 from langchain_core.runnables.config import RunnableConfig
 
@@ -18,17 +17,29 @@ from onyx.agents.agent_search.shared_graph_utils.agent_prompt_ops import (
 from onyx.agents.agent_search.shared_graph_utils.agent_prompt_ops import (
     trim_prompt_piece,
 )
+from onyx.agents.agent_search.shared_graph_utils.agent_prompt_ops import (
+    trim_prompt_pieces,
+)
 from onyx.agents.agent_search.shared_graph_utils.constants import (
     AGENT_POSITIVE_VALUE_STR,
 )
+from onyx.agents.agent_search.shared_graph_utils.models import (
+    DocumentVerificationBatchResult,
+)
 from onyx.agents.agent_search.shared_graph_utils.models import LLMNodeErrorStrings
 from onyx.agents.agent_search.shared_graph_utils.utils import (
     get_langgraph_node_log_string,
 )
 from onyx.configs.agent_configs import AGENT_TIMEOUT_CONNECT_LLM_DOCUMENT_VERIFICATION
+from onyx.configs.agent_configs import AGENT_TIMEOUT_LLM_BATCH_DOCUMENT_VERIFICATION
 from onyx.configs.agent_configs import AGENT_TIMEOUT_LLM_DOCUMENT_VERIFICATION
+from onyx.context.search.models import InferenceSection
 from onyx.llm.chat_llm import LLMRateLimitError
 from onyx.llm.chat_llm import LLMTimeoutError
+from onyx.llm.interfaces import LLM
+from onyx.prompts.agent_search import (
+    DOCUMENT_BATCH_VERIFICATION_PROMPT,
+)
 from onyx.prompts.agent_search import (
     DOCUMENT_VERIFICATION_PROMPT,
 )
@@ -44,13 +55,105 @@ _llm_node_error_strings = LLMNodeErrorStrings(
     general_error="The LLM encountered an error. The document could not be verified. The document will be treated as 'relevant'",
 )
 
+_DOCUMENT_HEADER = "Document {document_number}:\n"
+
+
+def _verify_document(
+    question: str, document: InferenceSection, fast_llm: LLM
+) -> list[InferenceSection]:
+    document_content = trim_prompt_piece(
+        fast_llm.config,
+        document.combined_content,
+        DOCUMENT_VERIFICATION_PROMPT + question,
+    )
+
+    msg = [
+        HumanMessage(
+            content=DOCUMENT_VERIFICATION_PROMPT.format(
+                question=question, document_content=document_content
+            )
+        )
+    ]
+
+    response = run_with_timeout(
+        AGENT_TIMEOUT_LLM_DOCUMENT_VERIFICATION,
+        fast_llm.invoke,
+        prompt=msg,
+        timeout_override=AGENT_TIMEOUT_CONNECT_LLM_DOCUMENT_VERIFICATION,
+    )
+
+    assert isinstance(response.content, str)
+    if not binary_string_test(
+        text=response.content, positive_value=AGENT_POSITIVE_VALUE_STR
+    ):
+        return []
+    return [document]
+
+
+def _verify_document_batch(
+    question: str, documents: list[InferenceSection], fast_llm: LLM
+) -> list[InferenceSection]:
+    document_contents = trim_prompt_pieces(
+        fast_llm.config,
+        [document.combined_content for document in documents],
+        DOCUMENT_BATCH_VERIFICATION_PROMPT
+        + question
+        + _DOCUMENT_HEADER.format(document_number=len(documents)) * len(documents),
+    )
+
+    msg = [
+        HumanMessage(
+            content=DOCUMENT_BATCH_VERIFICATION_PROMPT.format(
+                question=question,
+                document_contents="\n\n".join(
+                    _DOCUMENT_HEADER.format(document_number=document_number)
+                    + document_content
+                    for document_number, document_content in enumerate(
+                        document_contents, 1
+                    )
+                ),
+            )
+        )
+    ]
+
+    response = run_with_timeout(
+        AGENT_TIMEOUT_LLM_BATCH_DOCUMENT_VERIFICATION,
+        fast_llm.invoke,
+        prompt=msg,
+        timeout_override=AGENT_TIMEOUT_CONNECT_LLM_DOCUMENT_VERIFICATION,
+    )
+
+    cleaned_response = (
+        str(response.content).replace("```json\n", "").replace("\n```", "")
+    )
+    first_bracket = cleaned_response.find("{")
+    last_bracket = cleaned_response.rfind("}")
+    cleaned_response = cleaned_response[first_bracket : last_bracket + 1]
+
+    try:
+        verification_result = DocumentVerificationBatchResult.model_validate_json(
+            cleaned_response
+        )
+    except ValueError:
+        # same as for timeouts, rather let some less relevant docs through
+        logger.error("Failed to parse LLM response as JSON in verify documents")
+        return documents
+
+    relevant_document_numbers = set(verification_result.relevant_documents)
+    return [
+        document
+        for document_number, document in enumerate(documents, 1)
+        if document_number in relevant_document_numbers
+    ]
+
 
 @log_function_time(print_only=True)
 def verify_documents(
     state: DocVerificationInput, config: RunnableConfig
 ) -> DocVerificationUpdate:
     """
-    LangGraph node to check whether the document is relevant for the original user question
+    LangGraph node to check whether the documents are relevant for the original user question.
+    A batch of several documents is verified with a single LLM call.
 
     Args:
         state (DocVerificationInput): The current state
@@ -63,43 +166,24 @@ def verify_documents(
     node_start_time = datetime.now()
 
     question = state.question
-    retrieved_document_to_verify = state.retrieved_document_to_verify
-    document_content = retrieved_document_to_verify.combined_content
+    retrieved_documents_to_verify = state.retrieved_documents_to_verify
 
     graph_config = cast(GraphConfig, config["metadata"]["config"])
     fast_llm = graph_config.tooling.fast_llm
 
-    document_content = trim_prompt_piece(
-        fast_llm.config, document_content, DOCUMENT_VERIFICATION_PROMPT + question
+    verified_documents = (
+        retrieved_documents_to_verify  # default is to treat documents as relevant
     )
 
-    msg = [
-        HumanMessage(
-            content=DOCUMENT_VERIFICATION_PROMPT.format(
-                question=question, document_content=document_content
-            )
-        )
-    ]
-
-    response: BaseMessage | None = None
-
-    verified_documents = [
-        retrieved_document_to_verify
-    ]  # default is to treat document as relevant
-
     try:
-        response = run_with_timeout(
-            AGENT_TIMEOUT_LLM_DOCUMENT_VERIFICATION,
-            fast_llm.invoke,
-            prompt=msg,
-            timeout_override=AGENT_TIMEOUT_CONNECT_LLM_DOCUMENT_VERIFICATION,
-        )
-
-        assert isinstance(response.content, str)
-        if not binary_string_test(
-            text=response.content, positive_value=AGENT_POSITIVE_VALUE_STR
-        ):
-            verified_documents = []
+        if len(retrieved_documents_to_verify) == 1:
+            verified_documents = _verify_document(
+                question, retrieved_documents_to_verify[0], fast_llm
+            )
+        elif retrieved_documents_to_verify:
+            verified_documents = _verify_document_batch(
+                question, retrieved_documents_to_verify, fast_llm
+            )
 
     except (LLMTimeoutError, TimeoutError):
         # In this case, we decide to continue and don't raise an error, as
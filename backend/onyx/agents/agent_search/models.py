@@ -2,10 +2,12 @@ from uuid import UUID
 
 from pydantic import BaseModel
 from pydantic import model_validator
+from pydantic import PrivateAttr
 from sqlalchemy.orm import Session
 
 from onyx.chat.prompt_builder.answer_prompt_builder import AnswerPromptBuilder
 from onyx.context.search.models import SearchRequest
+from onyx.context.search.retrieval.retrieval_context import RetrievalContext
 from onyx.file_store.utils import InMemoryChatFile
 from onyx.llm.interfaces import LLM
 from onyx.tools.force import ForceUseTool
@@ -36,6 +38,15 @@ class GraphTooling(BaseModel):
     # force tool args IF the tool is used
     force_use_tool: ForceUseTool
     using_tool_calling_llm: bool = False
+    _retrieval_context: RetrievalContext = PrivateAttr(default_factory=RetrievalContext)
+
+    @property
+    def retrieval_context(self) -> RetrievalContext:
+        """Retrieval work shared by all of the searches of the request (i.e. all of
+        the sub-questions and their expanded queries), the search tool runs them"""
+        if self.search_tool is not None:
+            return self.search_tool.retrieval_context
+        return self._retrieval_context
 
     class Config:
         arbitrary_types_allowed = True
@@ -85,6 +85,42 @@ def trim_prompt_piece(config: LLMConfig, prompt_piece: str, reserved_str: str) -
     )
 
 
+def trim_prompt_pieces(
+    config: LLMConfig, prompt_pieces: list[str], reserved_str: str
+) -> list[str]:
+    """Like trim_prompt_piece, but for several pieces going into the same prompt,
+    each of them gets an equal share of the available tokens"""
+    if not prompt_pieces:
+        return prompt_pieces
+
+    max_tokens = get_max_input_tokens(
+        model_provider=config.model_provider,
+        model_name=config.model_name,
+    )
+
+    # no need to trim if a conservative estimate of one token
+    # per character is already less than the max tokens
+    if sum(len(piece) for piece in prompt_pieces) + len(reserved_str) < max_tokens:
+        return prompt_pieces
+
+    llm_tokenizer = get_tokenizer(
+        provider_type=config.model_provider,
+        model_name=config.model_name,
+    )
+
+    desired_length = (max_tokens - len(llm_tokenizer.encode(reserved_str))) // len(
+        prompt_pieces
+    )
+    return [
+        tokenizer_trim_content(
+            content=piece,
+            desired_length=desired_length,
+            tokenizer=llm_tokenizer,
+        )
+        for piece in prompt_pieces
+    ]
+
+
 def build_history_prompt(config: GraphConfig, question: str) -> str:
     prompt_builder = config.inputs.prompt_builder
     persona_base = get_persona_agent_prompt_expressions(
@@ -99,6 +99,10 @@ class EntityExtractionResult(BaseModel):
     retrieved_entities_relationships: EntityRelationshipTermExtraction
 
 
+class DocumentVerificationBatchResult(BaseModel):
+    relevant_documents: list[int]
+
+
 class QueryRetrievalResult(BaseModel):
     query: str
     retrieved_documents: list[InferenceSection]
@@ -45,6 +45,15 @@ beat_task_templates.extend(
                 "expires": BEAT_EXPIRES_DEFAULT,
             },
         },
+        {
+            "name": "reconcile-document-counts",
+            "task": OnyxCeleryTask.RECONCILE_DOCUMENT_COUNTS_TASK,
+            "schedule": timedelta(hours=6),
+            "options": {
+                "priority": OnyxCeleryPriority.LOW,
+                "expires": BEAT_EXPIRES_DEFAULT,
+            },
+        },
         {
             "name": "check-for-connector-deletion",
             "task": OnyxCeleryTask.CHECK_FOR_CONNECTOR_DELETION,
@@ -1,3 +1,5 @@
+import multiprocessing
+import os
 import time
 from datetime import datetime
 from datetime import timezone
@@ -124,21 +126,20 @@ class IndexingCallbackBase(IndexingHeartbeatInterface):
         return False
 
     def progress(self, tag: str, amount: int) -> None:
-        # rkuo: this shouldn't be necessary yet because we spawn the process this runs inside
-        # with daemon=True. It seems likely some indexing tasks will need to spawn other processes
-        # eventually, which daemon=True prevents, so leave this code in until we're ready to test it.
-
-        # if self.parent_pid:
-        #     # check if the parent pid is alive so we aren't running as a zombie
-        #     now = time.monotonic()
-        #     if now - self.last_parent_check > IndexingCallback.PARENT_CHECK_INTERVAL:
-        #         try:
-        #             # this is unintuitive, but it checks if the parent pid is still running
-        #             os.kill(self.parent_pid, 0)
-        #         except Exception:
-        #             logger.exception("IndexingCallback - parent pid check exceptioned")
-        #             raise
-        #         self.last_parent_check = now
+        # Processes spawned with daemon=True are terminated along with their parent. When
+        # chunking in separate processes, the indexing process can't be daemonic, so make sure
+        # it isn't left running as a zombie instead.
+        if self.parent_pid and not multiprocessing.current_process().daemon:
+            # check if the parent pid is alive so we aren't running as a zombie
+            now = time.monotonic()
+            if now - self.last_parent_check > IndexingCallback.PARENT_CHECK_INTERVAL:
+                try:
+                    # this is unintuitive, but it checks if the parent pid is still running
+                    os.kill(self.parent_pid, 0)
+                except Exception:
+                    logger.exception("IndexingCallback - parent pid check exceptioned")
+                    raise
+                self.last_parent_check = now
 
         try:
             current_time = time.monotonic()
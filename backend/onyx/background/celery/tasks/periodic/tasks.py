@@ -7,15 +7,21 @@ from typing import Any
 from celery import shared_task
 from celery.contrib.abortable import AbortableTask  # type: ignore
 from celery.exceptions import TaskRevokedError
+from redis.lock import Lock as RedisLock
 from sqlalchemy import inspect
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 from onyx.background.celery.apps.app_base import task_logger
 from onyx.configs.app_configs import JOB_TIMEOUT
+from onyx.configs.constants import CELERY_GENERIC_BEAT_LOCK_TIMEOUT
 from onyx.configs.constants import OnyxCeleryTask
+from onyx.configs.constants import OnyxRedisLocks
 from onyx.configs.constants import PostgresAdvisoryLocks
+from onyx.db.connector_credential_pair import get_connector_credential_pairs
+from onyx.db.document import reconcile_document_count_for_cc_pair
 from onyx.db.engine import get_session_with_current_tenant
+from onyx.redis.redis_pool import get_redis_client
 
 
 @shared_task(
@@ -136,3 +142,53 @@ def kombu_message_cleanup_task_helper(ctx: dict, db_session: Session) -> bool:
         ctx["last_processed_id"] = msg[0]
 
     return True
+
+
+@shared_task(
+    name=OnyxCeleryTask.RECONCILE_DOCUMENT_COUNTS_TASK,
+    soft_time_limit=JOB_TIMEOUT,
+)
+def reconcile_document_counts_task(*, tenant_id: str) -> None:
+    """Recounts the indexed documents of every cc pair and fixes up the incrementally
+    maintained document counts if they have drifted."""
+    locked = False
+    redis_client = get_redis_client(tenant_id=tenant_id)
+    lock: RedisLock = redis_client.lock(
+        OnyxRedisLocks.RECONCILE_DOCUMENT_COUNTS_BEAT_LOCK,
+        timeout=CELERY_GENERIC_BEAT_LOCK_TIMEOUT,
+    )
+
+    # these tasks should never overlap
+    if not lock.acquire(blocking=False):
+        return None
+
+    try:
+        locked = True
+        with get_session_with_current_tenant() as db_session:
+            cc_pair_ids = [
+                (cc_pair.connector_id, cc_pair.credential_id)
+                for cc_pair in get_connector_credential_pairs(db_session)
+            ]
+            for connector_id, credential_id in cc_pair_ids:
+                lock.reacquire()
+                drift = reconcile_document_count_for_cc_pair(
+                    db_session, connector_id, credential_id
+                )
+                if drift:
+                    task_logger.warning(
+                        "Document count had drifted: "
+                        f"connector={connector_id} credential={credential_id} "
+                        f"drift={drift}"
+                    )
+    except Exception:
+        task_logger.exception("Unexpected exception during document count reconcile")
+        return None
+    finally:
+        if locked:
+            if lock.owned():
+                lock.release()
+            else:
+                task_logger.error(
+                    "reconcile_document_counts_task - Lock not owned on completion: "
+                    f"tenant={tenant_id}"
+                )
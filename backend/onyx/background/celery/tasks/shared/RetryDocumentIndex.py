@@ -5,6 +5,7 @@ from tenacity import stop_after_delay
 from tenacity import wait_random_exponential
 
 from onyx.document_index.interfaces import DocumentIndex
+from onyx.document_index.interfaces import DocumentUpdateRequest
 from onyx.document_index.interfaces import VespaDocumentFields
 
 
@@ -60,3 +61,19 @@ class RetryDocumentIndex:
             chunk_count=chunk_count,
             fields=fields,
         )
+
+    @retry(
+        retry=retry_if_exception_type(httpx.ReadTimeout),
+        wait=wait_random_exponential(multiplier=1, max=MAX_WAIT),
+        stop=stop_after_delay(STOP_AFTER),
+    )
+    def update_multiple(
+        self,
+        update_requests: list[DocumentUpdateRequest],
+        *,
+        tenant_id: str,
+    ) -> dict[str, int]:
+        return self.index.update_multiple(
+            update_requests,
+            tenant_id=tenant_id,
+        )
@@ -15,6 +15,7 @@ from sqlalchemy.orm import Session
 from tenacity import RetryError
 
 from onyx.access.access import get_access_for_document
+from onyx.access.access import get_access_for_documents
 from onyx.background.celery.apps.app_base import task_logger
 from onyx.background.celery.tasks.shared.RetryDocumentIndex import RetryDocumentIndex
 from onyx.background.celery.tasks.shared.tasks import LIGHT_SOFT_TIME_LIMIT
@@ -29,10 +30,13 @@ from onyx.configs.constants import OnyxRedisLocks
 from onyx.db.connector_credential_pair import get_connector_credential_pairs
 from onyx.db.document import count_documents_by_needs_sync
 from onyx.db.document import get_document
+from onyx.db.document import get_documents_by_ids
 from onyx.db.document import mark_document_as_synced
+from onyx.db.document import mark_documents_as_synced
 from onyx.db.document_set import delete_document_set
 from onyx.db.document_set import fetch_document_sets
 from onyx.db.document_set import fetch_document_sets_for_document
+from onyx.db.document_set import fetch_document_sets_for_documents
 from onyx.db.document_set import get_document_set_by_id
 from onyx.db.document_set import mark_document_set_as_synced
 from onyx.db.engine import get_session_with_current_tenant
@@ -45,6 +49,7 @@ from onyx.db.sync_record import cleanup_sync_records
 from onyx.db.sync_record import insert_sync_record
 from onyx.db.sync_record import update_sync_record_status
 from onyx.document_index.factory import get_default_document_index
+from onyx.document_index.interfaces import DocumentUpdateRequest
 from onyx.document_index.interfaces import VespaDocumentFields
 from onyx.httpx.httpx_pool import HttpxPool
 from onyx.redis.redis_connector_credential_pair import RedisConnectorCredentialPair
@@ -516,6 +521,42 @@ def monitor_document_set_taskset(
     rds.reset()
 
 
+def _handle_vespa_metadata_sync_exception(
+    task: Task, ex: Exception, task_context: str
+) -> tuple[OnyxCeleryTaskCompletionStatus, Exception | None]:
+    """Logs the exception and determines the completion status. If the task should be
+    retried, the exception to retry with is returned as well."""
+    e: Exception | None = None
+    if isinstance(ex, RetryError):
+        task_logger.warning(
+            f"Tenacity retry failed: num_attempts={ex.last_attempt.attempt_number}"
+        )
+
+        # only set the inner exception if it is of type Exception
+        e_temp = ex.last_attempt.exception()
+        if isinstance(e_temp, Exception):
+            e = e_temp
+    else:
+        e = ex
+
+    if isinstance(e, httpx.HTTPStatusError):
+        if e.response.status_code == HTTPStatus.BAD_REQUEST:
+            task_logger.exception(
+                f"Non-retryable HTTPStatusError: "
+                f"{task_context} "
+                f"status={e.response.status_code}"
+            )
+        return OnyxCeleryTaskCompletionStatus.NON_RETRYABLE_EXCEPTION, None
+
+    task_logger.exception(f"{task.name} exceptioned: {task_context}")
+
+    completion_status = OnyxCeleryTaskCompletionStatus.RETRYABLE_EXCEPTION
+    if task.max_retries is not None and task.request.retries >= task.max_retries:
+        completion_status = OnyxCeleryTaskCompletionStatus.NON_RETRYABLE_EXCEPTION
+
+    return completion_status, e
+
+
 @shared_task(
     name=OnyxCeleryTask.VESPA_METADATA_SYNC_TASK,
     bind=True,
@@ -589,52 +630,121 @@ def vespa_metadata_sync_task(self: Task, document_id: str, *, tenant_id: str) ->
         task_logger.info(f"SoftTimeLimitExceeded exception. doc={document_id}")
         completion_status = OnyxCeleryTaskCompletionStatus.SOFT_TIME_LIMIT
     except Exception as ex:
-        e: Exception | None = None
-        while True:
-            if isinstance(ex, RetryError):
-                task_logger.warning(
-                    f"Tenacity retry failed: num_attempts={ex.last_attempt.attempt_number}"
-                )
+        completion_status, retry_exc = _handle_vespa_metadata_sync_exception(
+            self, ex, f"doc={document_id}"
+        )
+        if retry_exc:
+            # Exponential backoff from 2^4 to 2^6 ... i.e. 16, 32, 64
+            countdown = 2 ** (self.request.retries + 4)
+            self.retry(
+                exc=retry_exc, countdown=countdown
+            )  # this will raise a celery exception
+    finally:
+        task_logger.info(
+            f"vespa_metadata_sync_task completed: status={completion_status.value} doc={document_id}"
+        )
 
-                # only set the inner exception if it is of type Exception
-                e_temp = ex.last_attempt.exception()
-                if isinstance(e_temp, Exception):
-                    e = e_temp
-            else:
-                e = ex
-
-            if isinstance(e, httpx.HTTPStatusError):
-                if e.response.status_code == HTTPStatus.BAD_REQUEST:
-                    task_logger.exception(
-                        f"Non-retryable HTTPStatusError: "
-                        f"doc={document_id} "
-                        f"status={e.response.status_code}"
-                    )
-                completion_status = (
-                    OnyxCeleryTaskCompletionStatus.NON_RETRYABLE_EXCEPTION
-                )
-                break
+    if completion_status != OnyxCeleryTaskCompletionStatus.SUCCEEDED:
+        return False
 
-            task_logger.exception(
-                f"vespa_metadata_sync_task exceptioned: doc={document_id}"
+    return True
+
+
+@shared_task(
+    name=OnyxCeleryTask.VESPA_METADATA_SYNC_BATCH_TASK,
+    bind=True,
+    soft_time_limit=LIGHT_SOFT_TIME_LIMIT,
+    time_limit=LIGHT_TIME_LIMIT,
+    max_retries=3,
+)
+def vespa_metadata_sync_batch_task(
+    self: Task, document_ids: list[str], *, tenant_id: str
+) -> bool:
+    """Batched version of vespa_metadata_sync_task. The metadata for all of the documents
+    is loaded in a few queries, the Vespa updates for all of their chunks are sent together
+    over the pooled client and the documents are marked as synced in a single update."""
+    start = time.monotonic()
+
+    completion_status = OnyxCeleryTaskCompletionStatus.UNDEFINED
+
+    try:
+        with get_session_with_current_tenant() as db_session:
+            active_search_settings = get_active_search_settings(db_session)
+            doc_index = get_default_document_index(
+                search_settings=active_search_settings.primary,
+                secondary_search_settings=active_search_settings.secondary,
+                httpx_client=HttpxPool.get("vespa"),
             )
 
-            completion_status = OnyxCeleryTaskCompletionStatus.RETRYABLE_EXCEPTION
-            if (
-                self.max_retries is not None
-                and self.request.retries >= self.max_retries
-            ):
-                completion_status = (
-                    OnyxCeleryTaskCompletionStatus.NON_RETRYABLE_EXCEPTION
+            retry_index = RetryDocumentIndex(doc_index)
+
+            docs = get_documents_by_ids(db_session, document_ids)
+            found_doc_ids = [doc.id for doc in docs]
+            doc_id_to_doc_sets = dict(
+                fetch_document_sets_for_documents(found_doc_ids, db_session)
+            )
+            doc_id_to_access = get_access_for_documents(found_doc_ids, db_session)
+            load_elapsed = time.monotonic() - start
+
+            update_requests = [
+                DocumentUpdateRequest(
+                    doc_id=doc.id,
+                    chunk_count=doc.chunk_count,
+                    fields=VespaDocumentFields(
+                        document_sets=set(doc_id_to_doc_sets.get(doc.id, [])),
+                        access=doc_id_to_access[doc.id],
+                        boost=doc.boost,
+                        hidden=doc.hidden,
+                    ),
                 )
+                for doc in docs
+            ]
+
+            # update Vespa. OK if docs don't exist. Raises exception otherwise.
+            update_start = time.monotonic()
+            doc_id_to_chunks_affected = retry_index.update_multiple(
+                update_requests, tenant_id=tenant_id
+            )
+            update_elapsed = time.monotonic() - update_start
+
+            # update db last. Worst case = we crash right before this and
+            # the sync might repeat again later
+            if found_doc_ids:
+                mark_documents_as_synced(found_doc_ids, db_session)
 
+            elapsed = time.monotonic() - start
+            chunks_affected = sum(doc_id_to_chunks_affected.values())
+            task_logger.info(
+                f"action=sync_batch "
+                f"docs={len(found_doc_ids)} "
+                f"docs_missing={len(document_ids) - len(found_doc_ids)} "
+                f"chunks={chunks_affected} "
+                f"load_elapsed={load_elapsed:.2f} "
+                f"update_elapsed={update_elapsed:.2f} "
+                f"elapsed={elapsed:.2f} "
+                f"docs_per_sec={len(found_doc_ids) / max(elapsed, 1e-6):.2f} "
+                f"chunks_per_sec={chunks_affected / max(elapsed, 1e-6):.2f}"
+            )
+            completion_status = OnyxCeleryTaskCompletionStatus.SUCCEEDED
+    except SoftTimeLimitExceeded:
+        task_logger.info(
+            f"SoftTimeLimitExceeded exception. num_docs={len(document_ids)}"
+        )
+        completion_status = OnyxCeleryTaskCompletionStatus.SOFT_TIME_LIMIT
+    except Exception as ex:
+        completion_status, retry_exc = _handle_vespa_metadata_sync_exception(
+            self, ex, f"num_docs={len(document_ids)} first_doc={document_ids[0]}"
+        )
+        if retry_exc:
             # Exponential backoff from 2^4 to 2^6 ... i.e. 16, 32, 64
             countdown = 2 ** (self.request.retries + 4)
-            self.retry(exc=e, countdown=countdown)  # this will raise a celery exception
-            break  # we won't hit this, but it looks weird not to have it
+            self.retry(
+                exc=retry_exc, countdown=countdown
+            )  # this will raise a celery exception
     finally:
         task_logger.info(
-            f"vespa_metadata_sync_task completed: status={completion_status.value} doc={document_id}"
+            f"vespa_metadata_sync_batch_task completed: status={completion_status.value} "
+            f"num_docs={len(document_ids)}"
         )
 
     if completion_status != OnyxCeleryTaskCompletionStatus.SUCCEEDED:
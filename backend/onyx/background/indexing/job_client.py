@@ -161,8 +161,10 @@ class SimpleJob:
 class SimpleJobClient:
     """Drop in replacement for `dask.distributed.Client`"""
 
-    def __init__(self, n_workers: int = 1) -> None:
+    def __init__(self, n_workers: int = 1, daemon: bool = True) -> None:
         self.n_workers = n_workers
+        # daemonic processes can't start processes of their own
+        self.daemon = daemon
         self.job_id_counter = 0
         self.jobs: dict[int, SimpleJob] = {}
 
@@ -192,7 +194,7 @@ class SimpleJobClient:
         ctx = mp.get_context("spawn")
         queue = ctx.Queue()
         process = ctx.Process(
-            target=_run_in_process, args=(func, queue, args), daemon=True
+            target=_run_in_process, args=(func, queue, args), daemon=self.daemon
         )
         job = SimpleJob(id=job_id, process=process, queue=queue)
         process.start()
@@ -13,6 +13,8 @@ from onyx.background.indexing.checkpointing_utils import get_latest_valid_checkp
 from onyx.background.indexing.checkpointing_utils import save_checkpoint
 from onyx.background.indexing.memory_tracer import MemoryTracer
 from onyx.configs.app_configs import INDEX_BATCH_SIZE
+from onyx.configs.app_configs import INDEXING_PIPELINE_ENABLED
+from onyx.configs.app_configs import INDEXING_PIPELINE_PREFETCH_BATCHES
 from onyx.configs.app_configs import INDEXING_SIZE_WARNING_THRESHOLD
 from onyx.configs.app_configs import INDEXING_TRACER_INTERVAL
 from onyx.configs.app_configs import INTEGRATION_TESTS_MODE
@@ -50,10 +52,14 @@ from onyx.document_index.factory import get_default_document_index
 from onyx.httpx.httpx_pool import HttpxPool
 from onyx.indexing.embedder import DefaultIndexingEmbedder
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
+from onyx.indexing.indexing_pipeline import build_chunker
 from onyx.indexing.indexing_pipeline import build_indexing_pipeline
+from onyx.indexing.indexing_pipeline import build_pipelined_indexing_runner
+from onyx.indexing.indexing_pipeline import IndexingPipelineResult
 from onyx.utils.logger import setup_logger
 from onyx.utils.logger import TaskAttemptSingleton
 from onyx.utils.telemetry import create_milestone_and_report
+from onyx.utils.threadpool_concurrency import prefetch_iterator
 from onyx.utils.variable_functionality import global_version
 from shared_configs.configs import MULTI_TENANT
 
@@ -348,17 +354,40 @@ def _run_indexing(
         httpx_client=HttpxPool.get("vespa"),
     )
 
+    ignore_time_skip = ctx.from_beginning or (
+        ctx.search_settings_status == IndexModelStatus.FUTURE
+    )
+    # shared by both pipelines, runs a process pool when chunking processes are set
+    chunker = build_chunker(
+        embedder=embedding_model,
+        db_session=db_session,
+        # after every doc, update status in case there are a bunch of really long docs
+        callback=callback,
+        allow_parallel=True,
+    )
     indexing_pipeline = build_indexing_pipeline(
         embedder=embedding_model,
         document_index=document_index,
-        ignore_time_skip=(
-            ctx.from_beginning
-            or (ctx.search_settings_status == IndexModelStatus.FUTURE)
-        ),
+        chunker=chunker,
+        ignore_time_skip=ignore_time_skip,
         db_session=db_session,
         tenant_id=tenant_id,
         callback=callback,
     )
+    # when enabled, a batch is embedded while the batch before it is being written
+    pipelined_runner = (
+        build_pipelined_indexing_runner(
+            embedder=embedding_model,
+            document_index=document_index,
+            chunker=chunker,
+            ignore_time_skip=ignore_time_skip,
+            db_session=db_session,
+            tenant_id=tenant_id,
+            callback=callback,
+        )
+        if INDEXING_PIPELINE_ENABLED
+        else None
+    )
 
     # Initialize memory tracer. NOTE: won't actually do anything if
     # `INDEXING_TRACER_INTERVAL` is 0.
@@ -375,6 +404,76 @@ def _run_indexing(
     net_doc_change = 0
     document_count = 0
     chunk_count = 0
+    doc_id_to_unresolved_errors: dict[str, list[IndexAttemptError]] = defaultdict(list)
+
+    def _on_batch_indexed(
+        indexed_batch: list[Document],
+        index_pipeline_result: IndexingPipelineResult,
+    ) -> None:
+        nonlocal total_failures, net_doc_change, chunk_count, document_count
+
+        net_doc_change += index_pipeline_result.new_docs
+        chunk_count += index_pipeline_result.total_chunks
+        document_count += index_pipeline_result.total_docs
+
+        # resolve errors for documents that were successfully indexed
+        failed_document_ids = [
+            failure.failed_document.document_id
+            for failure in index_pipeline_result.failures
+            if failure.failed_document
+        ]
+        successful_document_ids = [
+            document.id
+            for document in indexed_batch
+            if document.id not in failed_document_ids
+        ]
+        for document_id in successful_document_ids:
+            with get_session_with_current_tenant() as db_session_temp:
+                if document_id in doc_id_to_unresolved_errors:
+                    logger.info(
+                        f"Resolving IndexAttemptError for document '{document_id}'"
+                    )
+                    for error in doc_id_to_unresolved_errors[document_id]:
+                        error.is_resolved = True
+                        db_session_temp.add(error)
+                db_session_temp.commit()
+
+        # add brand new failures
+        if index_pipeline_result.failures:
+            total_failures += len(index_pipeline_result.failures)
+            with get_session_with_current_tenant() as db_session_temp:
+                for failure in index_pipeline_result.failures:
+                    create_index_attempt_error(
+                        index_attempt_id,
+                        ctx.cc_pair_id,
+                        failure,
+                        db_session_temp,
+                    )
+
+            _check_failure_threshold(
+                total_failures,
+                document_count,
+                batch_num,
+                index_pipeline_result.failures[-1],
+            )
+
+        # This new value is updated every batch, so UI can refresh per batch update
+        with get_session_with_current_tenant() as db_session_temp:
+            # NOTE: Postgres uses the start of the transactions when computing `NOW()`
+            # so we need either to commit() or to use a new session
+            update_docs_indexed(
+                db_session=db_session_temp,
+                index_attempt_id=index_attempt_id,
+                total_docs_indexed=document_count,
+                new_docs_indexed=net_doc_change,
+                docs_removed_from_index=0,
+            )
+
+        if callback:
+            callback.progress("_run_indexing", len(indexed_batch))
+
+        memory_tracer.increment_and_maybe_trace()
+
     try:
         with get_session_with_current_tenant() as db_session_temp:
             index_attempt = get_index_attempt(db_session_temp, index_attempt_id)
@@ -408,9 +507,6 @@ def _run_indexing(
                 unresolved_only=True,
                 db_session=db_session_temp,
             )
-            doc_id_to_unresolved_errors: dict[
-                str, list[IndexAttemptError]
-            ] = defaultdict(list)
             for error in unresolved_errors:
                 if error.document_id:
                     doc_id_to_unresolved_errors[error.document_id].append(error)
@@ -423,9 +519,13 @@ def _run_indexing(
             logger.info(
                 f"Running '{ctx.source}' connector with checkpoint: {checkpoint}"
             )
-            for document_batch, failure, next_checkpoint in connector_runner.run(
-                checkpoint
-            ):
+            connector_batches = connector_runner.run(checkpoint)
+            if pipelined_runner:
+                # fetch the next batches from the source while the current one is indexed
+                connector_batches = prefetch_iterator(
+                    connector_batches, INDEXING_PIPELINE_PREFETCH_BATCHES
+                )
+            for document_batch, failure, next_checkpoint in connector_batches:
                 # Check if connector is disabled mid run and stop if so unless it's the secondary
                 # index being built. We want to populate it even for paused connectors
                 # Often paused connectors are sources that aren't updated frequently but the
@@ -483,76 +583,33 @@ def _run_indexing(
 
                 logger.debug(f"Indexing batch of documents: {batch_description}")
 
-                index_attempt_md.batch_num = batch_num + 1  # use 1-index for this
-
-                # real work happens here!
-                index_pipeline_result = indexing_pipeline(
-                    document_batch=doc_batch_cleaned,
-                    index_attempt_metadata=index_attempt_md,
-                )
-
                 batch_num += 1
-                net_doc_change += index_pipeline_result.new_docs
-                chunk_count += index_pipeline_result.total_chunks
-                document_count += index_pipeline_result.total_docs
-
-                # resolve errors for documents that were successfully indexed
-                failed_document_ids = [
-                    failure.failed_document.document_id
-                    for failure in index_pipeline_result.failures
-                    if failure.failed_document
-                ]
-                successful_document_ids = [
-                    document.id
-                    for document in document_batch
-                    if document.id not in failed_document_ids
-                ]
-                for document_id in successful_document_ids:
-                    with get_session_with_current_tenant() as db_session_temp:
-                        if document_id in doc_id_to_unresolved_errors:
-                            logger.info(
-                                f"Resolving IndexAttemptError for document '{document_id}'"
-                            )
-                            for error in doc_id_to_unresolved_errors[document_id]:
-                                error.is_resolved = True
-                                db_session_temp.add(error)
-                        db_session_temp.commit()
-
-                # add brand new failures
-                if index_pipeline_result.failures:
-                    total_failures += len(index_pipeline_result.failures)
-                    with get_session_with_current_tenant() as db_session_temp:
-                        for failure in index_pipeline_result.failures:
-                            create_index_attempt_error(
-                                index_attempt_id,
-                                ctx.cc_pair_id,
-                                failure,
-                                db_session_temp,
-                            )
+                index_attempt_md.batch_num = batch_num  # use 1-index for this
 
-                    _check_failure_threshold(
-                        total_failures,
-                        document_count,
-                        batch_num,
-                        index_pipeline_result.failures[-1],
-                    )
-
-                # This new value is updated every batch, so UI can refresh per batch update
-                with get_session_with_current_tenant() as db_session_temp:
-                    # NOTE: Postgres uses the start of the transactions when computing `NOW()`
-                    # so we need either to commit() or to use a new session
-                    update_docs_indexed(
-                        db_session=db_session_temp,
-                        index_attempt_id=index_attempt_id,
-                        total_docs_indexed=document_count,
-                        new_docs_indexed=net_doc_change,
-                        docs_removed_from_index=0,
+                # real work happens here!
+                if pipelined_runner:
+                    indexed_batches = pipelined_runner.submit(
+                        document_batch=doc_batch_cleaned,
+                        index_attempt_metadata=index_attempt_md,
                     )
+                else:
+                    indexed_batches = [
+                        (
+                            doc_batch_cleaned,
+                            indexing_pipeline(
+                                document_batch=doc_batch_cleaned,
+                                index_attempt_metadata=index_attempt_md,
+                            ),
+                        )
+                    ]
 
-                if callback:
-                    callback.progress("_run_indexing", len(doc_batch_cleaned))
+                for indexed_batch, index_pipeline_result in indexed_batches:
+                    _on_batch_indexed(indexed_batch, index_pipeline_result)
 
-                memory_tracer.increment_and_maybe_trace()
+            # everything up to the checkpoint must be indexed before it is saved
+            if pipelined_runner:
+                for indexed_batch, index_pipeline_result in pipelined_runner.flush():
+                    _on_batch_indexed(indexed_batch, index_pipeline_result)
 
             # `make sure the checkpoints aren't getting too large`at some regular interval
             CHECKPOINT_SIZE_CHECK_INTERVAL = 100
@@ -630,6 +687,10 @@ def _run_indexing(
 
             memory_tracer.stop()
             raise e
+    finally:
+        if pipelined_runner:
+            pipelined_runner.close()
+        chunker.close()
 
     memory_tracer.stop()
 
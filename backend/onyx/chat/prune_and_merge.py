@@ -1,6 +1,5 @@
 import json
 from collections import defaultdict
-from copy import deepcopy
 from typing import TypeVar
 
 from pydantic import BaseModel
@@ -16,6 +15,7 @@ from onyx.configs.model_configs import DOC_EMBEDDING_CONTEXT_SIZE
 from onyx.context.search.models import InferenceChunk
 from onyx.context.search.models import InferenceSection
 from onyx.llm.interfaces import LLMConfig
+from onyx.natural_language_processing.utils import count_tokens
 from onyx.natural_language_processing.utils import get_tokenizer
 from onyx.natural_language_processing.utils import tokenizer_trim_content
 from onyx.prompts.prompt_utils import build_doc_context_str
@@ -131,6 +131,14 @@ def _remove_sections_to_ignore(
     ]
 
 
+def _with_combined_content(
+    section: InferenceSection, combined_content: str
+) -> InferenceSection:
+    # the sections passed in are shared with the caller, so trimmed sections are
+    # copies rather than being modified in place
+    return section.model_copy(update={"combined_content": combined_content})
+
+
 def _apply_pruning(
     sections: list[InferenceSection],
     section_relevance_list: list[bool] | None,
@@ -144,8 +152,6 @@ def _apply_pruning(
         provider_type=llm_config.model_provider,
         model_name=llm_config.model_name,
     )
-    sections = deepcopy(sections)  # don't modify in place
-
     # re-order docs with all the "relevant" docs at the front
     sections = reorder_sections(
         sections=sections, section_relevance_list=section_relevance_list
@@ -172,7 +178,7 @@ def _apply_pruning(
             )
         )
 
-        section_token_count = len(llm_tokenizer.encode(section_str))
+        section_token_count = count_tokens(section_str, llm_tokenizer)
         # if not using sections (specifically, using Sections where each section maps exactly to the one center chunk),
         # truncate chunks that are way too long. This can happen if the embedding model tokenizer is different
         # than the LLM tokenizer
@@ -194,10 +200,13 @@ def _apply_pruning(
                     "Found more tokens in Section than expected, "
                     "likely mismatch between embedding and LLM tokenizers. Trimming content..."
                 )
-            section.combined_content = tokenizer_trim_content(
-                content=section.combined_content,
-                desired_length=DOC_EMBEDDING_CONTEXT_SIZE,
-                tokenizer=llm_tokenizer,
+            sections[ind] = _with_combined_content(
+                section,
+                tokenizer_trim_content(
+                    content=section.combined_content,
+                    desired_length=DOC_EMBEDDING_CONTEXT_SIZE,
+                    tokenizer=llm_tokenizer,
+                ),
             )
             section_token_count = DOC_EMBEDDING_CONTEXT_SIZE
 
@@ -224,8 +233,8 @@ def _apply_pruning(
             amount_to_truncate = total_tokens - token_limit
             # NOTE: need to recalculate the length here, since the previous calculation included
             # overhead from JSON-fying the doc / the metadata
-            final_doc_content_length = len(
-                llm_tokenizer.encode(sections[final_section_ind].combined_content)
+            final_doc_content_length = count_tokens(
+                sections[final_section_ind].combined_content, llm_tokenizer
             ) - (amount_to_truncate)
             # this could occur if we only have space for the title / metadata
             # not ideal, but it's the most reasonable thing to do
@@ -239,10 +248,13 @@ def _apply_pruning(
                 )
                 sections.pop()
             else:
-                sections[final_section_ind].combined_content = tokenizer_trim_content(
-                    content=sections[final_section_ind].combined_content,
-                    desired_length=final_doc_content_length,
-                    tokenizer=llm_tokenizer,
+                sections[final_section_ind] = _with_combined_content(
+                    sections[final_section_ind],
+                    tokenizer_trim_content(
+                        content=sections[final_section_ind].combined_content,
+                        desired_length=final_doc_content_length,
+                        tokenizer=llm_tokenizer,
+                    ),
                 )
         else:
             # For search on chunk level (Section is just a chunk), don't truncate the final Chunk/Section unless it's the only one
@@ -250,12 +262,16 @@ def _apply_pruning(
             if final_section_ind != 0:
                 sections = sections[:final_section_ind]
             else:
-                sections[0].combined_content = tokenizer_trim_content(
-                    content=sections[0].combined_content,
-                    desired_length=token_limit - _METADATA_TOKEN_ESTIMATE,
-                    tokenizer=llm_tokenizer,
-                )
-                sections = [sections[0]]
+                sections = [
+                    _with_combined_content(
+                        sections[0],
+                        tokenizer_trim_content(
+                            content=sections[0].combined_content,
+                            desired_length=token_limit - _METADATA_TOKEN_ESTIMATE,
+                            tokenizer=llm_tokenizer,
+                        ),
+                    )
+                ]
 
     return sections
 
@@ -12,12 +12,51 @@ from onyx.utils.logger import setup_logger
 logger = setup_logger()
 
 
+_CITATION_PATTERN = re.compile(r"\[(\d+)\]|\[\[(\d+)\]\]")  # [1], [[1]], etc.
+_POSSIBLE_CITATION_PATTERN = re.compile(r"(\[+\d*$)")  # [1, [, [[, [[2, etc.
+_MANUAL_CITATION_PATTERN = re.compile(r"\[\[(\d+)\]\]")
+
+
 def in_code_block(llm_text: str) -> bool:
     count = llm_text.count(TRIPLE_BACKTICK)
     return count % 2 != 0
 
 
+class _CodeBlockTracker:
+    """Streaming equivalent of `in_code_block` over everything fed so far.
+
+    `str.count` finds non-overlapping matches left to right, so a run of k backticks
+    holds k // 3 triple backticks. Only the run at the very end can still grow, so it
+    is the only thing that needs to be remembered besides the count of the closed
+    runs."""
+
+    def __init__(self) -> None:
+        self._closed_run_count = 0
+        self._trailing_run_length = 0
+
+    def feed(self, text: str) -> None:
+        without_trailing = text.rstrip("`")
+        if not without_trailing:
+            self._trailing_run_length += len(text)
+            return
+
+        num_leading = len(text) - len(text.lstrip("`"))
+        self._closed_run_count += (self._trailing_run_length + num_leading) // 3
+        # starts and ends with something other than a backtick, all runs are closed
+        self._closed_run_count += without_trailing[num_leading:].count(TRIPLE_BACKTICK)
+        self._trailing_run_length = len(text) - len(without_trailing)
+
+    @property
+    def in_code_block(self) -> bool:
+        count = self._closed_run_count + self._trailing_run_length // 3
+        return count % 2 != 0
+
+
 class CitationProcessor:
+    """Replaces the citations in the streamed LLM output with links to the cited
+    documents. The work per token is proportional to the token plus the unfinished
+    citation being held back, never to the length of the answer so far."""
+
     def __init__(
         self,
         context_docs: list[LlmDoc],
@@ -31,15 +70,23 @@ class CitationProcessor:
         self.stop_stream = stop_stream
         self.final_order_mapping = final_doc_id_to_rank_map.order_mapping
         self.display_order_mapping = display_doc_id_to_rank_map.order_mapping
-        self.llm_out = ""
+        self.llm_out_pieces: list[str] = []
+        self.llm_out_length = 0
+        self.code_block_tracker = _CodeBlockTracker()
         self.max_citation_num = len(context_docs)
         self.citation_order: list[int] = []  # order of citations in the LLM output
+        # final citation number -> 1-based position in citation_order
+        self.citation_order_idx: dict[int, int] = {}
         self.curr_segment = ""
         self.cited_inds: set[int] = set()
         self.hold = ""
         self.current_citations: list[int] = []
         self.past_cite_count = 0
 
+    @property
+    def llm_out(self) -> str:
+        return "".join(self.llm_out_pieces)
+
     def process_token(
         self, token: str | None
     ) -> Generator[OnyxAnswerPiece | CitationInfo, None, None]:
@@ -59,7 +106,9 @@ class CitationProcessor:
             self.hold = ""
 
         self.curr_segment += token
-        self.llm_out += token
+        self.llm_out_pieces.append(token)
+        self.llm_out_length += len(token)
+        self.code_block_tracker.feed(token)
 
         # Handle code blocks without language tags
         if "`" in self.curr_segment:
@@ -67,21 +116,20 @@ class CitationProcessor:
                 pass
             elif "```" in self.curr_segment:
                 piece_that_comes_after = self.curr_segment.split("```")[1][0]
-                if piece_that_comes_after == "\n" and in_code_block(self.llm_out):
+                if (
+                    piece_that_comes_after == "\n"
+                    and self.code_block_tracker.in_code_block
+                ):
                     self.curr_segment = self.curr_segment.replace("```", "```plaintext")
 
-        citation_pattern = r"\[(\d+)\]|\[\[(\d+)\]\]"  # [1], [[1]], etc.
-        citations_found = list(re.finditer(citation_pattern, self.curr_segment))
-        possible_citation_pattern = r"(\[+\d*$)"  # [1, [, [[, [[2, etc.
-        possible_citation_found = re.search(
-            possible_citation_pattern, self.curr_segment
-        )
+        citations_found = list(_CITATION_PATTERN.finditer(self.curr_segment))
+        possible_citation_found = _POSSIBLE_CITATION_PATTERN.search(self.curr_segment)
 
-        if len(citations_found) == 0 and len(self.llm_out) - self.past_cite_count > 5:
+        if len(citations_found) == 0 and self.llm_out_length - self.past_cite_count > 5:
             self.current_citations = []
 
         result = ""
-        if citations_found and not in_code_block(self.llm_out):
+        if citations_found and not self.code_block_tracker.in_code_block:
             last_citation_end = 0
             length_to_add = 0
             while len(citations_found) > 0:
@@ -96,12 +144,13 @@ class CitationProcessor:
                         context_llm_doc.document_id
                     ]
 
-                    if final_citation_num not in self.citation_order:
+                    if final_citation_num not in self.citation_order_idx:
                         self.citation_order.append(final_citation_num)
+                        self.citation_order_idx[final_citation_num] = len(
+                            self.citation_order
+                        )
 
-                    citation_order_idx = (
-                        self.citation_order.index(final_citation_num) + 1
-                    )
+                    citation_order_idx = self.citation_order_idx[final_citation_num]
 
                     # get the value that was displayed to user, should always
                     # be in the display_doc_order_dict. But check anyways
@@ -129,7 +178,7 @@ class CitationProcessor:
 
                     # Handle edge case where LLM outputs citation itself
                     if self.curr_segment.startswith("[["):
-                        match = re.match(r"\[\[(\d+)\]\]", self.curr_segment)
+                        match = _MANUAL_CITATION_PATTERN.match(self.curr_segment)
                         if match:
                             try:
                                 doc_id = int(match.group(1))
@@ -151,7 +200,7 @@ class CitationProcessor:
 
                     link = context_llm_doc.link
 
-                    self.past_cite_count = len(self.llm_out)
+                    self.past_cite_count = self.llm_out_length
                     self.current_citations.append(final_citation_num)
 
                     if citation_order_idx not in self.cited_inds:
@@ -17,6 +17,7 @@ AGENT_DEFAULT_EXPLORATORY_SEARCH_RESULTS = 5
 AGENT_DEFAULT_MIN_ORIG_QUESTION_DOCS = 3
 AGENT_DEFAULT_MAX_ANSWER_CONTEXT_DOCS = 10
 AGENT_DEFAULT_MAX_STATIC_HISTORY_WORD_LENGTH = 2000
+AGENT_DEFAULT_DOCUMENT_VERIFICATION_BATCH_SIZE = 1
 
 INITIAL_SEARCH_DECOMPOSITION_ENABLED = True
 ALLOW_REFINEMENT = True
@@ -78,6 +79,16 @@ AGENT_EXPLORATORY_SEARCH_RESULTS = int(
     or AGENT_DEFAULT_EXPLORATORY_SEARCH_RESULTS
 )  # 5
 
+# Number of retrieved documents whose relevance is checked in a single LLM call.
+# 1 verifies every document with its own call.
+AGENT_DOCUMENT_VERIFICATION_BATCH_SIZE = max(
+    1,
+    int(
+        os.environ.get("AGENT_DOCUMENT_VERIFICATION_BATCH_SIZE")
+        or AGENT_DEFAULT_DOCUMENT_VERIFICATION_BATCH_SIZE
+    ),
+)  # 1
+
 AGENT_MIN_ORIG_QUESTION_DOCS = int(
     os.environ.get("AGENT_MIN_ORIG_QUESTION_DOCS")
     or AGENT_DEFAULT_MIN_ORIG_QUESTION_DOCS
@@ -190,6 +201,12 @@ AGENT_TIMEOUT_LLM_DOCUMENT_VERIFICATION = int(
     or AGENT_DEFAULT_TIMEOUT_LLM_DOCUMENT_VERIFICATION
 )
 
+AGENT_DEFAULT_TIMEOUT_LLM_BATCH_DOCUMENT_VERIFICATION = 15  # in seconds
+AGENT_TIMEOUT_LLM_BATCH_DOCUMENT_VERIFICATION = int(
+    os.environ.get("AGENT_TIMEOUT_LLM_BATCH_DOCUMENT_VERIFICATION")
+    or AGENT_DEFAULT_TIMEOUT_LLM_BATCH_DOCUMENT_VERIFICATION
+)
+
 
 AGENT_DEFAULT_TIMEOUT_CONNECT_LLM_GENERAL_GENERATION = 5  # in seconds
 AGENT_TIMEOUT_CONNECT_LLM_GENERAL_GENERATION = int(
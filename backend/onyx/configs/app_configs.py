@@ -148,6 +148,11 @@ VESPA_DEPLOYMENT_ZIP = (
 )
 VESPA_CLOUD_CERT_PATH = os.environ.get("VESPA_CLOUD_CERT_PATH")
 VESPA_CLOUD_KEY_PATH = os.environ.get("VESPA_CLOUD_KEY_PATH")
+# If set, chunks are streamed into Vespa with a bounded window of outstanding requests
+# and compact (hex) tensor serialization instead of fixed size batches of JSON posts
+VESPA_BULK_FEED_ENABLED = (
+    os.environ.get("VESPA_BULK_FEED_ENABLED", "").lower() == "true"
+)
 
 # Number of documents in a batch during indexing (further batching done by chunks before passing to bi-encoder)
 try:
@@ -155,6 +160,26 @@ try:
 except ValueError:
     INDEX_BATCH_SIZE = 16
 
+# If set, chunks of re-indexed documents whose content (and embedding model settings) are
+# unchanged reuse the embeddings already stored in the document index instead of being
+# embedded again
+ENABLE_EMBEDDING_REUSE = os.environ.get("ENABLE_EMBEDDING_REUSE", "").lower() == "true"
+
+# If set, indexing is pipelined: upcoming batches are fetched from the connector, and a batch
+# is chunked + embedded, while the previous batch is written to the document index / Postgres
+INDEXING_PIPELINE_ENABLED = (
+    os.environ.get("INDEXING_PIPELINE_ENABLED", "").lower() == "true"
+)
+# Max number of batches fetched from the connector ahead of the one being indexed
+INDEXING_PIPELINE_PREFETCH_BATCHES = int(
+    os.environ.get("INDEXING_PIPELINE_PREFETCH_BATCHES") or 2
+)
+# Number of processes documents are chunked in during indexing, chunking is CPU bound so it
+# can't make use of threads. 0 chunks in the indexing process itself
+INDEXING_CHUNKING_NUM_PROCESSES = int(
+    os.environ.get("INDEXING_CHUNKING_NUM_PROCESSES") or 0
+)
+
 # Below are intended to match the env variables names used by the official postgres docker image
 # https://hub.docker.com/_/postgres
 POSTGRES_USER = os.environ.get("POSTGRES_USER") or "postgres"
@@ -252,6 +277,19 @@ REDIS_POOL_MAX_CONNECTIONS = int(os.environ.get("REDIS_POOL_MAX_CONNECTIONS", 12
 REDIS_SSL_CERT_REQS = os.getenv("REDIS_SSL_CERT_REQS", "none")
 REDIS_SSL_CA_CERTS = os.getenv("REDIS_SSL_CA_CERTS", None)
 
+# Seconds that key value store entries are cached in-process, in front of Redis / Postgres.
+# Entries are invalidated across processes via Redis pub/sub. 0 disables the cache
+KV_STORE_LOCAL_CACHE_TTL = float(os.environ.get("KV_STORE_LOCAL_CACHE_TTL") or 0)
+KV_STORE_LOCAL_CACHE_MAX_SIZE = int(
+    os.environ.get("KV_STORE_LOCAL_CACHE_MAX_SIZE") or 1024
+)
+
+# Seconds that a user's ACL (used to filter search results) is cached in-process. Entries
+# are invalidated across processes by a version stamp in Redis that is bumped on user
+# group, external group and user role changes. 0 disables the cache
+USER_ACL_CACHE_TTL = float(os.environ.get("USER_ACL_CACHE_TTL") or 0)
+USER_ACL_CACHE_MAX_SIZE = int(os.environ.get("USER_ACL_CACHE_MAX_SIZE") or 4096)
+
 CELERY_RESULT_EXPIRES = int(os.environ.get("CELERY_RESULT_EXPIRES", 86400))  # seconds
 
 # https://docs.celeryq.dev/en/stable/userguide/configuration.html#broker-pool-limit
@@ -302,6 +340,11 @@ except ValueError:
 # The maximum number of tasks that can be queued up to sync to Vespa in a single pass
 VESPA_SYNC_MAX_TASKS = 1024
 
+# Number of documents synced to Vespa per metadata sync task. With the default of 1,
+# a task is generated per document. Larger values generate batched sync tasks that load
+# the metadata for all of their documents at once and update Vespa together.
+VESPA_SYNC_BATCH_SIZE = max(1, int(os.environ.get("VESPA_SYNC_BATCH_SIZE") or 1))
+
 DB_YIELD_PER_DEFAULT = 64
 
 #####
@@ -332,6 +375,20 @@ WEB_CONNECTOR_OAUTH_CLIENT_ID = os.environ.get("WEB_CONNECTOR_OAUTH_CLIENT_ID")
 WEB_CONNECTOR_OAUTH_CLIENT_SECRET = os.environ.get("WEB_CONNECTOR_OAUTH_CLIENT_SECRET")
 WEB_CONNECTOR_OAUTH_TOKEN_URL = os.environ.get("WEB_CONNECTOR_OAUTH_TOKEN_URL")
 WEB_CONNECTOR_VALIDATE_URLS = os.environ.get("WEB_CONNECTOR_VALIDATE_URLS")
+# Number of pages the web connector fetches at once. With more than 1, pages are crawled
+# by a pool of workers that each own a browser and try a plain HTTP fetch before
+# rendering the page. 1 keeps the original one page at a time crawl
+WEB_CONNECTOR_MAX_CONCURRENT_PAGES = int(
+    os.environ.get("WEB_CONNECTOR_MAX_CONCURRENT_PAGES") or 1
+)
+# Politeness limits for the concurrent crawl, applied per host
+WEB_CONNECTOR_MAX_CONCURRENT_PAGES_PER_HOST = int(
+    os.environ.get("WEB_CONNECTOR_MAX_CONCURRENT_PAGES_PER_HOST") or 4
+)
+# Minimum number of seconds between the start of two requests to the same host
+WEB_CONNECTOR_MIN_HOST_REQUEST_INTERVAL = float(
+    os.environ.get("WEB_CONNECTOR_MIN_HOST_REQUEST_INTERVAL") or 0.1
+)
 
 HTML_BASED_CONNECTOR_TRANSFORM_LINKS_STRATEGY = os.environ.get(
     "HTML_BASED_CONNECTOR_TRANSFORM_LINKS_STRATEGY",
@@ -366,6 +423,13 @@ CONFLUENCE_CONNECTOR_ATTACHMENT_CHAR_COUNT_THRESHOLD = int(
     os.environ.get("CONFLUENCE_CONNECTOR_ATTACHMENT_CHAR_COUNT_THRESHOLD", 200_000)
 )
 
+# Number of threads used to fetch and convert Confluence pages, comments and attachments.
+# With more than 1, comments and attachments are also fetched for many pages per CQL query
+# instead of one query per page
+CONFLUENCE_CONNECTOR_FETCH_CONCURRENCY = int(
+    os.environ.get("CONFLUENCE_CONNECTOR_FETCH_CONCURRENCY") or 1
+)
+
 # Due to breakages in the confluence API, the timezone offset must be specified client side
 # to match the user's specified timezone.
 
@@ -498,6 +562,14 @@ INDEXING_EMBEDDING_MODEL_NUM_THREADS = int(
     os.environ.get("INDEXING_EMBEDDING_MODEL_NUM_THREADS") or 1
 )
 
+# If set, texts sent to a local embedding model are sorted by token length before being
+# split into batches so that short texts (mini chunks, titles) aren't padded to the length
+# of a full chunk. Embeddings are returned in the original order.
+# Note: only applies for local (non API-based) embedding models
+EMBEDDING_LENGTH_BUCKETING_ENABLED = (
+    os.environ.get("EMBEDDING_LENGTH_BUCKETING_ENABLED", "").lower() == "true"
+)
+
 # During an indexing attempt, specifies the number of batches which are allowed to
 # exception without aborting the attempt.
 INDEXING_EXCEPTION_LIMIT = int(os.environ.get("INDEXING_EXCEPTION_LIMIT") or 0)
@@ -81,6 +81,10 @@ DISABLE_LLM_DOC_RELEVANCE = (
 # Stops streaming answers back to the UI if this pattern is seen:
 STOP_STREAM_PAT = os.environ.get("STOP_STREAM_PAT") or None
 
+# Number of recent token counts kept in memory, keyed by tokenizer and a hash of the text.
+# Lets sections that get pruned again on later turns skip the LLM tokenizer, 0 disables it
+TOKEN_COUNT_CACHE_MAX_SIZE = int(os.environ.get("TOKEN_COUNT_CACHE_MAX_SIZE") or 4096)
+
 # Set this to "true" to hard delete chats
 # This will make chats unviewable by admins after a user deletes them
 # As opposed to soft deleting them, which just hides them from non-admin users
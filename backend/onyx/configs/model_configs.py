@@ -46,6 +46,17 @@ EMBEDDING_BATCH_SIZE = int(os.environ.get("EMBEDDING_BATCH_SIZE") or 0) or None
 BATCH_SIZE_ENCODE_CHUNKS = EMBEDDING_BATCH_SIZE or 8
 # don't send over too many chunks at once, as sending too many could cause timeouts
 BATCH_SIZE_ENCODE_CHUNKS_FOR_API_EMBEDDING_SERVICES = EMBEDDING_BATCH_SIZE or 512
+# Query embeddings are cached so repeated queries skip the model server. The in process
+# cache holds at most QUERY_EMBEDDING_CACHE_MAX_SIZE entries (0 disables caching), and
+# entries expire after QUERY_EMBEDDING_CACHE_TTL seconds. If enabled, embeddings are also
+# stored in Redis to share them between API server processes
+QUERY_EMBEDDING_CACHE_MAX_SIZE = int(
+    os.environ.get("QUERY_EMBEDDING_CACHE_MAX_SIZE") or 1024
+)
+QUERY_EMBEDDING_CACHE_TTL = int(os.environ.get("QUERY_EMBEDDING_CACHE_TTL") or 3600)
+QUERY_EMBEDDING_CACHE_REDIS_ENABLED = (
+    os.environ.get("QUERY_EMBEDDING_CACHE_REDIS_ENABLED", "").lower() == "true"
+)
 # For score display purposes, only way is to know the expected ranges
 CROSS_ENCODER_RANGE_MAX = 1
 CROSS_ENCODER_RANGE_MIN = 0
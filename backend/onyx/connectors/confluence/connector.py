@@ -1,3 +1,4 @@
+from collections.abc import Callable
 from datetime import datetime
 from datetime import timedelta
 from datetime import timezone
@@ -6,6 +7,7 @@ from urllib.parse import quote
 
 from requests.exceptions import HTTPError
 
+from onyx.configs.app_configs import CONFLUENCE_CONNECTOR_FETCH_CONCURRENCY
 from onyx.configs.app_configs import CONFLUENCE_CONNECTOR_LABELS_TO_SKIP
 from onyx.configs.app_configs import CONFLUENCE_TIMEZONE_OFFSET
 from onyx.configs.app_configs import CONTINUE_ON_CONNECTOR_FAILURE
@@ -34,7 +36,9 @@ from onyx.connectors.models import Document
 from onyx.connectors.models import Section
 from onyx.connectors.models import SlimDocument
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
+from onyx.utils.batching import batch_generator
 from onyx.utils.logger import setup_logger
+from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
 
 logger = setup_logger()
 
@@ -64,6 +68,9 @@ _RESTRICTIONS_EXPANSION_FIELDS = [
 ]
 
 _SLIM_DOC_BATCH_SIZE = 5000
+# Max number of pages whose comments / attachments are fetched with a single CQL query,
+# each page adds a clause to the query so this also bounds the length of the url
+_CQL_CONTAINER_BATCH_SIZE = 25
 
 _ATTACHMENT_EXTENSIONS_TO_FILTER_OUT = [
     "png",
@@ -99,8 +106,10 @@ class ConfluenceConnector(LoadConnector, PollConnector, SlimConnector):
         # pages.
         labels_to_skip: list[str] = CONFLUENCE_CONNECTOR_LABELS_TO_SKIP,
         timezone_offset: float = CONFLUENCE_TIMEZONE_OFFSET,
+        fetch_concurrency: int = CONFLUENCE_CONNECTOR_FETCH_CONCURRENCY,
     ) -> None:
         self.batch_size = batch_size
+        self.fetch_concurrency = fetch_concurrency
         self.continue_on_failure = continue_on_failure
         self._confluence_client: OnyxConfluence | None = None
         self.is_cloud = is_cloud
@@ -181,32 +190,70 @@ class ConfluenceConnector(LoadConnector, PollConnector, SlimConnector):
         attachment_query += _FULL_EXTENSION_FILTER_STRING
         return attachment_query
 
-    def _get_comment_string_for_page_id(self, page_id: str) -> str:
-        comment_string = ""
-
-        comment_cql = f"type=comment and container='{page_id}'"
-        comment_cql += self.cql_label_filter
+    def _construct_container_query(self, object_type: str, page_ids: list[str]) -> str:
+        container_filter = " or ".join(f"container='{page_id}'" for page_id in page_ids)
+        container_query = f"type={object_type} and ({container_filter})"
+        container_query += self.cql_label_filter
+        if object_type == "attachment":
+            container_query += _FULL_EXTENSION_FILTER_STRING
+        return container_query
 
-        expand = ",".join(_COMMENT_EXPANSION_FIELDS)
-        for comment in self.confluence_client.paginated_cql_retrieval(
-            cql=comment_cql,
-            expand=expand,
-        ):
+    def _get_comment_string(self, comments: list[dict[str, Any]]) -> str:
+        comment_string = ""
+        for comment in comments:
             comment_string += "\nComment:\n"
             comment_string += extract_text_from_confluence_html(
                 confluence_client=self.confluence_client,
                 confluence_object=comment,
                 fetched_titles=set(),
             )
-
         return comment_string
 
+    def _get_comment_string_for_page_id(self, page_id: str) -> str:
+        comment_cql = f"type=comment and container='{page_id}'"
+        comment_cql += self.cql_label_filter
+
+        expand = ",".join(_COMMENT_EXPANSION_FIELDS)
+        return self._get_comment_string(
+            list(
+                self.confluence_client.paginated_cql_retrieval(
+                    cql=comment_cql,
+                    expand=expand,
+                )
+            )
+        )
+
+    def _get_objects_by_page_id(
+        self, object_type: str, expansion_fields: list[str], page_ids: list[str]
+    ) -> dict[str, list[dict[str, Any]]]:
+        """Fetches the comments or attachments of all of the given pages with a single
+        CQL query, the container expansion tells which page each of them belongs to."""
+        page_id_to_objects: dict[str, list[dict[str, Any]]] = {
+            page_id: [] for page_id in page_ids
+        }
+        for confluence_object in self.confluence_client.paginated_cql_retrieval(
+            cql=self._construct_container_query(object_type, page_ids),
+            expand=",".join(expansion_fields + ["container"]),
+        ):
+            page_id = confluence_object.get("container", {}).get("id")
+            if page_id not in page_id_to_objects:
+                logger.warning(
+                    f"Unexpected container {page_id} for {object_type} "
+                    f"{confluence_object.get('id')}"
+                )
+                continue
+            page_id_to_objects[page_id].append(confluence_object)
+        return page_id_to_objects
+
     def _convert_object_to_document(
-        self, confluence_object: dict[str, Any]
+        self,
+        confluence_object: dict[str, Any],
+        page_comments: list[dict[str, Any]] | None = None,
     ) -> Document | None:
         """
         Takes in a confluence object, extracts all metadata, and converts it into a document.
         If its a page, it extracts the text, adds the comments for the document text.
+        The comments are fetched here unless they were already fetched as page_comments.
         If its an attachment, it just downloads the attachment and converts that into a document.
         """
         # The url and the id are the same
@@ -223,7 +270,12 @@ class ConfluenceConnector(LoadConnector, PollConnector, SlimConnector):
                 fetched_titles={confluence_object.get("title", "")},
             )
             # Add comments to text
-            object_text += self._get_comment_string_for_page_id(confluence_object["id"])
+            if page_comments is None:
+                object_text += self._get_comment_string_for_page_id(
+                    confluence_object["id"]
+                )
+            else:
+                object_text += self._get_comment_string(page_comments)
         elif confluence_object["type"] == "attachment":
             object_text = attachment_to_content(
                 confluence_client=self.confluence_client, attachment=confluence_object
@@ -274,6 +326,10 @@ class ConfluenceConnector(LoadConnector, PollConnector, SlimConnector):
         start: SecondsSinceUnixEpoch | None = None,
         end: SecondsSinceUnixEpoch | None = None,
     ) -> GenerateDocumentsOutput:
+        if self.fetch_concurrency > 1:
+            yield from self._fetch_document_batches_concurrently(start, end)
+            return
+
         doc_batch: list[Document] = []
         confluence_page_ids: list[str] = []
 
@@ -312,6 +368,76 @@ class ConfluenceConnector(LoadConnector, PollConnector, SlimConnector):
         if doc_batch:
             yield doc_batch
 
+    def _fetch_document_batches_concurrently(
+        self,
+        start: SecondsSinceUnixEpoch | None = None,
+        end: SecondsSinceUnixEpoch | None = None,
+    ) -> GenerateDocumentsOutput:
+        """Same documents as the serial fetch, but for every batch of pages the comments
+        and attachments are fetched with a few CQL queries covering many pages, and the
+        pages and attachments are converted by a bounded pool of threads. Every call
+        still goes through the client's rate limit handling. Attachments are yielded
+        right after the page they belong to instead of after all of the pages."""
+        doc_batch: list[Document] = []
+
+        page_query = self._construct_page_query(start, end)
+        logger.debug(f"page_query: {page_query}")
+        pages = self.confluence_client.paginated_cql_retrieval(
+            cql=page_query,
+            expand=",".join(_PAGE_EXPANSION_FIELDS),
+            limit=self.batch_size,
+        )
+        for page_batch in batch_generator(pages, self.batch_size):
+            page_ids = [page["id"] for page in page_batch]
+            container_queries: list[tuple[Callable, tuple]] = []
+            for page_id_batch in batch_generator(page_ids, _CQL_CONTAINER_BATCH_SIZE):
+                container_queries.append(
+                    (
+                        self._get_objects_by_page_id,
+                        ("comment", _COMMENT_EXPANSION_FIELDS, page_id_batch),
+                    )
+                )
+                container_queries.append(
+                    (
+                        self._get_objects_by_page_id,
+                        ("attachment", _ATTACHMENT_EXPANSION_FIELDS, page_id_batch),
+                    )
+                )
+
+            page_id_to_comments: dict[str, list[dict[str, Any]]] = {}
+            page_id_to_attachments: dict[str, list[dict[str, Any]]] = {}
+            query_results = run_functions_tuples_in_parallel(
+                container_queries, max_workers=self.fetch_concurrency
+            )
+            for comments, attachments in zip(query_results[::2], query_results[1::2]):
+                page_id_to_comments.update(comments)
+                page_id_to_attachments.update(attachments)
+
+            conversions: list[tuple[Callable, tuple]] = []
+            for page in page_batch:
+                conversions.append(
+                    (
+                        self._convert_object_to_document,
+                        (page, page_id_to_comments[page["id"]]),
+                    )
+                )
+                conversions.extend(
+                    (self._convert_object_to_document, (attachment,))
+                    for attachment in page_id_to_attachments[page["id"]]
+                )
+
+            for doc in run_functions_tuples_in_parallel(
+                conversions, max_workers=self.fetch_concurrency
+            ):
+                if doc is not None:
+                    doc_batch.append(doc)
+                if len(doc_batch) >= self.batch_size:
+                    yield doc_batch
+                    doc_batch = []
+
+        if doc_batch:
+            yield doc_batch
+
     def load_from_state(self) -> GenerateDocumentsOutput:
         return self._fetch_document_batches()
 
@@ -41,17 +41,17 @@ def _read_files_and_metadata(
     metadata: dict[str, Any] = {}
     directory_path = os.path.dirname(file_name)
 
-    file_content = get_default_file_store(db_session).read_file(file_name, mode="b")
-
-    if extension == ".zip":
-        for file_info, file, metadata in load_files_from_zip(
-            file_content, ignore_dirs=True
-        ):
-            yield os.path.join(directory_path, file_info.filename), file, metadata
-    elif is_valid_file_ext(extension):
-        yield file_name, file_content, metadata
-    else:
-        logger.warning(f"Skipping file '{file_name}' with extension '{extension}'")
+    # streamed from the file store, so large files / zips are never fully held in memory
+    with get_default_file_store(db_session).open_file(file_name) as file_content:
+        if extension == ".zip":
+            for file_info, file, metadata in load_files_from_zip(
+                file_content, ignore_dirs=True
+            ):
+                yield os.path.join(directory_path, file_info.filename), file, metadata
+        elif is_valid_file_ext(extension):
+            yield file_name, file_content, metadata
+        else:
+            logger.warning(f"Skipping file '{file_name}' with extension '{extension}'")
 
 
 def _process_file(
@@ -13,16 +13,18 @@ from onyx.connectors.interfaces import SlimConnector
 from onyx.connectors.models import ConnectorMissingCredentialError
 from onyx.connectors.models import Document
 from onyx.connectors.models import SlimDocument
-from onyx.connectors.salesforce.doc_conversion import convert_sf_object_to_doc
+from onyx.connectors.salesforce.doc_conversion import convert_sf_objects_to_docs
 from onyx.connectors.salesforce.doc_conversion import ID_PREFIX
 from onyx.connectors.salesforce.salesforce_calls import fetch_all_csvs_in_parallel
 from onyx.connectors.salesforce.salesforce_calls import get_all_children_of_sf_type
 from onyx.connectors.salesforce.sqlite_functions import get_affected_parent_ids_by_type
-from onyx.connectors.salesforce.sqlite_functions import get_record
+from onyx.connectors.salesforce.sqlite_functions import get_records
 from onyx.connectors.salesforce.sqlite_functions import init_db
+from onyx.connectors.salesforce.sqlite_functions import shared_db_connection
 from onyx.connectors.salesforce.sqlite_functions import update_sf_db_with_csv
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
 from onyx.utils.logger import setup_logger
+from shared_configs.utils import batch_list
 
 logger = setup_logger()
 
@@ -67,6 +69,14 @@ class SalesforceConnector(LoadConnector, PollConnector, SlimConnector):
         end: SecondsSinceUnixEpoch | None = None,
     ) -> GenerateDocumentsOutput:
         init_db()
+        with shared_db_connection():
+            yield from self._fetch_with_db_connection(start=start, end=end)
+
+    def _fetch_with_db_connection(
+        self,
+        start: SecondsSinceUnixEpoch | None = None,
+        end: SecondsSinceUnixEpoch | None = None,
+    ) -> GenerateDocumentsOutput:
         all_object_types: set[str] = set(self.parent_object_list)
 
         logger.info(f"Starting with {len(self.parent_object_list)} parent object types")
@@ -144,20 +154,22 @@ class SalesforceConnector(LoadConnector, PollConnector, SlimConnector):
             logger.info(
                 f"Processing batch of {len(parent_id_batch)} {parent_type} objects"
             )
-            for parent_id in parent_id_batch:
-                if not (parent_object := get_record(parent_id, parent_type)):
-                    logger.warning(
-                        f"Failed to get parent object {parent_id} for {parent_type}"
-                    )
-                    continue
+            parent_objects = get_records(list(parent_id_batch))
+            for parent_id in parent_id_batch - parent_objects.keys():
+                logger.warning(
+                    f"Failed to get parent object {parent_id} for {parent_type}"
+                )
 
-                docs_to_yield.append(
-                    convert_sf_object_to_doc(
-                        sf_object=parent_object,
+            for parent_object_batch in batch_list(
+                list(parent_objects.values()), self.batch_size
+            ):
+                docs_to_yield.extend(
+                    convert_sf_objects_to_docs(
+                        sf_objects=parent_object_batch,
                         sf_instance=self.sf_client.sf_instance,
                     )
                 )
-                docs_processed += 1
+                docs_processed += len(parent_object_batch)
 
                 if len(docs_to_yield) >= self.batch_size:
                     yield docs_to_yield
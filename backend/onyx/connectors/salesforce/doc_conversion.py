@@ -5,8 +5,8 @@ from onyx.connectors.cross_connector_utils.miscellaneous_utils import time_str_t
 from onyx.connectors.models import BasicExpertInfo
 from onyx.connectors.models import Document
 from onyx.connectors.models import Section
-from onyx.connectors.salesforce.sqlite_functions import get_child_ids
-from onyx.connectors.salesforce.sqlite_functions import get_record
+from onyx.connectors.salesforce.sqlite_functions import get_child_ids_for_parents
+from onyx.connectors.salesforce.sqlite_functions import get_records
 from onyx.connectors.salesforce.utils import SalesforceObject
 from onyx.utils.logger import setup_logger
 
@@ -123,12 +123,13 @@ def _extract_section(salesforce_object: SalesforceObject, base_url: str) -> Sect
 
 def _extract_primary_owners(
     sf_object: SalesforceObject,
+    records: dict[str, SalesforceObject],
 ) -> list[BasicExpertInfo] | None:
     object_dict = sf_object.data
     if not (last_modified_by_id := object_dict.get("LastModifiedById")):
         logger.warning(f"No LastModifiedById found for {sf_object.id}")
         return None
-    if not (last_modified_by := get_record(last_modified_by_id)):
+    if not (last_modified_by := records.get(last_modified_by_id)):
         logger.warning(f"No LastModifiedBy found for {last_modified_by_id}")
         return None
 
@@ -156,9 +157,11 @@ def _extract_primary_owners(
     return [expert_info]
 
 
-def convert_sf_object_to_doc(
+def _convert_sf_object_to_doc(
     sf_object: SalesforceObject,
     sf_instance: str,
+    child_ids: set[str],
+    records: dict[str, SalesforceObject],
 ) -> Document:
     object_dict = sf_object.data
     salesforce_id = object_dict["Id"]
@@ -168,8 +171,9 @@ def convert_sf_object_to_doc(
     extracted_semantic_identifier = object_dict.get("Name", "Unknown Object")
 
     sections = [_extract_section(sf_object, base_url)]
-    for id in get_child_ids(sf_object.id):
-        if not (child_object := get_record(id)):
+    for id in child_ids:
+        if not (child_object := records.get(id)):
+            logger.warning(f"Object ID {id} not found")
             continue
         sections.append(_extract_section(child_object, base_url))
 
@@ -179,7 +183,42 @@ def convert_sf_object_to_doc(
         source=DocumentSource.SALESFORCE,
         semantic_identifier=extracted_semantic_identifier,
         doc_updated_at=extracted_doc_updated_at,
-        primary_owners=_extract_primary_owners(sf_object),
+        primary_owners=_extract_primary_owners(sf_object, records),
         metadata={},
     )
     return doc
+
+
+def convert_sf_objects_to_docs(
+    sf_objects: list[SalesforceObject],
+    sf_instance: str,
+) -> list[Document]:
+    """Converts a batch of parent objects, the children and owners of all of them are
+    looked up together rather than one query per record."""
+    parent_id_to_child_ids = get_child_ids_for_parents(
+        [sf_object.id for sf_object in sf_objects]
+    )
+
+    ids_to_fetch: set[str] = set()
+    for sf_object in sf_objects:
+        ids_to_fetch.update(parent_id_to_child_ids.get(sf_object.id, set()))
+        if last_modified_by_id := sf_object.data.get("LastModifiedById"):
+            ids_to_fetch.add(last_modified_by_id)
+    records = get_records(list(ids_to_fetch))
+
+    return [
+        _convert_sf_object_to_doc(
+            sf_object=sf_object,
+            sf_instance=sf_instance,
+            child_ids=parent_id_to_child_ids.get(sf_object.id, set()),
+            records=records,
+        )
+        for sf_object in sf_objects
+    ]
+
+
+def convert_sf_object_to_doc(
+    sf_object: SalesforceObject,
+    sf_instance: str,
+) -> Document:
+    return convert_sf_objects_to_docs([sf_object], sf_instance)[0]
@@ -2,8 +2,10 @@ import csv
 import json
 import os
 import sqlite3
+import threading
 from collections.abc import Iterator
 from contextlib import contextmanager
+from typing import Any
 
 from onyx.connectors.salesforce.utils import get_sqlite_db_path
 from onyx.connectors.salesforce.utils import SalesforceObject
@@ -13,20 +15,59 @@ from shared_configs.utils import batch_list
 
 logger = setup_logger()
 
+# SQLite typically has a limit of 999 variables per query
+_MAX_QUERY_VARIABLES = 500
+# Number of csv rows written to the db at a time
+_CSV_WRITE_BATCH_SIZE = 5000
+
+# connection shared by everything running inside of shared_db_connection on this thread
+_shared_connection = threading.local()
+
+
+def _connect() -> sqlite3.Connection:
+    # 60 second timeout for locks
+    return sqlite3.connect(get_sqlite_db_path(), timeout=60.0)
+
+
+@contextmanager
+def shared_db_connection() -> Iterator[sqlite3.Connection]:
+    """Keep a single connection open for everything on this thread until the context
+    exits instead of opening a new one for every call, e.g. for the length of a sync.
+    Connections are bound to the thread that created them, so other threads keep
+    opening their own."""
+    existing_conn: sqlite3.Connection | None = getattr(_shared_connection, "conn", None)
+    if existing_conn is not None:
+        yield existing_conn
+        return
+
+    os.makedirs(os.path.dirname(get_sqlite_db_path()), exist_ok=True)
+    conn = _connect()
+    # safe with WAL and much faster for the bulk writes of a sync
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    _shared_connection.conn = conn
+    try:
+        yield conn
+    finally:
+        _shared_connection.conn = None
+        conn.close()
+
 
 @contextmanager
 def get_db_connection(
     isolation_level: str | None = None,
 ) -> Iterator[sqlite3.Connection]:
     """Get a database connection with proper isolation level and error handling.
+    Reuses the connection of an enclosing shared_db_connection if there is one.
 
     Args:
         isolation_level: SQLite isolation level. None = default "DEFERRED",
             can be "IMMEDIATE" or "EXCLUSIVE" for more strict isolation.
     """
-    # 60 second timeout for locks
-    conn = sqlite3.connect(get_sqlite_db_path(), timeout=60.0)
+    shared_conn: sqlite3.Connection | None = getattr(_shared_connection, "conn", None)
+    conn = shared_conn or _connect()
 
+    previous_isolation_level = conn.isolation_level
     if isolation_level is not None:
         conn.isolation_level = isolation_level
     try:
@@ -35,7 +76,13 @@ def get_db_connection(
         conn.rollback()
         raise
     finally:
-        conn.close()
+        if shared_conn is None:
+            conn.close()
+        else:
+            # an uncommitted transaction is left for the caller to deal with, the
+            # isolation level can't be changed in the middle of one
+            if not conn.in_transaction:
+                conn.isolation_level = previous_isolation_level
 
 
 def init_db() -> None:
@@ -43,11 +90,12 @@ def init_db() -> None:
     # Create database directory if it doesn't exist
     os.makedirs(os.path.dirname(get_sqlite_db_path()), exist_ok=True)
 
+    # needs to be checked before connecting, connecting creates the file
+    db_exists = os.path.exists(get_sqlite_db_path())
+
     with get_db_connection("EXCLUSIVE") as conn:
         cursor = conn.cursor()
 
-        db_exists = os.path.exists(get_sqlite_db_path())
-
         if not db_exists:
             # Enable WAL mode for better concurrent access and write performance
             cursor.execute("PRAGMA journal_mode=WAL")
@@ -158,68 +206,84 @@ def init_db() -> None:
 
 
 def _update_relationship_tables(
-    conn: sqlite3.Connection, child_id: str, parent_ids: set[str]
+    conn: sqlite3.Connection, child_id_to_parent_ids: dict[str, set[str]]
 ) -> None:
-    """Update the relationship tables when a record is updated.
+    """Update the relationship tables for a batch of updated records. The new
+    relationships are staged in temp tables so that the diff against the existing ones
+    is done with a handful of set based statements instead of queries per record.
 
     Args:
         conn: The database connection to use (must be in a transaction)
-        child_id: The ID of the child record
-        parent_ids: Set of parent IDs to link to
+        child_id_to_parent_ids: Maps the ID of each updated record to the full set of
+            parent IDs it should be linked to
     """
     try:
         cursor = conn.cursor()
-
-        # Get existing parent IDs
         cursor.execute(
-            "SELECT parent_id FROM relationships WHERE child_id = ?", (child_id,)
+            """
+            CREATE TEMP TABLE IF NOT EXISTS staged_children (
+                child_id TEXT PRIMARY KEY
+            ) WITHOUT ROWID
+            """
         )
-        old_parent_ids = {row[0] for row in cursor.fetchall()}
-
-        # Calculate differences
-        parent_ids_to_remove = old_parent_ids - parent_ids
-        parent_ids_to_add = parent_ids - old_parent_ids
+        cursor.execute(
+            """
+            CREATE TEMP TABLE IF NOT EXISTS staged_relationships (
+                child_id TEXT NOT NULL,
+                parent_id TEXT NOT NULL,
+                PRIMARY KEY (child_id, parent_id)
+            ) WITHOUT ROWID
+            """
+        )
+        cursor.execute("DELETE FROM staged_children")
+        cursor.execute("DELETE FROM staged_relationships")
 
-        # Remove old relationships
-        if parent_ids_to_remove:
-            cursor.executemany(
-                "DELETE FROM relationships WHERE child_id = ? AND parent_id = ?",
-                [(child_id, pid) for pid in parent_ids_to_remove],
-            )
-            # Also remove from relationship_types
-            cursor.executemany(
-                "DELETE FROM relationship_types WHERE child_id = ? AND parent_id = ?",
-                [(child_id, pid) for pid in parent_ids_to_remove],
-            )
+        cursor.executemany(
+            "INSERT INTO staged_children (child_id) VALUES (?)",
+            [(child_id,) for child_id in child_id_to_parent_ids],
+        )
+        cursor.executemany(
+            "INSERT INTO staged_relationships (child_id, parent_id) VALUES (?, ?)",
+            [
+                (child_id, parent_id)
+                for child_id, parent_ids in child_id_to_parent_ids.items()
+                for parent_id in parent_ids
+            ],
+        )
 
-        # Add new relationships
-        if parent_ids_to_add:
-            # First add to relationships table
-            cursor.executemany(
-                "INSERT INTO relationships (child_id, parent_id) VALUES (?, ?)",
-                [(child_id, pid) for pid in parent_ids_to_add],
+        # Remove relationships that the updated records no longer have
+        for table in ("relationships", "relationship_types"):
+            cursor.execute(
+                f"""
+                DELETE FROM {table}
+                WHERE child_id IN (SELECT child_id FROM staged_children)
+                AND NOT EXISTS (
+                    SELECT 1 FROM staged_relationships AS staged
+                    WHERE staged.child_id = {table}.child_id
+                    AND staged.parent_id = {table}.parent_id
+                )
+                """
             )
 
-            # Then get the types of the parent objects and add to relationship_types
-            for parent_id in parent_ids_to_add:
-                cursor.execute(
-                    "SELECT object_type FROM salesforce_objects WHERE id = ?",
-                    (parent_id,),
-                )
-                result = cursor.fetchone()
-                if result:
-                    parent_type = result[0]
-                    cursor.execute(
-                        """
-                        INSERT INTO relationship_types (child_id, parent_id, parent_type)
-                        VALUES (?, ?, ?)
-                        """,
-                        (child_id, parent_id, parent_type),
-                    )
+        # Add the new ones, along with the type of the parent if it is known
+        cursor.execute(
+            """
+            INSERT OR IGNORE INTO relationships (child_id, parent_id)
+            SELECT child_id, parent_id FROM staged_relationships
+            """
+        )
+        cursor.execute(
+            """
+            INSERT OR IGNORE INTO relationship_types (child_id, parent_id, parent_type)
+            SELECT staged.child_id, staged.parent_id, objects.object_type
+            FROM staged_relationships AS staged
+            JOIN salesforce_objects AS objects ON objects.id = staged.parent_id
+            """
+        )
 
     except Exception as e:
         logger.error(f"Error updating relationship tables: {e}")
-        logger.error(f"Child ID: {child_id}, Parent IDs: {parent_ids}")
+        logger.error(f"Child IDs: {list(child_id_to_parent_ids)}")
         raise
 
 
@@ -239,17 +303,35 @@ def _update_user_email_map(conn: sqlite3.Connection) -> None:
     )
 
 
+def _write_csv_batch(
+    conn: sqlite3.Connection,
+    object_type: str,
+    id_to_row: dict[str, dict[str, Any]],
+    child_id_to_parent_ids: dict[str, set[str]],
+) -> None:
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO salesforce_objects (id, object_type, data)
+        VALUES (?, ?, ?)
+        """,
+        [(id, object_type, json.dumps(row)) for id, row in id_to_row.items()],
+    )
+    _update_relationship_tables(conn, child_id_to_parent_ids)
+
+
 def update_sf_db_with_csv(
     object_type: str,
     csv_download_path: str,
     delete_csv_after_use: bool = True,
 ) -> list[str]:
-    """Update the SF DB with a CSV file using SQLite storage."""
+    """Update the SF DB with a CSV file using SQLite storage. Rows are written in
+    batches, if a record shows up more than once the last row wins."""
     updated_ids = []
 
     # Use IMMEDIATE to get a write lock at the start of the transaction
     with get_db_connection("IMMEDIATE") as conn:
-        cursor = conn.cursor()
+        id_to_row: dict[str, dict[str, Any]] = {}
+        child_id_to_parent_ids: dict[str, set[str]] = {}
 
         with open(csv_download_path, "r", newline="", encoding="utf-8") as f:
             reader = csv.DictReader(f)
@@ -276,19 +358,20 @@ def update_sf_db_with_csv(
                     if field != "LastModifiedById":
                         del row[field]
 
-                # Update main object data
-                cursor.execute(
-                    """
-                    INSERT OR REPLACE INTO salesforce_objects (id, object_type, data)
-                    VALUES (?, ?, ?)
-                    """,
-                    (id, object_type, json.dumps(row)),
-                )
-
-                # Update relationships using the same connection
-                _update_relationship_tables(conn, id, parent_ids)
+                id_to_row[id] = row
+                child_id_to_parent_ids[id] = parent_ids
                 updated_ids.append(id)
 
+                if len(id_to_row) >= _CSV_WRITE_BATCH_SIZE:
+                    _write_csv_batch(
+                        conn, object_type, id_to_row, child_id_to_parent_ids
+                    )
+                    id_to_row = {}
+                    child_id_to_parent_ids = {}
+
+        if id_to_row:
+            _write_csv_batch(conn, object_type, id_to_row, child_id_to_parent_ids)
+
         # If we're updating User objects, update the email map
         if object_type == "User":
             _update_user_email_map(conn)
@@ -331,25 +414,65 @@ def get_type_from_id(object_id: str) -> str | None:
         return result[0]
 
 
+def get_child_ids_for_parents(parent_ids: list[str]) -> dict[str, set[str]]:
+    """Get the child IDs of each of the given parent IDs. Parents without children
+    are left out."""
+    parent_id_to_child_ids: dict[str, set[str]] = {}
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        for batch_ids in batch_list(list(set(parent_ids)), _MAX_QUERY_VARIABLES):
+            id_placeholders = ",".join(["?" for _ in batch_ids])
+            cursor.execute(
+                f"""
+                SELECT parent_id, child_id FROM relationships INDEXED BY idx_parent_id
+                WHERE parent_id IN ({id_placeholders})
+                """,
+                batch_ids,
+            )
+            for parent_id, child_id in cursor.fetchall():
+                parent_id_to_child_ids.setdefault(parent_id, set()).add(child_id)
+    return parent_id_to_child_ids
+
+
 def get_record(
     object_id: str, object_type: str | None = None
 ) -> SalesforceObject | None:
     """Retrieve the record and return it as a SalesforceObject."""
-    if object_type is None:
-        object_type = get_type_from_id(object_id)
-        if not object_type:
-            return None
-
     with get_db_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT data FROM salesforce_objects WHERE id = ?", (object_id,))
+        cursor.execute(
+            "SELECT object_type, data FROM salesforce_objects WHERE id = ?",
+            (object_id,),
+        )
         result = cursor.fetchone()
         if not result:
             logger.warning(f"Object ID {object_id} not found")
             return None
 
-        data = json.loads(result[0])
-        return SalesforceObject(id=object_id, type=object_type, data=data)
+        data = json.loads(result[1])
+        return SalesforceObject(id=object_id, type=object_type or result[0], data=data)
+
+
+def get_records(object_ids: list[str]) -> dict[str, SalesforceObject]:
+    """Retrieve many records at once, keyed by ID. Records that aren't found are left
+    out."""
+    records: dict[str, SalesforceObject] = {}
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        for batch_ids in batch_list(list(set(object_ids)), _MAX_QUERY_VARIABLES):
+            id_placeholders = ",".join(["?" for _ in batch_ids])
+            cursor.execute(
+                f"""
+                SELECT id, object_type, data FROM salesforce_objects
+                WHERE id IN ({id_placeholders})
+                """,
+                batch_ids,
+            )
+            for object_id, object_type, data in cursor.fetchall():
+                records[object_id] = SalesforceObject(
+                    id=object_id, type=object_type, data=json.loads(data)
+                )
+    return records
 
 
 def find_ids_by_type(object_type: str) -> list[str]:
@@ -365,7 +488,7 @@ def find_ids_by_type(object_type: str) -> list[str]:
 def get_affected_parent_ids_by_type(
     updated_ids: list[str],
     parent_types: list[str],
-    batch_size: int = 500,
+    batch_size: int = _MAX_QUERY_VARIABLES,
 ) -> Iterator[tuple[str, set[str]]]:
     """Get IDs of objects that are of the specified parent types and are either in the
     updated_ids or have children in the updated_ids. Yields tuples of (parent_type, affected_ids).
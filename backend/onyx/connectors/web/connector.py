@@ -1,6 +1,13 @@
 import io
 import ipaddress
+import queue
 import socket
+import threading
+import time
+from collections import defaultdict
+from collections import deque
+from dataclasses import dataclass
+from dataclasses import field
 from datetime import datetime
 from datetime import timezone
 from enum import Enum
@@ -14,12 +21,16 @@ import requests
 from bs4 import BeautifulSoup
 from oauthlib.oauth2 import BackendApplicationClient
 from playwright.sync_api import BrowserContext
+from playwright.sync_api import Page
 from playwright.sync_api import Playwright
 from playwright.sync_api import sync_playwright
 from requests_oauthlib import OAuth2Session  # type:ignore
 from urllib3.exceptions import MaxRetryError
 
 from onyx.configs.app_configs import INDEX_BATCH_SIZE
+from onyx.configs.app_configs import WEB_CONNECTOR_MAX_CONCURRENT_PAGES
+from onyx.configs.app_configs import WEB_CONNECTOR_MAX_CONCURRENT_PAGES_PER_HOST
+from onyx.configs.app_configs import WEB_CONNECTOR_MIN_HOST_REQUEST_INTERVAL
 from onyx.configs.app_configs import WEB_CONNECTOR_OAUTH_CLIENT_ID
 from onyx.configs.app_configs import WEB_CONNECTOR_OAUTH_CLIENT_SECRET
 from onyx.configs.app_configs import WEB_CONNECTOR_OAUTH_TOKEN_URL
@@ -34,6 +45,7 @@ from onyx.connectors.interfaces import LoadConnector
 from onyx.connectors.models import Document
 from onyx.connectors.models import Section
 from onyx.file_processing.extract_file_text import read_pdf_file
+from onyx.file_processing.html_utils import ParsedHTML
 from onyx.file_processing.html_utils import web_html_cleanup
 from onyx.utils.logger import setup_logger
 from onyx.utils.sitemap import list_pages_for_site
@@ -42,6 +54,14 @@ from shared_configs.configs import MULTI_TENANT
 logger = setup_logger()
 
 WEB_CONNECTOR_MAX_SCROLL_ATTEMPTS = 20
+# Timeout for plain HTTP fetches done by the concurrent crawl
+WEB_CONNECTOR_HTTP_TIMEOUT = 30
+# Pages fetched over plain HTTP with less text than this are assumed to be rendered
+# client side and are loaded in the browser instead
+WEB_CONNECTOR_MIN_STATIC_TEXT_LENGTH = 200
+# Pages the plain HTTP fetch gets these statuses for are skipped without rendering them,
+# a browser won't find them either
+WEB_CONNECTOR_MISSING_PAGE_STATUS_CODES = (404, 410)
 
 
 class WEB_CONNECTOR_VALID_SETTINGS(str, Enum):
@@ -150,27 +170,36 @@ def get_internal_links(
     return internal_links
 
 
-def start_playwright() -> Tuple[Playwright, BrowserContext]:
+def _get_oauth_headers() -> dict[str, str]:
+    if not (
+        WEB_CONNECTOR_OAUTH_CLIENT_ID
+        and WEB_CONNECTOR_OAUTH_CLIENT_SECRET
+        and WEB_CONNECTOR_OAUTH_TOKEN_URL
+    ):
+        return {}
+
+    client = BackendApplicationClient(client_id=WEB_CONNECTOR_OAUTH_CLIENT_ID)
+    oauth = OAuth2Session(client=client)
+    token = oauth.fetch_token(
+        token_url=WEB_CONNECTOR_OAUTH_TOKEN_URL,
+        client_id=WEB_CONNECTOR_OAUTH_CLIENT_ID,
+        client_secret=WEB_CONNECTOR_OAUTH_CLIENT_SECRET,
+    )
+    return {"Authorization": "Bearer {}".format(token["access_token"])}
+
+
+def start_playwright(
+    extra_http_headers: dict[str, str] | None = None,
+) -> Tuple[Playwright, BrowserContext]:
     playwright = sync_playwright().start()
     browser = playwright.chromium.launch(headless=True)
 
     context = browser.new_context()
 
-    if (
-        WEB_CONNECTOR_OAUTH_CLIENT_ID
-        and WEB_CONNECTOR_OAUTH_CLIENT_SECRET
-        and WEB_CONNECTOR_OAUTH_TOKEN_URL
-    ):
-        client = BackendApplicationClient(client_id=WEB_CONNECTOR_OAUTH_CLIENT_ID)
-        oauth = OAuth2Session(client=client)
-        token = oauth.fetch_token(
-            token_url=WEB_CONNECTOR_OAUTH_TOKEN_URL,
-            client_id=WEB_CONNECTOR_OAUTH_CLIENT_ID,
-            client_secret=WEB_CONNECTOR_OAUTH_CLIENT_SECRET,
-        )
-        context.set_extra_http_headers(
-            {"Authorization": "Bearer {}".format(token["access_token"])}
-        )
+    if extra_http_headers is None:
+        extra_http_headers = _get_oauth_headers()
+    if extra_http_headers:
+        context.set_extra_http_headers(extra_http_headers)
 
     return playwright, context
 
@@ -233,6 +262,154 @@ def _get_datetime_from_last_modified_header(last_modified: str) -> datetime | No
         return None
 
 
+def _get_host(url: str) -> str:
+    return urlparse(url).netloc
+
+
+def _scroll_to_bottom(page: Page) -> None:
+    scroll_attempts = 0
+    previous_height = page.evaluate("document.body.scrollHeight")
+    while scroll_attempts < WEB_CONNECTOR_MAX_SCROLL_ATTEMPTS:
+        page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+        page.wait_for_load_state("networkidle", timeout=30000)
+        new_height = page.evaluate("document.body.scrollHeight")
+        if new_height == previous_height:
+            break  # Stop scrolling when no more content is loaded
+        previous_height = new_height
+        scroll_attempts += 1
+
+
+def _build_pdf_document(
+    url: str, content: bytes, last_modified: str | None
+) -> Document:
+    page_text, metadata = read_pdf_file(file=io.BytesIO(content))
+    return Document(
+        id=url,
+        sections=[Section(link=url, text=page_text)],
+        source=DocumentSource.WEB,
+        semantic_identifier=url.split("/")[-1],
+        metadata=metadata,
+        doc_updated_at=_get_datetime_from_last_modified_header(last_modified)
+        if last_modified
+        else None,
+    )
+
+
+def _build_html_document(
+    url: str, parsed_html: ParsedHTML, last_modified: str | None
+) -> Document:
+    return Document(
+        id=url,
+        sections=[Section(link=url, text=parsed_html.cleaned_text)],
+        source=DocumentSource.WEB,
+        semantic_identifier=parsed_html.title or url,
+        metadata={},
+        doc_updated_at=_get_datetime_from_last_modified_header(last_modified)
+        if last_modified
+        else None,
+    )
+
+
+@dataclass
+class _CrawledPage:
+    # the url that was requested, final_url is where it ended up after redirects
+    url: str
+    final_url: str
+    document: Document | None = None
+    internal_links: set[str] = field(default_factory=set)
+    error: str | None = None
+
+
+class _HostRateLimiter:
+    """Politeness limits for the concurrent crawl. Caps the number of pages being
+    fetched from a host at once and spaces out the start of requests to the same host.
+    """
+
+    def __init__(self, max_in_flight_per_host: int, min_request_interval: float):
+        self.max_in_flight_per_host = max_in_flight_per_host
+        self.min_request_interval = min_request_interval
+
+        self._lock = threading.Lock()
+        self._in_flight: dict[str, int] = defaultdict(int)
+        self._next_request_at: dict[str, float] = {}
+
+    def try_acquire(self, host: str) -> bool:
+        with self._lock:
+            if self._in_flight[host] >= self.max_in_flight_per_host:
+                return False
+            self._in_flight[host] += 1
+            return True
+
+    def release(self, host: str) -> None:
+        with self._lock:
+            self._in_flight[host] -= 1
+            if self._in_flight[host] <= 0:
+                del self._in_flight[host]
+
+    def wait_for_turn(self, host: str) -> None:
+        with self._lock:
+            now = time.monotonic()
+            request_at = max(now, self._next_request_at.get(host, now))
+            self._next_request_at[host] = request_at + self.min_request_interval
+
+        if request_at > now:
+            time.sleep(request_at - now)
+
+
+class _CrawlWorkerClients:
+    """The HTTP session and lazily started browser of a single crawl worker. Playwright's
+    sync API is bound to the thread that started it, so only the worker that owns these
+    may use or close them. Both are restarted every `pages_before_restart` pages to keep
+    the browser's memory in check, the same way the serial crawl restarts per batch."""
+
+    def __init__(self, pages_before_restart: int) -> None:
+        self.pages_before_restart = pages_before_restart
+
+        self._num_pages = 0
+        self._headers: dict[str, str] | None = None
+        self._session: requests.Session | None = None
+        self._playwright: Playwright | None = None
+        self._context: BrowserContext | None = None
+
+    def _get_headers(self) -> dict[str, str]:
+        if self._headers is None:
+            self._headers = _get_oauth_headers()
+        return self._headers
+
+    def get_session(self) -> requests.Session:
+        if self._session is None:
+            self._session = requests.Session()
+            self._session.headers.update(self._get_headers())
+        return self._session
+
+    def get_browser_context(self) -> BrowserContext:
+        if self._context is None:
+            self._playwright, self._context = start_playwright(
+                extra_http_headers=self._get_headers()
+            )
+        return self._context
+
+    def page_done(self) -> None:
+        self._num_pages += 1
+        if self._num_pages >= self.pages_before_restart:
+            self.close()
+
+    def close(self) -> None:
+        if self._playwright is not None:
+            try:
+                self._playwright.stop()
+            except Exception:
+                logger.exception("Failed to stop Playwright")
+        if self._session is not None:
+            self._session.close()
+
+        self._num_pages = 0
+        self._headers = None
+        self._session = None
+        self._playwright = None
+        self._context = None
+
+
 class WebConnector(LoadConnector):
     def __init__(
         self,
@@ -286,6 +463,10 @@ class WebConnector(LoadConnector):
     def load_from_state(self) -> GenerateDocumentsOutput:
         """Traverses through all pages found on the website
         and converts them into documents"""
+        if WEB_CONNECTOR_MAX_CONCURRENT_PAGES > 1:
+            yield from self._load_concurrently(WEB_CONNECTOR_MAX_CONCURRENT_PAGES)
+            return
+
         visited_links: set[str] = set()
         to_visit: list[str] = self.to_visit_list
 
@@ -325,23 +506,11 @@ class WebConnector(LoadConnector):
                 if current_url.split(".")[-1] == "pdf":
                     # PDF files are not checked for links
                     response = requests.get(current_url)
-                    page_text, metadata = read_pdf_file(
-                        file=io.BytesIO(response.content)
-                    )
-                    last_modified = response.headers.get("Last-Modified")
-
                     doc_batch.append(
-                        Document(
-                            id=current_url,
-                            sections=[Section(link=current_url, text=page_text)],
-                            source=DocumentSource.WEB,
-                            semantic_identifier=current_url.split("/")[-1],
-                            metadata=metadata,
-                            doc_updated_at=_get_datetime_from_last_modified_header(
-                                last_modified
-                            )
-                            if last_modified
-                            else None,
+                        _build_pdf_document(
+                            current_url,
+                            response.content,
+                            response.headers.get("Last-Modified"),
                         )
                     )
                     continue
@@ -364,16 +533,7 @@ class WebConnector(LoadConnector):
                     visited_links.add(current_url)
 
                 if self.scroll_before_scraping:
-                    scroll_attempts = 0
-                    previous_height = page.evaluate("document.body.scrollHeight")
-                    while scroll_attempts < WEB_CONNECTOR_MAX_SCROLL_ATTEMPTS:
-                        page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                        page.wait_for_load_state("networkidle", timeout=30000)
-                        new_height = page.evaluate("document.body.scrollHeight")
-                        if new_height == previous_height:
-                            break  # Stop scrolling when no more content is loaded
-                        previous_height = new_height
-                        scroll_attempts += 1
+                    _scroll_to_bottom(page)
 
                 content = page.content()
                 soup = BeautifulSoup(content, "html.parser")
@@ -392,20 +552,7 @@ class WebConnector(LoadConnector):
                 parsed_html = web_html_cleanup(soup, self.mintlify_cleanup)
 
                 doc_batch.append(
-                    Document(
-                        id=current_url,
-                        sections=[
-                            Section(link=current_url, text=parsed_html.cleaned_text)
-                        ],
-                        source=DocumentSource.WEB,
-                        semantic_identifier=parsed_html.title or current_url,
-                        metadata={},
-                        doc_updated_at=_get_datetime_from_last_modified_header(
-                            last_modified
-                        )
-                        if last_modified
-                        else None,
-                    )
+                    _build_html_document(current_url, parsed_html, last_modified)
                 )
 
                 page.close()
@@ -433,6 +580,251 @@ class WebConnector(LoadConnector):
                 raise RuntimeError(last_error)
             raise RuntimeError("No valid pages found.")
 
+    def _fetch_static_page(
+        self, url: str, base_url: str, session: requests.Session
+    ) -> _CrawledPage | None:
+        """Plain HTTP fetch, much cheaper than rendering the page in a browser. Returns
+        None if the page has to be rendered instead, e.g. because its content is built
+        client side or because the server refused a non browser client."""
+        response = session.get(url, timeout=WEB_CONNECTOR_HTTP_TIMEOUT)
+        is_html = "text/html" in response.headers.get("Content-Type", "")
+        is_missing = response.status_code in WEB_CONNECTOR_MISSING_PAGE_STATUS_CODES
+        if not is_missing and (not response.ok or not is_html):
+            return None
+
+        final_url = response.url
+        if final_url != url:
+            logger.info(f"Redirected to {final_url}")
+            protected_url_check(final_url)
+
+        # let BeautifulSoup pick the encoding, requests falls back to latin-1 for html
+        soup = BeautifulSoup(response.content if is_html else b"", "html.parser")
+        internal_links = (
+            get_internal_links(base_url, final_url, soup) if self.recursive else set()
+        )
+        if is_missing:
+            error = f"Skipped indexing {final_url} due to HTTP {response.status_code} response"
+            logger.info(error)
+            return _CrawledPage(
+                url=url, final_url=final_url, internal_links=internal_links, error=error
+            )
+
+        parsed_html = web_html_cleanup(soup, self.mintlify_cleanup)
+        if len(parsed_html.cleaned_text) < WEB_CONNECTOR_MIN_STATIC_TEXT_LENGTH:
+            return None
+
+        return _CrawledPage(
+            url=url,
+            final_url=final_url,
+            document=_build_html_document(
+                final_url, parsed_html, response.headers.get("Last-Modified")
+            ),
+            internal_links=internal_links,
+        )
+
+    def _render_page(
+        self, url: str, base_url: str, context: BrowserContext
+    ) -> _CrawledPage:
+        page = context.new_page()
+        try:
+            page_response = page.goto(url)
+            last_modified = (
+                page_response.header_value("Last-Modified") if page_response else None
+            )
+            final_url = page.url
+            if final_url != url:
+                logger.info(f"Redirected to {final_url}")
+                protected_url_check(final_url)
+
+            if self.scroll_before_scraping:
+                _scroll_to_bottom(page)
+
+            soup = BeautifulSoup(page.content(), "html.parser")
+        finally:
+            page.close()
+
+        internal_links = (
+            get_internal_links(base_url, final_url, soup) if self.recursive else set()
+        )
+        if page_response and str(page_response.status)[0] in ("4", "5"):
+            error = f"Skipped indexing {final_url} due to HTTP {page_response.status} response"
+            logger.info(error)
+            return _CrawledPage(
+                url=url, final_url=final_url, internal_links=internal_links, error=error
+            )
+
+        parsed_html = web_html_cleanup(soup, self.mintlify_cleanup)
+        return _CrawledPage(
+            url=url,
+            final_url=final_url,
+            document=_build_html_document(final_url, parsed_html, last_modified),
+            internal_links=internal_links,
+        )
+
+    def _crawl_page(
+        self, url: str, base_url: str, clients: _CrawlWorkerClients
+    ) -> _CrawledPage:
+        try:
+            protected_url_check(url)
+        except Exception as e:
+            error = f"Invalid URL {url} due to {e}"
+            logger.warning(error)
+            return _CrawledPage(url=url, final_url=url, error=error)
+
+        logger.info(f"Visiting {url}")
+
+        try:
+            if url.split(".")[-1] == "pdf":
+                # PDF files are not checked for links
+                response = clients.get_session().get(
+                    url, timeout=WEB_CONNECTOR_HTTP_TIMEOUT
+                )
+                crawled_page = _CrawledPage(
+                    url=url,
+                    final_url=url,
+                    document=_build_pdf_document(
+                        url, response.content, response.headers.get("Last-Modified")
+                    ),
+                )
+            else:
+                static_page = (
+                    None
+                    if self.scroll_before_scraping
+                    else self._fetch_static_page(url, base_url, clients.get_session())
+                )
+                crawled_page = static_page or self._render_page(
+                    url, base_url, clients.get_browser_context()
+                )
+        except Exception as e:
+            error = f"Failed to fetch '{url}': {e}"
+            logger.exception(error)
+            # start from a fresh browser for the next page
+            clients.close()
+            return _CrawledPage(url=url, final_url=url, error=error)
+
+        clients.page_done()
+        return crawled_page
+
+    def _crawl_worker(
+        self,
+        base_url: str,
+        urls_to_crawl: "queue.Queue[str | None]",
+        crawled_pages: "queue.Queue[_CrawledPage]",
+        rate_limiter: _HostRateLimiter,
+    ) -> None:
+        clients = _CrawlWorkerClients(pages_before_restart=self.batch_size)
+        try:
+            while (url := urls_to_crawl.get()) is not None:
+                rate_limiter.wait_for_turn(_get_host(url))
+                crawled_pages.put(self._crawl_page(url, base_url, clients))
+        finally:
+            clients.close()
+
+    def _load_concurrently(self, num_workers: int) -> GenerateDocumentsOutput:
+        """Same traversal as the serial crawl, but pages are fetched by a pool of worker
+        threads. Each worker tries a plain HTTP fetch first and only renders the page in
+        its own browser when needed. This thread owns the frontier, hands out at most
+        one url per idle worker while respecting the per host limits, and batches up
+        the resulting documents."""
+        if not self.to_visit_list:
+            raise ValueError("No URLs to visit")
+
+        base_url = self.to_visit_list[0]  # For the recursive case
+        doc_batch: list[Document] = []
+
+        # Needed to report error
+        at_least_one_doc = False
+        last_error = None
+
+        visited_links: set[str] = set()
+        # urls still to visit, grouped by host so that a host at its politeness limit
+        # doesn't hold up the others
+        frontier: dict[str, deque[str]] = defaultdict(deque)
+
+        def _add_to_frontier(url: str) -> None:
+            if url not in visited_links:
+                visited_links.add(url)
+                frontier[_get_host(url)].append(url)
+
+        for url in self.to_visit_list:
+            _add_to_frontier(url)
+
+        rate_limiter = _HostRateLimiter(
+            max_in_flight_per_host=WEB_CONNECTOR_MAX_CONCURRENT_PAGES_PER_HOST,
+            min_request_interval=WEB_CONNECTOR_MIN_HOST_REQUEST_INTERVAL,
+        )
+        urls_to_crawl: queue.Queue[str | None] = queue.Queue()
+        crawled_pages: queue.Queue[_CrawledPage] = queue.Queue()
+        workers = [
+            threading.Thread(
+                target=self._crawl_worker,
+                args=(base_url, urls_to_crawl, crawled_pages, rate_limiter),
+                daemon=True,
+            )
+            for _ in range(num_workers)
+        ]
+        for worker in workers:
+            worker.start()
+
+        num_in_flight = 0
+        try:
+            while True:
+                for host in list(frontier):
+                    host_urls = frontier[host]
+                    while (
+                        host_urls
+                        and num_in_flight < num_workers
+                        and rate_limiter.try_acquire(host)
+                    ):
+                        urls_to_crawl.put(host_urls.popleft())
+                        num_in_flight += 1
+                    if not host_urls:
+                        del frontier[host]
+
+                if num_in_flight == 0:
+                    break
+
+                crawled_page = crawled_pages.get()
+                num_in_flight -= 1
+                rate_limiter.release(_get_host(crawled_page.url))
+
+                # like the serial crawl, nothing is taken from a page that was
+                # redirected to an already visited one, not even its links
+                if crawled_page.final_url != crawled_page.url:
+                    if crawled_page.final_url in visited_links:
+                        logger.info("Redirected page already indexed")
+                        continue
+                    visited_links.add(crawled_page.final_url)
+
+                for link in crawled_page.internal_links:
+                    _add_to_frontier(link)
+
+                if crawled_page.error:
+                    last_error = crawled_page.error
+                    continue
+
+                if crawled_page.document is None:
+                    continue
+
+                doc_batch.append(crawled_page.document)
+                if len(doc_batch) >= self.batch_size:
+                    at_least_one_doc = True
+                    yield doc_batch
+                    doc_batch = []
+        finally:
+            # the workers are daemons, no need to wait for pages that are still loading
+            for _ in workers:
+                urls_to_crawl.put(None)
+
+        if doc_batch:
+            at_least_one_doc = True
+            yield doc_batch
+
+        if not at_least_one_doc:
+            if last_error:
+                raise RuntimeError(last_error)
+            raise RuntimeError("No valid pages found.")
+
     def validate_connector_settings(self) -> None:
         # Make sure we have at least one valid URL to check
         if not self.to_visit_list:
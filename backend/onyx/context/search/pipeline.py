@@ -14,23 +14,22 @@ from onyx.configs.chat_configs import DISABLE_LLM_DOC_RELEVANCE
 from onyx.context.search.enums import LLMEvaluationType
 from onyx.context.search.enums import QueryFlow
 from onyx.context.search.enums import SearchType
-from onyx.context.search.models import IndexFilters
 from onyx.context.search.models import InferenceChunk
 from onyx.context.search.models import InferenceSection
 from onyx.context.search.models import RerankMetricsContainer
 from onyx.context.search.models import RetrievalMetricsContainer
 from onyx.context.search.models import SearchQuery
 from onyx.context.search.models import SearchRequest
-from onyx.context.search.postprocessing.postprocessing import cleanup_chunks
 from onyx.context.search.postprocessing.postprocessing import search_postprocessing
 from onyx.context.search.preprocessing.preprocessing import retrieval_preprocessing
+from onyx.context.search.retrieval.retrieval_context import RetrievalContext
 from onyx.context.search.retrieval.search_runner import (
     retrieve_chunks,
 )
 from onyx.context.search.utils import inference_section_from_chunks
 from onyx.context.search.utils import relevant_sections_to_indices
+from onyx.db.document import fetch_chunk_counts_for_documents
 from onyx.db.models import User
-from onyx.db.search_settings import get_current_search_settings
 from onyx.document_index.factory import get_default_document_index
 from onyx.document_index.interfaces import VespaChunkRequest
 from onyx.llm.interfaces import LLM
@@ -61,6 +60,7 @@ class SearchPipeline:
         | None = None,
         rerank_metrics_callback: Callable[[RerankMetricsContainer], None] | None = None,
         prompt_config: PromptConfig | None = None,
+        retrieval_context: RetrievalContext | None = None,
     ):
         # NOTE: The Search Request contains a lot of fields that are overrides, many of them can be None
         # and typically are None. The preprocessing will fetch default values to replace these empty overrides.
@@ -74,7 +74,12 @@ class SearchPipeline:
         self.retrieval_metrics_callback = retrieval_metrics_callback
         self.rerank_metrics_callback = rerank_metrics_callback
 
-        self.search_settings = get_current_search_settings(db_session)
+        # Shared by all of the searches of a request so that they don't redo the same
+        # lookups or refetch the same surrounding chunks
+        self.retrieval_context = retrieval_context or RetrievalContext()
+        self.chunk_cache = self.retrieval_context.chunk_cache
+
+        self.search_settings = self.retrieval_context.get_search_settings(db_session)
         self.document_index = get_default_document_index(self.search_settings, None)
         self.prompt_config: PromptConfig | None = prompt_config
 
@@ -113,6 +118,7 @@ class SearchPipeline:
             skip_query_analysis=self.skip_query_analysis,
             db_session=self.db_session,
             bypass_acl=self.bypass_acl,
+            retrieval_context=self.retrieval_context,
         )
         self._search_query = final_search_query
         self._predicted_search_type = final_search_query.search_type
@@ -154,6 +160,8 @@ class SearchPipeline:
             document_index=self.document_index,
             db_session=self.db_session,
             retrieval_metrics_callback=self.retrieval_metrics_callback,
+            chunk_cache=self.chunk_cache,
+            search_settings=self.search_settings,
         )
 
         return cast(list[InferenceChunk], self._retrieved_chunks)
@@ -198,24 +206,28 @@ class SearchPipeline:
 
         # Full doc setting takes priority
         if self.search_query.full_doc:
-            seen_document_ids = set()
-
             # This preserves the ordering since the chunks are retrieved in score order
-            for chunk in censored_chunks:
-                if chunk.document_id not in seen_document_ids:
-                    seen_document_ids.add(chunk.document_id)
-                    chunk_requests.append(
-                        VespaChunkRequest(
-                            document_id=chunk.document_id,
-                        )
+            document_ids = list(
+                dict.fromkeys(chunk.document_id for chunk in censored_chunks)
+            )
+            # Documents with a known chunk count are fetched as capped ranges so that
+            # they can be batched together rather than visited one by one
+            for document_id, chunk_count in fetch_chunk_counts_for_documents(
+                document_ids, self.db_session
+            ):
+                chunk_requests.append(
+                    VespaChunkRequest(
+                        document_id=document_id,
+                        min_chunk_ind=0 if chunk_count else None,
+                        max_chunk_ind=chunk_count - 1 if chunk_count else None,
                     )
+                )
 
             inference_chunks.extend(
-                cleanup_chunks(
-                    self.document_index.id_based_retrieval(
-                        chunk_requests=chunk_requests,
-                        filters=IndexFilters(access_control_list=None),
-                    )
+                self.chunk_cache.retrieve(
+                    document_index=self.document_index,
+                    chunk_requests=chunk_requests,
+                    batch_retrieval=True,
                 )
             )
 
@@ -285,12 +297,10 @@ class SearchPipeline:
 
         if chunk_requests:
             inference_chunks.extend(
-                cleanup_chunks(
-                    self.document_index.id_based_retrieval(
-                        chunk_requests=chunk_requests,
-                        filters=IndexFilters(access_control_list=None),
-                        batch_retrieval=True,
-                    )
+                self.chunk_cache.retrieve(
+                    document_index=self.document_index,
+                    chunk_requests=chunk_requests,
+                    batch_retrieval=True,
                 )
             )
 
@@ -20,6 +20,7 @@ from onyx.context.search.models import SearchRequest
 from onyx.context.search.preprocessing.access_filters import (
     build_access_filters_for_user,
 )
+from onyx.context.search.retrieval.retrieval_context import RetrievalContext
 from onyx.context.search.retrieval.search_runner import (
     remove_stop_words_and_punctuation,
 )
@@ -55,6 +56,7 @@ def retrieval_preprocessing(
     favor_recent_decay_multiplier: float = FAVOR_RECENT_DECAY_MULTIPLIER,
     base_recency_decay: float = BASE_RECENCY_DECAY,
     bypass_acl: bool = False,
+    retrieval_context: RetrievalContext | None = None,
 ) -> SearchQuery:
     """Logic is as follows:
     Any global disables apply first
@@ -158,7 +160,11 @@ def retrieval_preprocessing(
     )
 
     user_acl_filters = (
-        None if bypass_acl else build_access_filters_for_user(user, db_session)
+        None
+        if bypass_acl
+        else retrieval_context.get_access_filters(user, db_session)
+        if retrieval_context is not None
+        else build_access_filters_for_user(user, db_session)
     )
     final_filters = IndexFilters(
         source_type=preset_filters.source_type or predicted_source_filters,
@@ -190,7 +196,11 @@ def retrieval_preprocessing(
     rerank_settings = search_request.rerank_settings
     # If not explicitly specified by the query, use the current settings
     if rerank_settings is None:
-        search_settings = get_current_search_settings(db_session)
+        search_settings = (
+            retrieval_context.get_search_settings(db_session)
+            if retrieval_context is not None
+            else get_current_search_settings(db_session)
+        )
 
         # For non-streaming flows, the rerank settings are applied at the search_request level
         if not search_settings.disable_rerank_for_streaming:
@@ -0,0 +1,136 @@
+import threading
+from collections import defaultdict
+
+from onyx.context.search.models import IndexFilters
+from onyx.context.search.models import InferenceChunk
+from onyx.context.search.postprocessing.postprocessing import cleanup_chunks
+from onyx.document_index.interfaces import DocumentIndex
+from onyx.document_index.interfaces import VespaChunkRequest
+from onyx.document_index.vespa.shared_utils.utils import (
+    replace_invalid_doc_id_characters,
+)
+
+
+class RetrievedChunkCache:
+    """Chunks fetched by id, kept for the lifetime of a single request (i.e. one chat
+    message) so that overlapping fetches, like the surrounding chunks of the same
+    documents for several agent sub-questions, only go to the document index once.
+
+    A chunk range of a document counts as cached once a fetch covering it returned any
+    chunk of that document. Ranges can go past the end of a document, so a cached range
+    may hold fewer chunks than its size. Chunks are copied going in and out since
+    callers update scores in place."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._chunks: dict[str, dict[int, InferenceChunk]] = defaultdict(dict)
+        self._fetched_chunk_inds: dict[str, set[int]] = defaultdict(set)
+        self._fully_fetched_doc_ids: set[str] = set()
+
+    def add(
+        self, chunk_requests: list[VespaChunkRequest], chunks: list[InferenceChunk]
+    ) -> None:
+        """Records the cleaned chunks returned for the given requests"""
+        with self._lock:
+            returned_doc_ids: set[str] = set()
+            for chunk in chunks:
+                doc_id = replace_invalid_doc_id_characters(chunk.document_id)
+                returned_doc_ids.add(doc_id)
+                self._chunks[doc_id][chunk.chunk_id] = chunk.model_copy()
+
+            for request in chunk_requests:
+                doc_id = replace_invalid_doc_id_characters(request.document_id)
+                # nothing coming back may also mean that the document was filtered out
+                if doc_id not in returned_doc_ids:
+                    continue
+
+                min_chunk_ind = request.min_chunk_ind or 0
+                if request.max_chunk_ind is not None:
+                    self._fetched_chunk_inds[doc_id].update(
+                        range(min_chunk_ind, request.max_chunk_ind + 1)
+                    )
+                elif min_chunk_ind == 0:
+                    self._fully_fetched_doc_ids.add(doc_id)
+
+    def _get_missing_request(
+        self, request: VespaChunkRequest
+    ) -> VespaChunkRequest | None:
+        """Must be called with the lock held"""
+        doc_id = replace_invalid_doc_id_characters(request.document_id)
+        if doc_id in self._fully_fetched_doc_ids:
+            return None
+        if request.max_chunk_ind is None:
+            return request
+
+        fetched_chunk_inds = self._fetched_chunk_inds.get(doc_id, set())
+        missing_chunk_inds = [
+            chunk_ind
+            for chunk_ind in range(
+                request.min_chunk_ind or 0, request.max_chunk_ind + 1
+            )
+            if chunk_ind not in fetched_chunk_inds
+        ]
+        if not missing_chunk_inds:
+            return None
+
+        return VespaChunkRequest(
+            document_id=request.document_id,
+            min_chunk_ind=missing_chunk_inds[0],
+            max_chunk_ind=missing_chunk_inds[-1],
+        )
+
+    def _get_cached_chunks(self, request: VespaChunkRequest) -> list[InferenceChunk]:
+        """Must be called with the lock held"""
+        doc_chunks = self._chunks.get(
+            replace_invalid_doc_id_characters(request.document_id), {}
+        )
+        min_chunk_ind = request.min_chunk_ind or 0
+        return [
+            doc_chunks[chunk_ind].model_copy()
+            for chunk_ind in sorted(doc_chunks)
+            if chunk_ind >= min_chunk_ind
+            and (request.max_chunk_ind is None or chunk_ind <= request.max_chunk_ind)
+        ]
+
+    def retrieve(
+        self,
+        document_index: DocumentIndex,
+        chunk_requests: list[VespaChunkRequest],
+        batch_retrieval: bool = False,
+    ) -> list[InferenceChunk]:
+        """Unfiltered id based retrieval of the cleaned chunks, only the parts of the
+        requests that aren't cached yet are fetched, all in a single call. Chunks come
+        back in request order, sorted by chunk id within each request."""
+        with self._lock:
+            missing_requests = [
+                missing_request
+                for missing_request in (
+                    self._get_missing_request(request) for request in chunk_requests
+                )
+                if missing_request is not None
+            ]
+
+        if missing_requests:
+            self.add(
+                missing_requests,
+                cleanup_chunks(
+                    document_index.id_based_retrieval(
+                        chunk_requests=missing_requests,
+                        # No need for ACL here, the documents were already
+                        # retrieved (and censored) for the user
+                        filters=IndexFilters(access_control_list=None),
+                        batch_retrieval=batch_retrieval,
+                    )
+                ),
+            )
+
+        chunks: list[InferenceChunk] = []
+        seen_chunk_keys: set[tuple[str, int]] = set()
+        with self._lock:
+            for request in chunk_requests:
+                for chunk in self._get_cached_chunks(request):
+                    chunk_key = (chunk.document_id, chunk.chunk_id)
+                    if chunk_key not in seen_chunk_keys:
+                        seen_chunk_keys.add(chunk_key)
+                        chunks.append(chunk)
+        return chunks
@@ -0,0 +1,54 @@
+import threading
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from onyx.context.search.preprocessing.access_filters import (
+    build_access_filters_for_user,
+)
+from onyx.context.search.retrieval.chunk_cache import RetrievedChunkCache
+from onyx.context.search.retrieval.search_runner import get_query_embeddings
+from onyx.db.models import SearchSettings
+from onyx.db.models import User
+from onyx.db.search_settings import get_current_search_settings
+from shared_configs.model_server_models import Embedding
+
+
+class RetrievalContext:
+    """Retrieval work shared by all of the searches of a single request (i.e. one chat
+    message), like the agent search sub-questions and their expanded queries, so that
+    it is only done once: the search settings lookup, the user's access filters and
+    the chunks fetched for section expansion. Query embeddings are memoized by the
+    process wide query embedding cache, `embed_queries` lets callers that know several
+    queries up front embed them together.
+
+    The search settings and the user's access are assumed to not change during the
+    request."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._search_settings: SearchSettings | None = None
+        self._user_acl_filters: dict[UUID | None, list[str]] = {}
+        self.chunk_cache = RetrievedChunkCache()
+
+    def get_search_settings(self, db_session: Session) -> SearchSettings:
+        with self._lock:
+            if self._search_settings is None:
+                search_settings = get_current_search_settings(db_session)
+                # the settings outlive the session, load the lazy relationship that
+                # the embedding model needs while it's still around
+                search_settings.cloud_provider
+                self._search_settings = search_settings
+            return self._search_settings
+
+    def get_access_filters(self, user: User | None, db_session: Session) -> list[str]:
+        user_id = user.id if user else None
+        with self._lock:
+            if user_id not in self._user_acl_filters:
+                self._user_acl_filters[user_id] = build_access_filters_for_user(
+                    user, db_session
+                )
+            return list(self._user_acl_filters[user_id])
+
+    def embed_queries(self, queries: list[str], db_session: Session) -> list[Embedding]:
+        return get_query_embeddings(queries, self.get_search_settings(db_session))
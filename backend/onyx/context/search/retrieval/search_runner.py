@@ -15,14 +15,21 @@ from onyx.context.search.models import MAX_METRICS_CONTENT
 from onyx.context.search.models import RetrievalMetricsContainer
 from onyx.context.search.models import SearchQuery
 from onyx.context.search.postprocessing.postprocessing import cleanup_chunks
+from onyx.context.search.retrieval.chunk_cache import RetrievedChunkCache
 from onyx.context.search.utils import inference_section_from_chunks
+from onyx.db.models import SearchSettings
 from onyx.db.search_settings import get_current_search_settings
-from onyx.db.search_settings import get_multilingual_expansion
 from onyx.document_index.interfaces import DocumentIndex
 from onyx.document_index.interfaces import VespaChunkRequest
 from onyx.document_index.vespa.shared_utils.utils import (
     replace_invalid_doc_id_characters,
 )
+from onyx.natural_language_processing.query_embedding_cache import (
+    build_query_embedding_namespace,
+)
+from onyx.natural_language_processing.query_embedding_cache import (
+    get_query_embedding_cache,
+)
 from onyx.natural_language_processing.search_nlp_models import EmbeddingModel
 from onyx.secondary_llm_flows.query_expansion import multilingual_query_expansion
 from onyx.utils.logger import setup_logger
@@ -31,6 +38,7 @@ from onyx.utils.timing import log_function_time
 from shared_configs.configs import MODEL_SERVER_HOST
 from shared_configs.configs import MODEL_SERVER_PORT
 from shared_configs.enums import EmbedTextType
+from shared_configs.model_server_models import Embedding
 
 
 logger = setup_logger()
@@ -109,29 +117,79 @@ def combine_retrieval_results(
     return sorted_chunks
 
 
+@log_function_time(print_only=True)
+def get_query_embeddings(
+    queries: list[str],
+    search_settings: SearchSettings,
+) -> list[Embedding]:
+    """Embeds the queries with the given search settings. Cached embeddings are reused and
+    all of the remaining queries are embedded together in a single model server request.
+    """
+    query_embedding_cache = get_query_embedding_cache()
+    query_embedding_namespace = build_query_embedding_namespace(search_settings)
+
+    query_embeddings: dict[str, Embedding] = {}
+    uncached_queries: list[str] = []
+    for query in queries:
+        if query in query_embeddings or query in uncached_queries:
+            continue
+        cached_embedding = query_embedding_cache.get(query_embedding_namespace, query)
+        if cached_embedding is None:
+            uncached_queries.append(query)
+        else:
+            query_embeddings[query] = cached_embedding
+
+    if uncached_queries:
+        model = EmbeddingModel.from_db_model(
+            search_settings=search_settings,
+            # The below are globally set, this flow always uses the indexing one
+            server_host=MODEL_SERVER_HOST,
+            server_port=MODEL_SERVER_PORT,
+        )
+        new_embeddings = model.encode(uncached_queries, text_type=EmbedTextType.QUERY)
+        for query, query_embedding in zip(uncached_queries, new_embeddings):
+            query_embeddings[query] = query_embedding
+            query_embedding_cache.set(query_embedding_namespace, query, query_embedding)
+
+    return [query_embeddings[query] for query in queries]
+
+
 @log_function_time(print_only=True)
 def doc_index_retrieval(
     query: SearchQuery,
     document_index: DocumentIndex,
     db_session: Session,
+    chunk_cache: RetrievedChunkCache | None = None,
+    search_settings: SearchSettings | None = None,
 ) -> list[InferenceChunk]:
     """
     This function performs the search to retrieve the chunks,
     extracts chunks from the large chunks, persists the scores
     from the large chunks to the referenced chunks,
     dedupes the chunks, and cleans the chunks.
+
+    If a chunk cache is given, the chunks above / below the referenced chunks are
+    fetched along with them and put in the cache for the section expansion.
     """
-    search_settings = get_current_search_settings(db_session)
+    search_settings = search_settings or get_current_search_settings(db_session)
+    query_embedding = get_query_embeddings([query.query], search_settings)[0]
 
-    model = EmbeddingModel.from_db_model(
-        search_settings=search_settings,
-        # The below are globally set, this flow always uses the indexing one
-        server_host=MODEL_SERVER_HOST,
-        server_port=MODEL_SERVER_PORT,
+    return _doc_index_retrieval_with_embedding(
+        query=query,
+        query_embedding=query_embedding,
+        document_index=document_index,
+        chunk_cache=chunk_cache,
     )
 
-    query_embedding = model.encode([query.query], text_type=EmbedTextType.QUERY)[0]
 
+def _doc_index_retrieval_with_embedding(
+    query: SearchQuery,
+    query_embedding: Embedding,
+    document_index: DocumentIndex,
+    chunk_cache: RetrievedChunkCache | None = None,
+) -> list[InferenceChunk]:
+    """Same as `doc_index_retrieval`, for an already embedded query. Doesn't touch the DB
+    so it is safe to run in parallel."""
     top_chunks = document_index.hybrid_retrieval(
         query=query.query,
         query_embedding=query_embedding,
@@ -146,13 +204,20 @@ def doc_index_retrieval(
     retrieval_requests: list[VespaChunkRequest] = []
     normal_chunks: list[InferenceChunkUncleaned] = []
     referenced_chunk_scores: dict[tuple[str, int], float] = {}
+    # the section expansion later needs the chunks around the referenced ones anyway,
+    # when they can be cached they are fetched in the same request
+    above, below = (
+        (query.chunks_above, query.chunks_below)
+        if chunk_cache is not None and not query.full_doc
+        else (0, 0)
+    )
     for chunk in top_chunks:
         if chunk.large_chunk_reference_ids:
             retrieval_requests.append(
                 VespaChunkRequest(
                     document_id=replace_invalid_doc_id_characters(chunk.document_id),
-                    min_chunk_ind=chunk.large_chunk_reference_ids[0],
-                    max_chunk_ind=chunk.large_chunk_reference_ids[-1],
+                    min_chunk_ind=max(0, chunk.large_chunk_reference_ids[0] - above),
+                    max_chunk_ind=chunk.large_chunk_reference_ids[-1] + below,
                 )
             )
             # for each referenced chunk, persist the
@@ -175,6 +240,19 @@ def doc_index_retrieval(
         filters=query.filters,
         batch_retrieval=True,
     )
+    if chunk_cache is not None:
+        # copies since the scores and contents are updated in place below
+        chunk_cache.add(
+            retrieval_requests,
+            cleanup_chunks(
+                [chunk.model_copy() for chunk in retrieved_inference_chunks]
+            ),
+        )
+        retrieved_inference_chunks = [
+            chunk
+            for chunk in retrieved_inference_chunks
+            if (chunk.document_id, chunk.chunk_id) in referenced_chunk_scores
+        ]
 
     # Apply the scores from the large chunks to the chunks referenced
     # by each large chunk
@@ -222,18 +300,25 @@ def retrieve_chunks(
     db_session: Session,
     retrieval_metrics_callback: Callable[[RetrievalMetricsContainer], None]
     | None = None,
+    chunk_cache: RetrievedChunkCache | None = None,
+    search_settings: SearchSettings | None = None,
 ) -> list[InferenceChunk]:
     """Returns a list of the best chunks from an initial keyword/semantic/ hybrid search."""
 
-    multilingual_expansion = get_multilingual_expansion(db_session)
+    search_settings = search_settings or get_current_search_settings(db_session)
+    multilingual_expansion = search_settings.multilingual_expansion
     # Don't do query expansion on complex queries, rephrasings likely would not work well
     if not multilingual_expansion or "\n" in query.query or "\r" in query.query:
         top_chunks = doc_index_retrieval(
-            query=query, document_index=document_index, db_session=db_session
+            query=query,
+            document_index=document_index,
+            db_session=db_session,
+            chunk_cache=chunk_cache,
+            search_settings=search_settings,
         )
     else:
         simplified_queries = set()
-        run_queries: list[tuple[Callable, tuple]] = []
+        query_copies: list[SearchQuery] = []
 
         # Currently only uses query expansion on multilingual use cases
         query_rephrases = multilingual_query_expansion(
@@ -249,13 +334,19 @@ def retrieve_chunks(
                 continue
             simplified_queries.add(simplified_rephrase)
 
-            q_copy = query.copy(update={"query": rephrase}, deep=True)
-            run_queries.append(
-                (
-                    doc_index_retrieval,
-                    (q_copy, document_index, db_session),
-                )
+            query_copies.append(query.copy(update={"query": rephrase}, deep=True))
+
+        # embed all of the rephrases in one go, then only the searches run in parallel
+        query_embeddings = get_query_embeddings(
+            [q_copy.query for q_copy in query_copies], search_settings
+        )
+        run_queries: list[tuple[Callable, tuple]] = [
+            (
+                _doc_index_retrieval_with_embedding,
+                (q_copy, query_embedding, document_index, chunk_cache),
             )
+            for q_copy, query_embedding in zip(query_copies, query_embeddings)
+        ]
         parallel_search_results = run_functions_tuples_in_parallel(run_queries)
         top_chunks = combine_retrieval_results(parallel_search_results)
 
@@ -12,6 +12,7 @@ from sqlalchemy.orm import joinedload
 from sqlalchemy.orm import selectinload
 from sqlalchemy.orm import Session
 
+from onyx.access.user_acl_cache import invalidate_user_acls
 from onyx.configs.app_configs import DISABLE_AUTH
 from onyx.db.connector import fetch_connector_by_id
 from onyx.db.credentials import fetch_credential_by_id
@@ -524,6 +525,12 @@ def add_credential_to_connector(
 
     db_session.commit()
 
+    if access_type == AccessType.SYNC:
+        fetch_ee_implementation_or_noop(
+            "onyx.external_permissions.post_query_censoring",
+            "invalidate_censoring_enabled_sources",
+        )()
+
     return StatusResponse(
         success=True,
         message=f"Creating new association between Connector {connector_id} and Credential {credential_id}",
@@ -572,6 +579,7 @@ def remove_credential_from_connector(
         )
         db_session.delete(association)
         db_session.commit()
+        invalidate_user_acls()
         return StatusResponse(
             success=True,
             message=f"Credential {credential_id} removed from Connector",
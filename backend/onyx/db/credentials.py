@@ -1,9 +1,11 @@
 from typing import Any
 
+from sqlalchemy import delete
 from sqlalchemy import exists
 from sqlalchemy import Select
 from sqlalchemy import select
 from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 from sqlalchemy.sql.expression import and_
 from sqlalchemy.sql.expression import or_
@@ -19,6 +21,7 @@ from onyx.db.models import ConnectorCredentialPair
 from onyx.db.models import Credential
 from onyx.db.models import Credential__UserGroup
 from onyx.db.models import DocumentByConnectorCredentialPair
+from onyx.db.models import DocumentCountByConnectorCredentialPair
 from onyx.db.models import User
 from onyx.db.models import User__UserGroup
 from onyx.server.documents.models import CredentialBase
@@ -241,6 +244,36 @@ def swap_credentials_connector(
         )
         .values(credential_id=new_credential_id)
     )
+    # the documents, and so their count, move over to the new credential
+    moved_document_count = db_session.execute(
+        delete(DocumentCountByConnectorCredentialPair)
+        .where(
+            and_(
+                DocumentCountByConnectorCredentialPair.connector_id == connector_id,
+                DocumentCountByConnectorCredentialPair.credential_id
+                == existing_pair.credential_id,
+            )
+        )
+        .returning(DocumentCountByConnectorCredentialPair.document_count)
+    ).scalar_one_or_none()
+    if moved_document_count:
+        insert_stmt = insert(DocumentCountByConnectorCredentialPair).values(
+            connector_id=connector_id,
+            credential_id=new_credential_id,
+            document_count=moved_document_count,
+        )
+        db_session.execute(
+            insert_stmt.on_conflict_do_update(
+                index_elements=[
+                    DocumentCountByConnectorCredentialPair.connector_id,
+                    DocumentCountByConnectorCredentialPair.credential_id,
+                ],
+                set_={
+                    "document_count": DocumentCountByConnectorCredentialPair.document_count
+                    + insert_stmt.excluded.document_count
+                },
+            )
+        )
 
     # Update the existing pair with the new credential
     existing_pair.credential_id = new_credential_id
@@ -1,5 +1,6 @@
 import contextlib
 import time
+from collections import defaultdict
 from collections.abc import Generator
 from collections.abc import Iterable
 from collections.abc import Sequence
@@ -7,14 +8,20 @@ from datetime import datetime
 from datetime import timezone
 
 from sqlalchemy import and_
+from sqlalchemy import cast
+from sqlalchemy import column
+from sqlalchemy import DateTime
 from sqlalchemy import delete
 from sqlalchemy import exists
 from sqlalchemy import func
+from sqlalchemy import Integer
 from sqlalchemy import or_
 from sqlalchemy import Select
 from sqlalchemy import select
+from sqlalchemy import String
 from sqlalchemy import tuple_
 from sqlalchemy import update
+from sqlalchemy import values
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.engine.util import TransactionalContext
 from sqlalchemy.exc import OperationalError
@@ -33,6 +40,7 @@ from onyx.db.models import ConnectorCredentialPair
 from onyx.db.models import Credential
 from onyx.db.models import Document as DbDocument
 from onyx.db.models import DocumentByConnectorCredentialPair
+from onyx.db.models import DocumentCountByConnectorCredentialPair
 from onyx.db.models import User
 from onyx.db.tag import delete_document_tags_for_documents__no_commit
 from onyx.db.utils import model_to_dict
@@ -232,33 +240,98 @@ def get_document_connector_counts(
 def get_document_counts_for_cc_pairs(
     db_session: Session, cc_pairs: list[ConnectorCredentialPairIdentifier]
 ) -> Sequence[tuple[int, int, int]]:
-    """Returns a sequence of tuples of (connector_id, credential_id, document count)"""
+    """Returns a sequence of tuples of (connector_id, credential_id, document count).
+    Reads the maintained counts rather than counting the documents, cc pairs without
+    any indexed documents are left out."""
 
     # Prepare a list of (connector_id, credential_id) tuples
     cc_ids = [(x.connector_id, x.credential_id) for x in cc_pairs]
 
-    stmt = (
-        select(
-            DocumentByConnectorCredentialPair.connector_id,
-            DocumentByConnectorCredentialPair.credential_id,
-            func.count(),
+    stmt = select(
+        DocumentCountByConnectorCredentialPair.connector_id,
+        DocumentCountByConnectorCredentialPair.credential_id,
+        DocumentCountByConnectorCredentialPair.document_count,
+    ).where(
+        and_(
+            tuple_(
+                DocumentCountByConnectorCredentialPair.connector_id,
+                DocumentCountByConnectorCredentialPair.credential_id,
+            ).in_(cc_ids),
+            DocumentCountByConnectorCredentialPair.document_count > 0,
         )
-        .where(
-            and_(
-                tuple_(
-                    DocumentByConnectorCredentialPair.connector_id,
-                    DocumentByConnectorCredentialPair.credential_id,
-                ).in_(cc_ids),
-                DocumentByConnectorCredentialPair.has_been_indexed.is_(True),
-            )
+    )
+
+    return db_session.execute(stmt).all()  # type: ignore
+
+
+def adjust_document_counts_for_cc_pairs__no_commit(
+    db_session: Session, cc_pair_to_count_delta: dict[tuple[int, int], int]
+) -> None:
+    """Applies the (connector_id, credential_id) -> delta changes to the maintained
+    document counts. The rows are always written in key order so that concurrent
+    transactions touching several cc pairs lock them in the same order."""
+    rows = [
+        {
+            "connector_id": connector_id,
+            "credential_id": credential_id,
+            "document_count": delta,
+        }
+        for (connector_id, credential_id), delta in sorted(
+            cc_pair_to_count_delta.items()
         )
-        .group_by(
-            DocumentByConnectorCredentialPair.connector_id,
-            DocumentByConnectorCredentialPair.credential_id,
+        if delta
+    ]
+    if not rows:
+        return
+
+    insert_stmt = insert(DocumentCountByConnectorCredentialPair).values(rows)
+    db_session.execute(
+        insert_stmt.on_conflict_do_update(
+            index_elements=[
+                DocumentCountByConnectorCredentialPair.connector_id,
+                DocumentCountByConnectorCredentialPair.credential_id,
+            ],
+            set_={
+                "document_count": DocumentCountByConnectorCredentialPair.document_count
+                + insert_stmt.excluded.document_count
+            },
         )
     )
 
-    return db_session.execute(stmt).all()  # type: ignore
+
+def reconcile_document_count_for_cc_pair(
+    db_session: Session, connector_id: int, credential_id: int
+) -> int:
+    """Recounts the indexed documents of a cc pair and overwrites the maintained count
+    with it. The count row is locked first so that no incremental update can slip in
+    between counting and writing. Returns how far off the maintained count was."""
+    db_session.execute(
+        insert(DocumentCountByConnectorCredentialPair)
+        .values(
+            connector_id=connector_id, credential_id=credential_id, document_count=0
+        )
+        .on_conflict_do_nothing()
+    )
+    count_row = db_session.execute(
+        select(DocumentCountByConnectorCredentialPair)
+        .where(
+            DocumentCountByConnectorCredentialPair.connector_id == connector_id,
+            DocumentCountByConnectorCredentialPair.credential_id == credential_id,
+        )
+        .with_for_update()
+    ).scalar_one()
+
+    actual_count = db_session.scalar(
+        select(func.count()).where(
+            DocumentByConnectorCredentialPair.connector_id == connector_id,
+            DocumentByConnectorCredentialPair.credential_id == credential_id,
+            DocumentByConnectorCredentialPair.has_been_indexed.is_(True),
+        )
+    )
+    drift = (actual_count or 0) - count_row.document_count
+    count_row.document_count = actual_count or 0
+    db_session.commit()
+    return drift
 
 
 # For use with our thread-level parallelism utils. Note that any relationships
@@ -434,55 +507,65 @@ def mark_document_as_indexed_for_cc_pair__no_commit(
     document_ids: Iterable[str],
 ) -> None:
     """Should be called only after a successful index operation for a batch."""
-    db_session.execute(
+    result = db_session.execute(
         update(DocumentByConnectorCredentialPair)
         .where(
             and_(
                 DocumentByConnectorCredentialPair.connector_id == connector_id,
                 DocumentByConnectorCredentialPair.credential_id == credential_id,
                 DocumentByConnectorCredentialPair.id.in_(document_ids),
+                # only the newly indexed documents change the document count
+                DocumentByConnectorCredentialPair.has_been_indexed.is_not(True),
             )
         )
         .values(has_been_indexed=True)
+        .execution_options(synchronize_session=False)
+    )
+    num_newly_indexed: int = result.rowcount  # type: ignore
+    adjust_document_counts_for_cc_pairs__no_commit(
+        db_session, {(connector_id, credential_id): num_newly_indexed}
     )
 
 
-def update_docs_updated_at__no_commit(
+def update_docs_after_indexing__no_commit(
+    doc_id_to_chunk_count: dict[str, int],
     ids_to_new_updated_at: dict[str, datetime],
     db_session: Session,
 ) -> None:
-    doc_ids = list(ids_to_new_updated_at.keys())
-    documents_to_update = (
-        db_session.query(DbDocument).filter(DbDocument.id.in_(doc_ids)).all()
-    )
-
-    for document in documents_to_update:
-        document.doc_updated_at = ids_to_new_updated_at[document.id]
-
+    """Records the new chunk count of each indexed document, marks it as modified and
+    stores its new doc_updated_at (if the connector gave one). Done as a single
+    UPDATE ... FROM (VALUES ...) without loading the rows into the session, since this
+    runs while the documents are locked."""
+    if not doc_id_to_chunk_count:
+        return
 
-def update_docs_last_modified__no_commit(
-    document_ids: list[str],
-    db_session: Session,
-) -> None:
-    documents_to_update = (
-        db_session.query(DbDocument).filter(DbDocument.id.in_(document_ids)).all()
+    new_values = values(
+        column("id", String),
+        column("chunk_count", Integer),
+        column("doc_updated_at", DateTime(timezone=True)),
+        name="new_values",
+    ).data(
+        [
+            (document_id, chunk_count, ids_to_new_updated_at.get(document_id))
+            for document_id, chunk_count in doc_id_to_chunk_count.items()
+        ]
     )
 
-    now = datetime.now(timezone.utc)
-    for doc in documents_to_update:
-        doc.last_modified = now
-
-
-def update_docs_chunk_count__no_commit(
-    document_ids: list[str],
-    doc_id_to_chunk_count: dict[str, int],
-    db_session: Session,
-) -> None:
-    documents_to_update = (
-        db_session.query(DbDocument).filter(DbDocument.id.in_(document_ids)).all()
+    stmt = (
+        update(DbDocument)
+        .where(DbDocument.id == new_values.c.id)
+        .values(
+            chunk_count=new_values.c.chunk_count,
+            last_modified=datetime.now(timezone.utc),
+            # the type of a column that is all NULLs can't be inferred by Postgres
+            doc_updated_at=func.coalesce(
+                cast(new_values.c.doc_updated_at, DateTime(timezone=True)),
+                DbDocument.doc_updated_at,
+            ),
+        )
+        .execution_options(synchronize_session=False)
     )
-    for doc in documents_to_update:
-        doc.chunk_count = doc_id_to_chunk_count[doc.id]
+    db_session.execute(stmt)
 
 
 def mark_document_as_modified(
@@ -510,6 +593,16 @@ def mark_document_as_synced(document_id: str, db_session: Session) -> None:
     db_session.commit()
 
 
+def mark_documents_as_synced(document_ids: list[str], db_session: Session) -> None:
+    stmt = (
+        update(DbDocument)
+        .where(DbDocument.id.in_(document_ids))
+        .values(last_synced=datetime.now(timezone.utc))
+    )
+    db_session.execute(stmt)
+    db_session.commit()
+
+
 def delete_document_by_connector_credential_pair__no_commit(
     db_session: Session,
     document_id: str,
@@ -551,7 +644,19 @@ def delete_documents_by_connector_credential_pair__no_commit(
                 == connector_credential_pair_identifier.credential_id,
             )
         )
-    db_session.execute(stmt)
+    deleted_rows = db_session.execute(
+        stmt.returning(
+            DocumentByConnectorCredentialPair.connector_id,
+            DocumentByConnectorCredentialPair.credential_id,
+            DocumentByConnectorCredentialPair.has_been_indexed,
+        )
+    ).all()
+
+    cc_pair_to_count_delta: dict[tuple[int, int], int] = defaultdict(int)
+    for connector_id, credential_id, has_been_indexed in deleted_rows:
+        if has_been_indexed:
+            cc_pair_to_count_delta[(connector_id, credential_id)] -= 1
+    adjust_document_counts_for_cc_pairs__no_commit(db_session, cc_pair_to_count_delta)
 
 
 def delete_documents__no_commit(db_session: Session, document_ids: list[str]) -> None:
@@ -1046,6 +1046,23 @@ class DocumentByConnectorCredentialPair(Base):
     )
 
 
+class DocumentCountByConnectorCredentialPair(Base):
+    """Number of indexed documents (`has_been_indexed` is True) for each connector /
+    credential pair. Maintained in the same transaction as the changes to
+    `document_by_connector_credential_pair` so that reading the counts doesn't need
+    to aggregate over every document, and periodically reconciled against it."""
+
+    __tablename__ = "document_count_by_connector_credential_pair"
+
+    connector_id: Mapped[int] = mapped_column(
+        ForeignKey("connector.id", ondelete="CASCADE"), primary_key=True
+    )
+    credential_id: Mapped[int] = mapped_column(
+        ForeignKey("credential.id", ondelete="CASCADE"), primary_key=True
+    )
+    document_count: Mapped[int] = mapped_column(Integer, default=0)
+
+
 """
 Messages Tables
 """
@@ -1,14 +1,18 @@
+import io
 import tempfile
+from collections.abc import Iterator
 from io import BytesIO
 from typing import IO
 
 from psycopg2.extensions import connection
+from psycopg2.extensions import lobject
 from sqlalchemy.orm import Session
 
 from onyx.configs.constants import FileOrigin
 from onyx.db.models import PGFileStore
 from onyx.file_store.constants import MAX_IN_MEMORY_SIZE
 from onyx.file_store.constants import STANDARD_CHUNK_SIZE
+from onyx.file_store.constants import STREAMING_READ_BUFFER_SIZE
 from onyx.utils.logger import setup_logger
 
 logger = setup_logger()
@@ -84,6 +88,85 @@ def read_lobj(
         return BytesIO(large_object.read())
 
 
+class _LargeObjectReader(io.RawIOBase):
+    """Read-only, seekable raw file over a Postgres large object. Every read goes to the DB,
+    so this is meant to be wrapped in a buffered reader."""
+
+    def __init__(self, large_object: lobject) -> None:
+        self._large_object = large_object
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: bytearray | memoryview) -> int:  # type: ignore[override]
+        data = self._large_object.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        return self._large_object.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._large_object.tell()
+
+    def close(self) -> None:
+        try:
+            # the large object is closed by Postgres if the transaction already ended
+            if not self._large_object.closed:
+                self._large_object.close()
+        finally:
+            super().close()
+
+
+def open_lobj(
+    lobj_oid: int,
+    db_session: Session,
+    buffer_size: int = STREAMING_READ_BUFFER_SIZE,
+) -> IO[bytes]:
+    """Opens the large object as a seekable binary file without reading it into memory.
+    Large object descriptors only live as long as the transaction they were opened in, so
+    the file must be read before the session commits or rolls back."""
+    pg_conn = get_pg_conn_from_session(db_session)
+    large_object = pg_conn.lobject(lobj_oid, mode="rb")
+    return io.BufferedReader(_LargeObjectReader(large_object), buffer_size=buffer_size)
+
+
+def iter_lobj_chunks(
+    lobj_oid: int,
+    db_session: Session,
+    chunk_size: int = STANDARD_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    pg_conn = get_pg_conn_from_session(db_session)
+    large_object = pg_conn.lobject(lobj_oid, mode="rb")
+    try:
+        while True:
+            chunk = large_object.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        if not large_object.closed:
+            large_object.close()
+
+
+def read_lobj_range(
+    lobj_oid: int,
+    db_session: Session,
+    offset: int,
+    length: int,
+) -> bytes:
+    pg_conn = get_pg_conn_from_session(db_session)
+    large_object = pg_conn.lobject(lobj_oid, mode="rb")
+    try:
+        large_object.seek(offset)
+        return large_object.read(length)
+    finally:
+        large_object.close()
+
+
 def delete_lobj_by_id(
     lobj_oid: int,
     db_session: Session,
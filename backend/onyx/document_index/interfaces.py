@@ -7,6 +7,7 @@ from onyx.access.models import DocumentAccess
 from onyx.context.search.models import IndexFilters
 from onyx.context.search.models import InferenceChunkUncleaned
 from onyx.indexing.models import DocMetadataAwareIndexChunk
+from onyx.indexing.models import StoredChunkEmbedding
 from shared_configs.model_server_models import Embedding
 
 
@@ -102,6 +103,19 @@ class VespaDocumentFields:
     hidden: bool | None = None
 
 
+@dataclass
+class DocumentUpdateRequest:
+    """
+    For a single document, update the fields that are not None. Used when many documents
+    each need their own set of field updates.
+    """
+
+    doc_id: str
+    # the chunk count stored in Postgres, None for documents using the old chunk ID system
+    chunk_count: int | None
+    fields: VespaDocumentFields
+
+
 @dataclass
 class UpdateRequest:
     """
@@ -211,6 +225,29 @@ class Indexable(abc.ABC):
         """
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def get_stored_embeddings(
+        self,
+        document_ids: list[str],
+        *,
+        tenant_id: str,
+    ) -> dict[str, StoredChunkEmbedding]:
+        """
+        Fetches the embeddings of the chunks currently indexed for the given documents so that
+        chunks whose content has not changed can skip re-embedding.
+
+        NOTE: Only the PRIMARY index is read, as in `index`.
+
+        Parameters:
+        - document_ids: the documents whose chunks to fetch
+        - tenant_id: The tenant id of the user whose chunks are being fetched
+
+        Returns:
+            a mapping of content hash to the stored embeddings. Chunks indexed without a content
+            hash are not included.
+        """
+        raise NotImplementedError
+
 
 class Deletable(abc.ABC):
     """
@@ -283,6 +320,26 @@ class Updatable(abc.ABC):
         """
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def update_multiple(
+        self,
+        update_requests: list[DocumentUpdateRequest],
+        *,
+        tenant_id: str,
+    ) -> dict[str, int]:
+        """
+        Updates all chunks for each of the specified documents with that document's fields.
+        Unlike `update_single`, all of the chunk updates are pushed through together which is
+        much more efficient when syncing large numbers of documents.
+
+        Parameters:
+        - update_requests: the document and fields to update for each document
+
+        Return:
+            a mapping of document id to the number of chunks updated
+        """
+        raise NotImplementedError
+
 
 class IdRetrievalCapable(abc.ABC):
     """
@@ -19,6 +19,7 @@ import httpx  # type: ignore
 import requests  # type: ignore
 from retry import retry
 
+from onyx.configs.app_configs import VESPA_BULK_FEED_ENABLED
 from onyx.configs.chat_configs import DOC_TIME_DECAY
 from onyx.configs.chat_configs import NUM_RETURNED_HITS
 from onyx.configs.chat_configs import TITLE_CONTENT_RATIO
@@ -29,6 +30,7 @@ from onyx.context.search.models import InferenceChunkUncleaned
 from onyx.document_index.document_index_utils import get_document_chunk_ids
 from onyx.document_index.interfaces import DocumentIndex
 from onyx.document_index.interfaces import DocumentInsertionRecord
+from onyx.document_index.interfaces import DocumentUpdateRequest
 from onyx.document_index.interfaces import EnrichedDocumentIndexingInfo
 from onyx.document_index.interfaces import IndexBatchParams
 from onyx.document_index.interfaces import MinimalDocumentIndexingInfo
@@ -45,6 +47,8 @@ from onyx.document_index.vespa.indexing_utils import BaseHTTPXClientContext
 from onyx.document_index.vespa.indexing_utils import batch_index_vespa_chunks
 from onyx.document_index.vespa.indexing_utils import check_for_final_chunk_existence
 from onyx.document_index.vespa.indexing_utils import clean_chunk_id_copy
+from onyx.document_index.vespa.indexing_utils import feed_vespa_chunks
+from onyx.document_index.vespa.indexing_utils import get_stored_chunk_embeddings
 from onyx.document_index.vespa.indexing_utils import GlobalHTTPXClientContext
 from onyx.document_index.vespa.indexing_utils import TemporaryHTTPXClientContext
 from onyx.document_index.vespa.shared_utils.utils import get_vespa_http_client
@@ -73,6 +77,7 @@ from onyx.document_index.vespa_constants import VESPA_DIM_REPLACEMENT_PAT
 from onyx.document_index.vespa_constants import VESPA_TIMEOUT
 from onyx.document_index.vespa_constants import YQL_BASE
 from onyx.indexing.models import DocMetadataAwareIndexChunk
+from onyx.indexing.models import StoredChunkEmbedding
 from onyx.key_value_store.factory import get_shared_kv_store
 from onyx.utils.batching import batch_generator
 from onyx.utils.logger import setup_logger
@@ -94,6 +99,33 @@ class _VespaUpdateRequest:
     update_request: dict[str, dict]
 
 
+class _RetryableVespaHTTPStatusError(httpx.HTTPStatusError):
+    """A response worth retrying, i.e. Vespa is overloaded or had an internal error.
+    Other 4xx responses will never succeed."""
+
+
+def _build_vespa_update_dict(fields: VespaDocumentFields) -> dict[str, dict]:
+    update_dict: dict[str, dict] = {"fields": {}}
+
+    if fields.boost is not None:
+        update_dict["fields"][BOOST] = {"assign": fields.boost}
+
+    if fields.document_sets is not None:
+        update_dict["fields"][DOCUMENT_SETS] = {
+            "assign": {document_set: 1 for document_set in fields.document_sets}
+        }
+
+    if fields.access is not None:
+        update_dict["fields"][ACCESS_CONTROL_LIST] = {
+            "assign": {acl_entry: 1 for acl_entry in fields.access.to_acl()}
+        }
+
+    if fields.hidden is not None:
+        update_dict["fields"][HIDDEN] = {"assign": fields.hidden}
+
+    return update_dict
+
+
 def in_memory_zip_from_file_bytes(file_contents: dict[str, bytes]) -> BinaryIO:
     zip_buffer = io.BytesIO()
     with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zipf:
@@ -404,14 +436,27 @@ class VespaIndex(DocumentIndex):
                     executor=executor,
                 )
 
-            for chunk_batch in batch_generator(cleaned_chunks, BATCH_SIZE):
-                batch_index_vespa_chunks(
-                    chunks=chunk_batch,
+            if VESPA_BULK_FEED_ENABLED:
+                feed_results = feed_vespa_chunks(
+                    chunks=cleaned_chunks,
                     index_name=self.index_name,
                     http_client=http_client,
                     multitenant=self.multitenant,
                     executor=executor,
                 )
+                logger.debug(
+                    f"Fed {sum(result.chunks_fed for result in feed_results.values())} "
+                    f"chunks for {len(feed_results)} documents into Vespa"
+                )
+            else:
+                for chunk_batch in batch_generator(cleaned_chunks, BATCH_SIZE):
+                    batch_index_vespa_chunks(
+                        chunks=chunk_batch,
+                        index_name=self.index_name,
+                        http_client=http_client,
+                        multitenant=self.multitenant,
+                        executor=executor,
+                    )
 
         all_cleaned_doc_ids = {chunk.source_document.id for chunk in cleaned_chunks}
 
@@ -423,6 +468,27 @@ class VespaIndex(DocumentIndex):
             for cleaned_doc_id in all_cleaned_doc_ids
         }
 
+    def get_stored_embeddings(
+        self,
+        document_ids: list[str],
+        *,
+        tenant_id: str,
+    ) -> dict[str, StoredChunkEmbedding]:
+        if not document_ids:
+            return {}
+
+        with (
+            concurrent.futures.ThreadPoolExecutor(max_workers=NUM_THREADS) as executor,
+            self.httpx_client_context as http_client,
+        ):
+            return get_stored_chunk_embeddings(
+                document_ids=document_ids,
+                index_name=self.index_name,
+                http_client=http_client,
+                tenant_id=tenant_id if MULTI_TENANT else None,
+                executor=executor,
+            )
+
     @classmethod
     def _apply_updates_batched(
         cls,
@@ -432,41 +498,57 @@ class VespaIndex(DocumentIndex):
     ) -> None:
         """Runs a batch of updates in parallel via the ThreadPoolExecutor."""
 
+        @retry(
+            exceptions=(httpx.TransportError, _RetryableVespaHTTPStatusError),
+            tries=3,
+            delay=1,
+            backoff=2,
+        )
         def _update_chunk(
             update: _VespaUpdateRequest, http_client: httpx.Client
         ) -> httpx.Response:
             logger.debug(
                 f"Updating with request to {update.url} with body {update.update_request}"
             )
-            return http_client.put(
+            res = http_client.put(
                 update.url,
                 headers={"Content-Type": "application/json"},
                 json=update.update_request,
             )
+            try:
+                res.raise_for_status()
+            except httpx.HTTPStatusError as e:
+                if res.status_code == 429 or res.is_server_error:
+                    raise _RetryableVespaHTTPStatusError(
+                        str(e), request=e.request, response=e.response
+                    ) from e
+                raise
+            return res
 
         # NOTE: using `httpx` here since `requests` doesn't support HTTP2. This is beneficient for
         # indexing / updates / deletes since we have to make a large volume of requests.
 
-        with (
-            concurrent.futures.ThreadPoolExecutor(max_workers=NUM_THREADS) as executor,
-            httpx_client as http_client,
-        ):
+        # NOTE: the client is owned by the caller (it may be the shared pool client),
+        # so it must not be closed here
+        with concurrent.futures.ThreadPoolExecutor(max_workers=NUM_THREADS) as executor:
             for update_batch in batch_generator(updates, batch_size):
                 future_to_document_id = {
                     executor.submit(
                         _update_chunk,
                         update,
-                        http_client,
+                        httpx_client,
                     ): update.document_id
                     for update in update_batch
                 }
                 for future in concurrent.futures.as_completed(future_to_document_id):
-                    res = future.result()
                     try:
-                        res.raise_for_status()
-                    except requests.HTTPError as e:
-                        failure_msg = f"Failed to update document: {future_to_document_id[future]}"
-                        raise requests.HTTPError(failure_msg) from e
+                        future.result()
+                    except httpx.HTTPStatusError as e:
+                        logger.error(
+                            f"Failed to update document: {future_to_document_id[future]}. "
+                            f"Details: {e.response.text}"
+                        )
+                        raise
 
     def update(self, update_requests: list[UpdateRequest], *, tenant_id: str) -> None:
         logger.debug(f"Updating {len(update_requests)} documents in Vespa")
@@ -569,23 +651,7 @@ class VespaIndex(DocumentIndex):
         Retries if we encounter transient HTTPStatusError (e.g., overload).
         """
 
-        update_dict: dict[str, dict] = {"fields": {}}
-
-        if fields.boost is not None:
-            update_dict["fields"][BOOST] = {"assign": fields.boost}
-
-        if fields.document_sets is not None:
-            update_dict["fields"][DOCUMENT_SETS] = {
-                "assign": {document_set: 1 for document_set in fields.document_sets}
-            }
-
-        if fields.access is not None:
-            update_dict["fields"][ACCESS_CONTROL_LIST] = {
-                "assign": {acl_entry: 1 for acl_entry in fields.access.to_acl()}
-            }
-
-        if fields.hidden is not None:
-            update_dict["fields"][HIDDEN] = {"assign": fields.hidden}
+        update_dict = _build_vespa_update_dict(fields)
 
         if not update_dict["fields"]:
             logger.error("Update request received but nothing to update.")
@@ -655,6 +721,77 @@ class VespaIndex(DocumentIndex):
 
         return doc_chunk_count
 
+    def update_multiple(
+        self,
+        update_requests: list[DocumentUpdateRequest],
+        *,
+        tenant_id: str,
+    ) -> dict[str, int]:
+        """Note: updates to chunks that do not exist in Vespa are no-ops."""
+        doc_id_to_chunk_count: dict[str, int] = {}
+        processed_updates_requests: list[_VespaUpdateRequest] = []
+
+        with self.httpx_client_context as httpx_client:
+            # chunk ranges are only unknown for documents on the old chunk ID system,
+            # which requires probing Vespa, so resolve them in parallel
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=NUM_THREADS
+            ) as executor:
+                future_to_request = {
+                    executor.submit(
+                        VespaIndex.enrich_basic_chunk_info,
+                        index_name=index_name,
+                        http_client=httpx_client,
+                        document_id=replace_invalid_doc_id_characters(
+                            update_request.doc_id
+                        ),
+                        previous_chunk_count=update_request.chunk_count,
+                        new_chunk_count=0,
+                    ): (update_request, index_name, large_chunks_enabled)
+                    for update_request in update_requests
+                    for (
+                        index_name,
+                        large_chunks_enabled,
+                    ) in self.index_to_large_chunks_enabled.items()
+                }
+
+                for future in concurrent.futures.as_completed(future_to_request):
+                    (
+                        update_request,
+                        index_name,
+                        large_chunks_enabled,
+                    ) = future_to_request[future]
+                    update_dict = _build_vespa_update_dict(update_request.fields)
+                    if not update_dict["fields"]:
+                        logger.error(
+                            "Update request received but nothing to update. "
+                            f"doc_id={update_request.doc_id}"
+                        )
+                        continue
+
+                    doc_chunk_ids = get_document_chunk_ids(
+                        enriched_document_info_list=[future.result()],
+                        tenant_id=tenant_id,
+                        large_chunks_enabled=large_chunks_enabled,
+                    )
+                    doc_id_to_chunk_count[
+                        update_request.doc_id
+                    ] = doc_id_to_chunk_count.get(update_request.doc_id, 0) + len(
+                        doc_chunk_ids
+                    )
+                    for doc_chunk_id in doc_chunk_ids:
+                        processed_updates_requests.append(
+                            _VespaUpdateRequest(
+                                document_id=update_request.doc_id,
+                                url=f"{DOCUMENT_ID_ENDPOINT.format(index_name=index_name)}/{doc_chunk_id}",
+                                update_request=update_dict,
+                            )
+                        )
+
+            self._apply_updates_batched(processed_updates_requests, httpx_client)
+
+        return doc_id_to_chunk_count
+
     def delete_single(
         self,
         doc_id: str,
@@ -1,12 +1,16 @@
 import concurrent.futures
 import json
+import struct
 import uuid
 from abc import ABC
 from abc import abstractmethod
 from collections.abc import Callable
+from collections.abc import Iterable
+from dataclasses import dataclass
 from datetime import datetime
 from datetime import timezone
 from http import HTTPStatus
+from typing import Any
 
 import httpx
 from retry import retry
@@ -26,6 +30,7 @@ from onyx.document_index.vespa_constants import BLURB
 from onyx.document_index.vespa_constants import BOOST
 from onyx.document_index.vespa_constants import CHUNK_ID
 from onyx.document_index.vespa_constants import CONTENT
+from onyx.document_index.vespa_constants import CONTENT_HASH
 from onyx.document_index.vespa_constants import CONTENT_SUMMARY
 from onyx.document_index.vespa_constants import DOC_UPDATED_AT
 from onyx.document_index.vespa_constants import DOCUMENT_ID
@@ -47,7 +52,10 @@ from onyx.document_index.vespa_constants import SOURCE_TYPE
 from onyx.document_index.vespa_constants import TENANT_ID
 from onyx.document_index.vespa_constants import TITLE
 from onyx.document_index.vespa_constants import TITLE_EMBEDDING
+from onyx.document_index.vespa_constants import VESPA_FEED_MAX_IN_FLIGHT
+from onyx.indexing.models import ChunkEmbedding
 from onyx.indexing.models import DocMetadataAwareIndexChunk
+from onyx.indexing.models import StoredChunkEmbedding
 from onyx.utils.logger import setup_logger
 
 
@@ -120,22 +128,21 @@ def get_existing_documents_from_chunks(
     return document_ids
 
 
-@retry(tries=5, delay=1, backoff=2)
-def _index_vespa_chunk(
+def _tensor_to_hex(values: list[float]) -> str:
+    """Vespa accepts dense tensor cells as a hex string of the big-endian cell values.
+    This is much smaller and cheaper to serialize than the JSON list of floats."""
+    return struct.pack(f">{len(values)}f", *values).hex()
+
+
+def _build_vespa_chunk_fields(
     chunk: DocMetadataAwareIndexChunk,
-    index_name: str,
-    http_client: httpx.Client,
     multitenant: bool,
-) -> None:
-    json_header = {
-        "Content-Type": "application/json",
-    }
+    compact_tensors: bool = False,
+) -> dict[str, Any]:
     document = chunk.source_document
 
     # No minichunk documents in vespa, minichunk vectors are stored in the chunk itself
 
-    vespa_chunk_id = str(get_uuid_from_chunk(chunk))
-
     embeddings = chunk.embeddings
 
     embeddings_name_vector_map = {"full_chunk": embeddings.full_embedding}
@@ -144,6 +151,19 @@ def _index_vespa_chunk(
         for ind, m_c_embed in enumerate(embeddings.mini_chunk_embeddings):
             embeddings_name_vector_map[f"mini_chunk_{ind}"] = m_c_embed
 
+    embeddings_field: dict[str, Any] = embeddings_name_vector_map
+    title_embedding_field: Any = chunk.title_embedding
+    if compact_tensors:
+        # mixed tensor short form, each named block is given as a hex string
+        embeddings_field = {
+            "blocks": {
+                name: _tensor_to_hex(vector)
+                for name, vector in embeddings_name_vector_map.items()
+            }
+        }
+        if chunk.title_embedding is not None:
+            title_embedding_field = {"values": _tensor_to_hex(chunk.title_embedding)}
+
     title = document.get_title_for_document_index()
 
     metadata_json = document.metadata
@@ -187,8 +207,8 @@ def _index_vespa_chunk(
         # Save as a list for efficient extraction as an Attribute
         METADATA_LIST: metadata_list,
         METADATA_SUFFIX: remove_invalid_unicode_chars(chunk.metadata_suffix_keyword),
-        EMBEDDINGS: embeddings_name_vector_map,
-        TITLE_EMBEDDING: chunk.title_embedding,
+        EMBEDDINGS: embeddings_field,
+        TITLE_EMBEDDING: title_embedding_field,
         DOC_UPDATED_AT: _vespa_get_updated_at_attribute(document.doc_updated_at),
         PRIMARY_OWNERS: get_experts_stores_representations(document.primary_owners),
         SECONDARY_OWNERS: get_experts_stores_representations(document.secondary_owners),
@@ -201,10 +221,44 @@ def _index_vespa_chunk(
         BOOST: chunk.boost,
     }
 
+    if chunk.content_hash:
+        vespa_document_fields[CONTENT_HASH] = chunk.content_hash
+
     if multitenant:
         if chunk.tenant_id:
             vespa_document_fields[TENANT_ID] = chunk.tenant_id
 
+    return vespa_document_fields
+
+
+def _log_index_failure(document_id: str, e: Exception, response_text: str) -> None:
+    logger.exception(
+        f"Failed to index document: '{document_id}'. Got response: '{response_text}'"
+    )
+    if isinstance(e, httpx.HTTPStatusError):
+        if e.response.status_code == HTTPStatus.INSUFFICIENT_STORAGE:
+            logger.error(
+                "NOTE: HTTP Status 507 Insufficient Storage usually means "
+                "you need to allocate more memory or disk space to the "
+                "Vespa/index container."
+            )
+
+
+@retry(tries=5, delay=1, backoff=2)
+def _index_vespa_chunk(
+    chunk: DocMetadataAwareIndexChunk,
+    index_name: str,
+    http_client: httpx.Client,
+    multitenant: bool,
+) -> None:
+    json_header = {
+        "Content-Type": "application/json",
+    }
+    document = chunk.source_document
+
+    vespa_chunk_id = str(get_uuid_from_chunk(chunk))
+    vespa_document_fields = _build_vespa_chunk_fields(chunk, multitenant)
+
     vespa_url = f"{DOCUMENT_ID_ENDPOINT.format(index_name=index_name)}/{vespa_chunk_id}"
     logger.debug(f'Indexing to URL "{vespa_url}"')
     res = http_client.post(
@@ -213,17 +267,7 @@ def _index_vespa_chunk(
     try:
         res.raise_for_status()
     except Exception as e:
-        logger.exception(
-            f"Failed to index document: '{document.id}'. Got response: '{res.text}'"
-        )
-        if isinstance(e, httpx.HTTPStatusError):
-            if e.response.status_code == HTTPStatus.INSUFFICIENT_STORAGE:
-                logger.error(
-                    "NOTE: HTTP Status 507 Insufficient Storage usually means "
-                    "you need to allocate more memory or disk space to the "
-                    "Vespa/index container."
-                )
-
+        _log_index_failure(document.id, e, res.text)
         raise e
 
 
@@ -256,6 +300,265 @@ def batch_index_vespa_chunks(
             executor.shutdown(wait=True)
 
 
+@dataclass
+class VespaFeedResult:
+    """Outcome of feeding all of the chunks of a single document"""
+
+    document_id: str
+    chunks_fed: int = 0
+    chunks_failed: int = 0
+    error: str | None = None
+
+    @property
+    def success(self) -> bool:
+        return self.chunks_failed == 0
+
+
+@dataclass
+class _VespaFeedOperation:
+    document_id: str
+    url: str
+    body: bytes
+
+
+def _build_vespa_feed_operation(
+    chunk: DocMetadataAwareIndexChunk,
+    index_name: str,
+    multitenant: bool,
+) -> _VespaFeedOperation:
+    vespa_chunk_id = str(get_uuid_from_chunk(chunk))
+    fields = _build_vespa_chunk_fields(chunk, multitenant, compact_tensors=True)
+    return _VespaFeedOperation(
+        document_id=chunk.source_document.id,
+        url=f"{DOCUMENT_ID_ENDPOINT.format(index_name=index_name)}/{vespa_chunk_id}",
+        # serialized up front and only once, retries resend the same bytes
+        body=json.dumps({"fields": fields}, separators=(",", ":")).encode(),
+    )
+
+
+@retry(tries=5, delay=1, backoff=2)
+def _feed_vespa_operation(
+    operation: _VespaFeedOperation, http_client: httpx.Client
+) -> None:
+    res = http_client.post(
+        operation.url,
+        headers={"Content-Type": "application/json"},
+        content=operation.body,
+    )
+    try:
+        res.raise_for_status()
+    except Exception as e:
+        _log_index_failure(operation.document_id, e, res.text)
+        raise e
+
+
+def feed_vespa_chunks(
+    chunks: Iterable[DocMetadataAwareIndexChunk],
+    index_name: str,
+    http_client: httpx.Client,
+    multitenant: bool,
+    executor: concurrent.futures.ThreadPoolExecutor | None = None,
+    max_in_flight: int = VESPA_FEED_MAX_IN_FLIGHT,
+) -> dict[str, VespaFeedResult]:
+    """Streams put operations for all chunks into Vespa, keeping up to `max_in_flight`
+    requests outstanding at all times instead of waiting on fixed size batches. With an
+    HTTP/2 client, these requests are multiplexed over the client's connection.
+
+    Embeddings are sent in the compact hex tensor form and each operation is serialized once.
+
+    Failure semantics match `batch_index_vespa_chunks`: each operation is retried and if any
+    still fails, no new operations are started and the first error is raised once the
+    outstanding ones finish. Per document results are logged before raising."""
+    external_executor = True
+
+    if not executor:
+        external_executor = False
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=NUM_THREADS)
+
+    results: dict[str, VespaFeedResult] = {}
+    first_error: Exception | None = None
+
+    def _record(
+        future: concurrent.futures.Future[None], operation: _VespaFeedOperation
+    ) -> None:
+        nonlocal first_error
+
+        result = results.setdefault(
+            operation.document_id,
+            VespaFeedResult(document_id=operation.document_id),
+        )
+        try:
+            future.result()
+            result.chunks_fed += 1
+        except Exception as e:
+            result.chunks_failed += 1
+            result.error = str(e)
+            if first_error is None:
+                first_error = e
+
+    in_flight: dict[concurrent.futures.Future[None], _VespaFeedOperation] = {}
+    try:
+        for chunk in chunks:
+            if first_error is not None:
+                break
+
+            operation = _build_vespa_feed_operation(chunk, index_name, multitenant)
+            future = executor.submit(_feed_vespa_operation, operation, http_client)
+            in_flight[future] = operation
+
+            if len(in_flight) >= max_in_flight:
+                done, _ = concurrent.futures.wait(
+                    in_flight, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for done_future in done:
+                    _record(done_future, in_flight.pop(done_future))
+
+        for done_future in concurrent.futures.as_completed(in_flight):
+            _record(done_future, in_flight[done_future])
+    finally:
+        if not external_executor:
+            executor.shutdown(wait=True)
+
+    if first_error is not None:
+        failed = [result for result in results.values() if not result.success]
+        logger.error(
+            f"Vespa feed failed for {len(failed)} document(s): "
+            f"{[result.document_id for result in failed]}"
+        )
+        raise first_error
+
+    return results
+
+
+def _parse_stored_tensor_cells(value: Any) -> list[float]:
+    """Dense tensor cells come back either as a plain list (short-value format) or
+    wrapped in a `values` object"""
+    if isinstance(value, dict):
+        value = value["values"]
+    if isinstance(value, str):
+        cell_count = len(value) // 8
+        return list(struct.unpack(f">{cell_count}f", bytes.fromhex(value)))
+    return [float(cell) for cell in value]
+
+
+def _parse_stored_chunk_embedding(
+    fields: dict[str, Any],
+) -> StoredChunkEmbedding | None:
+    content_hash = fields.get(CONTENT_HASH)
+    embeddings_field = fields.get(EMBEDDINGS)
+    if not content_hash or not embeddings_field:
+        # chunks written before content hashes existed can't be matched
+        return None
+
+    # the mixed tensor is keyed by block name, either directly (short-value format)
+    # or under `blocks`
+    blocks = embeddings_field.get("blocks", embeddings_field)
+    if isinstance(blocks, list):
+        blocks = {block["address"]["t"]: block["values"] for block in blocks}
+    if "full_chunk" not in blocks:
+        return None
+
+    mini_chunk_names = sorted(
+        (name for name in blocks if name.startswith("mini_chunk_")),
+        key=lambda name: int(name.removeprefix("mini_chunk_")),
+    )
+
+    title_embedding_field = fields.get(TITLE_EMBEDDING)
+    return StoredChunkEmbedding(
+        content_hash=content_hash,
+        embeddings=ChunkEmbedding(
+            full_embedding=_parse_stored_tensor_cells(blocks["full_chunk"]),
+            mini_chunk_embeddings=[
+                _parse_stored_tensor_cells(blocks[name]) for name in mini_chunk_names
+            ],
+        ),
+        title_embedding=(
+            _parse_stored_tensor_cells(title_embedding_field)
+            if title_embedding_field
+            else None
+        ),
+    )
+
+
+@retry(tries=3, delay=1, backoff=2)
+def _get_stored_chunk_embeddings_for_document(
+    document_id: str,
+    index_name: str,
+    http_client: httpx.Client,
+    tenant_id: str | None = None,
+) -> list[StoredChunkEmbedding]:
+    """Visits all chunks of a single document rather than fetching them one by one"""
+    # NOTE: visit API uses the same URL as the document API, but with different params
+    url = DOCUMENT_ID_ENDPOINT.format(index_name=index_name)
+
+    escaped_document_id = document_id.replace("\\", "\\\\").replace("'", "\\'")
+    selection = f"{index_name}.document_id=='{escaped_document_id}'"
+    if tenant_id:
+        selection += f" and {index_name}.tenant_id=='{tenant_id}'"
+
+    params: dict[str, str | int] = {
+        "selection": selection,
+        "wantedDocumentCount": 1_000,
+        "fieldSet": f"{index_name}:{CONTENT_HASH},{EMBEDDINGS},{TITLE_EMBEDDING}",
+        "format.tensors": "short-value",
+    }
+
+    stored_embeddings: list[StoredChunkEmbedding] = []
+    while True:
+        response = http_client.get(url, params=params)
+        response.raise_for_status()
+
+        response_data = response.json()
+        for document in response_data.get("documents", []):
+            stored_embedding = _parse_stored_chunk_embedding(document.get("fields", {}))
+            if stored_embedding:
+                stored_embeddings.append(stored_embedding)
+
+        if not response_data.get("continuation"):
+            break
+        params["continuation"] = response_data["continuation"]
+
+    return stored_embeddings
+
+
+def get_stored_chunk_embeddings(
+    document_ids: list[str],
+    index_name: str,
+    http_client: httpx.Client,
+    tenant_id: str | None = None,
+    executor: concurrent.futures.ThreadPoolExecutor | None = None,
+) -> dict[str, StoredChunkEmbedding]:
+    """Fetches the embeddings currently stored for the chunks of the given documents, keyed
+    by the content hash they were computed from. Chunks without a hash are skipped.
+    """
+    external_executor = True
+
+    if not executor:
+        external_executor = False
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=NUM_THREADS)
+
+    stored_embeddings: dict[str, StoredChunkEmbedding] = {}
+    try:
+        futures = [
+            executor.submit(
+                _get_stored_chunk_embeddings_for_document,
+                document_id,
+                index_name,
+                http_client,
+                tenant_id,
+            )
+            for document_id in document_ids
+        ]
+        for future in concurrent.futures.as_completed(futures):
+            for stored_embedding in future.result():
+                stored_embeddings[stored_embedding.content_hash] = stored_embedding
+    finally:
+        if not external_executor:
+            executor.shutdown(wait=True)
+
+    return stored_embeddings
+
+
 def clean_chunk_id_copy(
     chunk: DocMetadataAwareIndexChunk,
 ) -> DocMetadataAwareIndexChunk:
@@ -51,6 +51,8 @@ MAX_OR_CONDITIONS = 10
 # so that we can bring this back to default
 VESPA_TIMEOUT = "3s"
 BATCH_SIZE = 128  # Specific to Vespa
+# max number of outstanding put operations when streaming chunks with the bulk feed
+VESPA_FEED_MAX_IN_FLIGHT = 256
 
 TENANT_ID = "tenant_id"
 DOCUMENT_ID = "document_id"
@@ -64,6 +66,7 @@ SKIP_TITLE_EMBEDDING = "skip_title"
 SECTION_CONTINUATION = "section_continuation"
 EMBEDDINGS = "embeddings"
 TITLE_EMBEDDING = "title_embedding"
+CONTENT_HASH = "content_hash"
 ACCESS_CONTROL_LIST = "access_control_list"
 DOCUMENT_SETS = "document_sets"
 LARGE_CHUNK_REFERENCE_IDS = "large_chunk_reference_ids"
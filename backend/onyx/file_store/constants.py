@@ -1,2 +1,4 @@
 MAX_IN_MEMORY_SIZE = 30 * 1024 * 1024  # 30MB
 STANDARD_CHUNK_SIZE = 10 * 1024 * 1024  # 10MB chunks
+# buffer size used when streaming large objects, kept small so that range reads stay cheap
+STREAMING_READ_BUFFER_SIZE = 1024 * 1024  # 1MB
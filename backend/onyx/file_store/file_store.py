@@ -1,5 +1,6 @@
 from abc import ABC
 from abc import abstractmethod
+from collections.abc import Iterator
 from typing import IO
 
 from sqlalchemy.orm import Session
@@ -10,8 +11,12 @@ from onyx.db.pg_file_store import create_populate_lobj
 from onyx.db.pg_file_store import delete_lobj_by_id
 from onyx.db.pg_file_store import delete_pgfilestore_by_file_name
 from onyx.db.pg_file_store import get_pgfilestore_by_file_name
+from onyx.db.pg_file_store import iter_lobj_chunks
+from onyx.db.pg_file_store import open_lobj
 from onyx.db.pg_file_store import read_lobj
+from onyx.db.pg_file_store import read_lobj_range
 from onyx.db.pg_file_store import upsert_pgfilestore
+from onyx.file_store.constants import STANDARD_CHUNK_SIZE
 
 
 class FileStore(ABC):
@@ -59,6 +64,40 @@ class FileStore(ABC):
             Contents of the file and metadata dict
         """
 
+    @abstractmethod
+    def open_file(self, file_name: str) -> IO[bytes]:
+        """
+        Open a file by the name for streaming binary reads. The file is seekable and is read
+        from the store as it is consumed, so it is never fully loaded into memory
+
+        Parameters:
+        - file_name: Name of file to open
+
+        Returns:
+            Seekable binary file, only valid while the store's session is not committed
+        """
+
+    @abstractmethod
+    def iter_file_chunks(self, file_name: str, chunk_size: int) -> Iterator[bytes]:
+        """
+        Read the content of a given file by the name in chunks
+
+        Parameters:
+        - file_name: Name of file to read
+        - chunk_size: Max number of bytes per chunk
+        """
+
+    @abstractmethod
+    def read_file_range(self, file_name: str, offset: int, length: int) -> bytes:
+        """
+        Read up to `length` bytes of a given file by the name, starting at `offset`
+
+        Parameters:
+        - file_name: Name of file to read
+        - offset: Position of the first byte to read
+        - length: Max number of bytes to read
+        """
+
     @abstractmethod
     def read_file_record(self, file_name: str) -> PGFileStore:
         """
@@ -119,6 +158,35 @@ class PostgresBackedFileStore(FileStore):
             use_tempfile=use_tempfile,
         )
 
+    def open_file(self, file_name: str) -> IO[bytes]:
+        file_record = get_pgfilestore_by_file_name(
+            file_name=file_name, db_session=self.db_session
+        )
+        return open_lobj(lobj_oid=file_record.lobj_oid, db_session=self.db_session)
+
+    def iter_file_chunks(
+        self, file_name: str, chunk_size: int = STANDARD_CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        file_record = get_pgfilestore_by_file_name(
+            file_name=file_name, db_session=self.db_session
+        )
+        return iter_lobj_chunks(
+            lobj_oid=file_record.lobj_oid,
+            db_session=self.db_session,
+            chunk_size=chunk_size,
+        )
+
+    def read_file_range(self, file_name: str, offset: int, length: int) -> bytes:
+        file_record = get_pgfilestore_by_file_name(
+            file_name=file_name, db_session=self.db_session
+        )
+        return read_lobj_range(
+            lobj_oid=file_record.lobj_oid,
+            db_session=self.db_session,
+            offset=offset,
+            length=length,
+        )
+
     def read_file_record(self, file_name: str) -> PGFileStore:
         file_record = get_pgfilestore_by_file_name(
             file_name=file_name, db_session=self.db_session
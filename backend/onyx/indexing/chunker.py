@@ -1,3 +1,8 @@
+import multiprocessing
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
 from onyx.configs.app_configs import BLURB_SIZE
 from onyx.configs.app_configs import LARGE_CHUNK_RATIO
 from onyx.configs.app_configs import MINI_CHUNK_SIZE
@@ -32,6 +37,10 @@ CHUNK_MIN_CONTENT = 256
 logger = setup_logger()
 
 
+class _TokenCountMismatchError(Exception):
+    """The running token count of a chunk was lower than its actual token count"""
+
+
 def _get_metadata_suffix_for_document_index(
     metadata: dict[str, str | list[str]], include_separator: bool = False
 ) -> tuple[str, str]:
@@ -138,6 +147,8 @@ class Chunker:
         self.tokenizer = tokenizer
         self.callback = callback
 
+        self._section_separator_token_count = len(tokenizer.tokenize(SECTION_SEPARATOR))
+
         self.blurb_splitter = SentenceSplitter(
             tokenizer=tokenizer.tokenize,
             chunk_size=blurb_size,
@@ -199,10 +210,64 @@ class Chunker:
     ) -> list[DocAwareChunk]:
         """
         Loops through sections of the document, adds metadata and converts them into chunks.
+
+        Rather than re-tokenizing the chunk being built for every section (quadratic for
+        documents with many small sections), its token count is kept as the sum of the
+        token counts of its sections and separators. For the supported tokenizers
+        sections are split on whitespace, so this either matches the token count of the
+        joined text or overestimates it. The actual count is only computed once the
+        running count says a section doesn't fit anymore. In the rare case where the
+        running count turns out to be too low, the document is chunked again with the
+        actual token counts, so the chunks are always the same as tokenizing every time.
         """
+        try:
+            return self._chunk_document_sections(
+                document,
+                title_prefix,
+                metadata_suffix_semantic,
+                metadata_suffix_keyword,
+                content_token_limit,
+                exact_token_counts=False,
+            )
+        except _TokenCountMismatchError:
+            logger.debug(
+                f"Running token count was too low for {document.semantic_identifier}, "
+                "chunking with exact token counts"
+            )
+            return self._chunk_document_sections(
+                document,
+                title_prefix,
+                metadata_suffix_semantic,
+                metadata_suffix_keyword,
+                content_token_limit,
+                exact_token_counts=True,
+            )
+
+    def _count_chunk_tokens(self, chunk_text: str, running_token_count: int) -> int:
+        """Returns the actual token count of the chunk, raises if the running count was
+        too low since decisions based on it may be different from the actual count"""
+        token_count = len(self.tokenizer.tokenize(chunk_text))
+        if token_count > running_token_count:
+            raise _TokenCountMismatchError
+        return token_count
+
+    def _chunk_document_sections(
+        self,
+        document: Document,
+        title_prefix: str,
+        metadata_suffix_semantic: str,
+        metadata_suffix_keyword: str,
+        content_token_limit: int,
+        exact_token_counts: bool,
+    ) -> list[DocAwareChunk]:
         chunks: list[DocAwareChunk] = []
         link_offsets: dict[int, str] = {}
         chunk_text = ""
+        # running token count of chunk_text
+        chunk_token_count = 0
+        # length of chunk_text after shared_precompare_cleanup, which is additive since
+        # sections are joined by whitespace
+        chunk_offset = 0
 
         def _create_chunk(
             text: str,
@@ -247,9 +312,13 @@ class Chunker:
             # at the end by other sections
             if section_token_count > content_token_limit:
                 if chunk_text:
+                    if not exact_token_counts:
+                        self._count_chunk_tokens(chunk_text, chunk_token_count)
                     chunks.append(_create_chunk(chunk_text, link_offsets))
                     link_offsets = {}
                     chunk_text = ""
+                    chunk_token_count = 0
+                    chunk_offset = 0
 
                 split_texts = self.chunk_splitter.split_text(section_text)
 
@@ -285,27 +354,50 @@ class Chunker:
 
                 continue
 
-            current_token_count = len(self.tokenizer.tokenize(chunk_text))
-            current_offset = len(shared_precompare_cleanup(chunk_text))
+            current_token_count = (
+                len(self.tokenizer.tokenize(chunk_text))
+                if exact_token_counts
+                else chunk_token_count
+            )
             # In the case where the whole section is shorter than a chunk, either add
             # to chunk or start a new one
             next_section_tokens = (
-                len(self.tokenizer.tokenize(SECTION_SEPARATOR)) + section_token_count
+                self._section_separator_token_count + section_token_count
             )
-            if next_section_tokens + current_token_count <= content_token_limit:
+            section_fits = (
+                next_section_tokens + current_token_count <= content_token_limit
+            )
+            if not section_fits and not exact_token_counts:
+                current_token_count = self._count_chunk_tokens(
+                    chunk_text, chunk_token_count
+                )
+                section_fits = (
+                    next_section_tokens + current_token_count <= content_token_limit
+                )
+
+            section_offset = len(shared_precompare_cleanup(section_text))
+            if section_fits:
                 if chunk_text:
                     chunk_text += SECTION_SEPARATOR
+                    chunk_token_count = current_token_count + next_section_tokens
+                else:
+                    chunk_token_count = section_token_count
                 chunk_text += section_text
-                link_offsets[current_offset] = section_link_text
+                link_offsets[chunk_offset] = section_link_text
+                chunk_offset += section_offset
             else:
                 chunks.append(_create_chunk(chunk_text, link_offsets))
                 link_offsets = {0: section_link_text}
                 chunk_text = section_text
+                chunk_token_count = section_token_count
+                chunk_offset = section_offset
 
         # Once we hit the end, if we're still in the process of building a chunk, add what we have.
         # If there is only whitespace left then don't include it. If there are no chunks at all
         # from the doc, we can just create a single chunk with the title.
         if chunk_text.strip() or not chunks:
+            if not exact_token_counts:
+                self._count_chunk_tokens(chunk_text, chunk_token_count)
             chunks.append(
                 _create_chunk(
                     chunk_text,
@@ -382,3 +474,144 @@ class Chunker:
                 self.callback.progress("Chunker.chunk", len(chunks))
 
         return final_chunks
+
+    def close(self) -> None:
+        """Releases the resources held by the chunker, if any"""
+
+
+# chunker of a chunking worker process, see ParallelChunker
+_worker_chunker: Chunker | None = None
+
+
+def _init_chunking_worker(chunker_kwargs: dict[str, Any]) -> None:
+    global _worker_chunker
+    # loads the tokenizer / sentence splitters once per worker process
+    _worker_chunker = Chunker(**chunker_kwargs)
+
+
+def _chunk_documents_in_worker(documents: list[Document]) -> list[list[DocAwareChunk]]:
+    if _worker_chunker is None:
+        raise RuntimeError("Chunking worker was not initialized")
+    return [_worker_chunker._handle_single_document(document) for document in documents]
+
+
+class ParallelChunker(Chunker):
+    """
+    Chunker that shards the documents across a pool of worker processes. The chunks, the
+    order they are returned in, and the callback's stop checks and progress reports for
+    each document are the same as for the Chunker.
+    """
+
+    # below this, the overhead of sending the documents to the workers isn't worth it
+    MIN_PARALLEL_DOCUMENTS = 2
+    # shards per worker process, more shards balance uneven documents better
+    SHARDS_PER_PROCESS = 4
+
+    def __init__(
+        self,
+        num_processes: int,
+        tokenizer: BaseTokenizer,
+        enable_multipass: bool = False,
+        enable_large_chunks: bool = False,
+        blurb_size: int = BLURB_SIZE,
+        include_metadata: bool = not SKIP_METADATA_IN_CHUNK,
+        chunk_token_limit: int = DOC_EMBEDDING_CONTEXT_SIZE,
+        chunk_overlap: int = CHUNK_OVERLAP,
+        mini_chunk_size: int = MINI_CHUNK_SIZE,
+        callback: IndexingHeartbeatInterface | None = None,
+    ) -> None:
+        chunker_kwargs: dict[str, Any] = dict(
+            tokenizer=tokenizer,
+            enable_multipass=enable_multipass,
+            enable_large_chunks=enable_large_chunks,
+            blurb_size=blurb_size,
+            include_metadata=include_metadata,
+            chunk_token_limit=chunk_token_limit,
+            chunk_overlap=chunk_overlap,
+            mini_chunk_size=mini_chunk_size,
+        )
+        super().__init__(**chunker_kwargs, callback=callback)
+
+        self.num_processes = num_processes
+        self._chunker_kwargs = chunker_kwargs
+        self._executor: ProcessPoolExecutor | None = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.num_processes,
+                # fork is unsafe with the threads / connections of the indexing process
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_chunking_worker,
+                initargs=(self._chunker_kwargs,),
+            )
+        return self._executor
+
+    def _shard_documents(self, documents: list[Document]) -> list[list[int]]:
+        """Greedily spreads the documents (by index) over the shards, largest first, so
+        that the shards are about the same size"""
+        num_shards = min(len(documents), self.num_processes * self.SHARDS_PER_PROCESS)
+        shards: list[list[int]] = [[] for _ in range(num_shards)]
+        shard_sizes = [0] * num_shards
+
+        document_sizes = [
+            sum(len(section.text) for section in document.sections)
+            for document in documents
+        ]
+        for document_idx in sorted(
+            range(len(documents)), key=lambda idx: document_sizes[idx], reverse=True
+        ):
+            smallest_shard = shard_sizes.index(min(shard_sizes))
+            shards[smallest_shard].append(document_idx)
+            shard_sizes[smallest_shard] += document_sizes[document_idx] or 1
+
+        return [sorted(shard) for shard in shards if shard]
+
+    def chunk(self, documents: list[Document]) -> list[DocAwareChunk]:
+        if len(documents) < self.MIN_PARALLEL_DOCUMENTS:
+            return super().chunk(documents)
+
+        if self.callback:
+            if self.callback.should_stop():
+                raise RuntimeError("Chunker.chunk: Stop signal detected")
+
+        executor = self._get_executor()
+        shard_futures: list[Future[list[list[DocAwareChunk]]]] = []
+        document_locations: list[tuple[int, int]] = [(0, 0)] * len(documents)
+        for shard_idx, shard in enumerate(self._shard_documents(documents)):
+            shard_futures.append(
+                executor.submit(
+                    _chunk_documents_in_worker,
+                    [documents[document_idx] for document_idx in shard],
+                )
+            )
+            for position, document_idx in enumerate(shard):
+                document_locations[document_idx] = (shard_idx, position)
+
+        final_chunks: list[DocAwareChunk] = []
+        try:
+            for document_idx, document in enumerate(documents):
+                if self.callback and document_idx > 0:
+                    if self.callback.should_stop():
+                        raise RuntimeError("Chunker.chunk: Stop signal detected")
+
+                shard_idx, position = document_locations[document_idx]
+                chunks = shard_futures[shard_idx].result()[position]
+                for chunk in chunks:
+                    # the workers send back copies, keep pointing to the original
+                    chunk.source_document = document
+                final_chunks.extend(chunks)
+
+                if self.callback:
+                    self.callback.progress("Chunker.chunk", len(chunks))
+        except BaseException:
+            for future in shard_futures:
+                future.cancel()
+            raise
+
+        return final_chunks
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
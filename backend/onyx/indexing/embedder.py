@@ -1,3 +1,4 @@
+import hashlib
 import time
 from abc import ABC
 from abc import abstractmethod
@@ -10,6 +11,7 @@ from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
 from onyx.indexing.models import ChunkEmbedding
 from onyx.indexing.models import DocAwareChunk
 from onyx.indexing.models import IndexChunk
+from onyx.indexing.models import StoredChunkEmbedding
 from onyx.natural_language_processing.search_nlp_models import EmbeddingModel
 from onyx.utils.logger import setup_logger
 from onyx.utils.timing import log_function_time
@@ -23,6 +25,12 @@ from shared_configs.model_server_models import Embedding
 logger = setup_logger()
 
 
+def _get_chunk_embedding_text(chunk: DocAwareChunk) -> str | None:
+    return (
+        f"{chunk.title_prefix}{chunk.content}{chunk.metadata_suffix_semantic}"
+    ) or chunk.source_document.get_title_for_document_index()
+
+
 class IndexingEmbedder(ABC):
     """Converts chunks into chunks with embeddings. Note that one chunk may have
     multiple embeddings associated with it."""
@@ -71,9 +79,27 @@ class IndexingEmbedder(ABC):
     def embed_chunks(
         self,
         chunks: list[DocAwareChunk],
+        stored_embeddings: dict[str, StoredChunkEmbedding] | None = None,
     ) -> list[IndexChunk]:
         raise NotImplementedError
 
+    def get_chunk_content_hash(self, chunk: DocAwareChunk) -> str:
+        """Hash of everything that determines a chunk's embeddings. If two chunks share
+        a hash, the embeddings of one can be reused for the other."""
+        hasher = hashlib.sha256()
+        for part in (
+            self.model_name,
+            str(self.normalize),
+            self.passage_prefix or "",
+            _get_chunk_embedding_text(chunk) or "",
+            *(chunk.mini_chunk_texts or []),
+            chunk.source_document.get_title_for_document_index() or "",
+        ):
+            # length prefix so that different splits of the same text hash differently
+            hasher.update(f"{len(part)}:".encode())
+            hasher.update(part.encode())
+        return hasher.hexdigest()
+
 
 class DefaultIndexingEmbedder(IndexingEmbedder):
     def __init__(
@@ -106,19 +132,44 @@ class DefaultIndexingEmbedder(IndexingEmbedder):
     def embed_chunks(
         self,
         chunks: list[DocAwareChunk],
+        stored_embeddings: dict[str, StoredChunkEmbedding] | None = None,
     ) -> list[IndexChunk]:
         """Adds embeddings to the chunks, the title and metadata suffixes are added to the chunk as well
         if they exist. If there is no space for it, it would have been thrown out at the chunking step.
+
+        Chunks whose content hash matches one of the `stored_embeddings` reuse those embeddings
+        instead of being sent to the model server.
         """
+        content_hashes = [self.get_chunk_content_hash(chunk) for chunk in chunks]
+
+        reused_embeddings: dict[int, StoredChunkEmbedding] = {}
+        if stored_embeddings:
+            for ind, (chunk, content_hash) in enumerate(zip(chunks, content_hashes)):
+                stored_embedding = stored_embeddings.get(content_hash)
+                if stored_embedding is None:
+                    continue
+                # guard against a partially written chunk in the index
+                if len(stored_embedding.embeddings.mini_chunk_embeddings) != len(
+                    chunk.mini_chunk_texts or []
+                ):
+                    continue
+                reused_embeddings[ind] = stored_embedding
+
+            logger.debug(
+                f"Reusing stored embeddings for {len(reused_embeddings)} "
+                f"of {len(chunks)} chunks"
+            )
+
         # All chunks at this point must have some non-empty content
         flat_chunk_texts: list[str] = []
         large_chunks_present = False
-        for chunk in chunks:
+        for ind, chunk in enumerate(chunks):
+            if ind in reused_embeddings:
+                continue
+
             if chunk.large_chunk_reference_ids:
                 large_chunks_present = True
-            chunk_text = (
-                f"{chunk.title_prefix}{chunk.content}{chunk.metadata_suffix_semantic}"
-            ) or chunk.source_document.get_title_for_document_index()
+            chunk_text = _get_chunk_embedding_text(chunk)
 
             if not chunk_text:
                 # This should never happen, the document would have been dropped
@@ -135,11 +186,21 @@ class DefaultIndexingEmbedder(IndexingEmbedder):
                     raise RuntimeError("Large chunk contains mini chunks")
                 flat_chunk_texts.extend(chunk.mini_chunk_texts)
 
-        embeddings = self.embedding_model.encode(
-            texts=flat_chunk_texts,
-            text_type=EmbedTextType.PASSAGE,
-            large_chunks_present=large_chunks_present,
-        )
+        embeddings: list[Embedding] = []
+        if flat_chunk_texts:
+            embeddings = self.embedding_model.encode(
+                texts=flat_chunk_texts,
+                text_type=EmbedTextType.PASSAGE,
+                large_chunks_present=large_chunks_present,
+            )
+
+        # Cache the Title embeddings to only have to do it once, starting from the ones
+        # that came along with reused chunks
+        title_embed_dict: dict[str, Embedding] = {}
+        for ind, stored_embedding in reused_embeddings.items():
+            title = chunks[ind].source_document.get_title_for_document_index()
+            if title and stored_embedding.title_embedding is not None:
+                title_embed_dict[title] = stored_embedding.title_embedding
 
         chunk_titles = {
             chunk.source_document.get_title_for_document_index() for chunk in chunks
@@ -148,10 +209,10 @@ class DefaultIndexingEmbedder(IndexingEmbedder):
         # Drop any None or empty strings
         # If there is no title or the title is empty, the title embedding field will be null
         # which is ok, it just won't contribute at all to the scoring.
-        chunk_titles_list = [title for title in chunk_titles if title]
+        chunk_titles_list = [
+            title for title in chunk_titles if title and title not in title_embed_dict
+        ]
 
-        # Cache the Title embeddings to only have to do it once
-        title_embed_dict: dict[str, Embedding] = {}
         if chunk_titles_list:
             title_embeddings = self.embedding_model.encode(
                 chunk_titles_list, text_type=EmbedTextType.PASSAGE
@@ -166,13 +227,21 @@ class DefaultIndexingEmbedder(IndexingEmbedder):
         # Mapping embeddings to chunks
         embedded_chunks: list[IndexChunk] = []
         embedding_ind_start = 0
-        for chunk in chunks:
-            num_embeddings = 1 + (
-                len(chunk.mini_chunk_texts) if chunk.mini_chunk_texts else 0
-            )
-            chunk_embeddings = embeddings[
-                embedding_ind_start : embedding_ind_start + num_embeddings
-            ]
+        for ind, chunk in enumerate(chunks):
+            if ind in reused_embeddings:
+                chunk_embedding = reused_embeddings[ind].embeddings
+            else:
+                num_embeddings = 1 + (
+                    len(chunk.mini_chunk_texts) if chunk.mini_chunk_texts else 0
+                )
+                chunk_embeddings = embeddings[
+                    embedding_ind_start : embedding_ind_start + num_embeddings
+                ]
+                chunk_embedding = ChunkEmbedding(
+                    full_embedding=chunk_embeddings[0],
+                    mini_chunk_embeddings=chunk_embeddings[1:],
+                )
+                embedding_ind_start += num_embeddings
 
             title = chunk.source_document.get_title_for_document_index()
 
@@ -192,14 +261,11 @@ class DefaultIndexingEmbedder(IndexingEmbedder):
 
             new_embedded_chunk = IndexChunk(
                 **chunk.model_dump(),
-                embeddings=ChunkEmbedding(
-                    full_embedding=chunk_embeddings[0],
-                    mini_chunk_embeddings=chunk_embeddings[1:],
-                ),
+                embeddings=chunk_embedding,
                 title_embedding=title_embedding,
+                content_hash=content_hashes[ind],
             )
             embedded_chunks.append(new_embedded_chunk)
-            embedding_ind_start += num_embeddings
 
         return embedded_chunks
 
@@ -226,6 +292,7 @@ class DefaultIndexingEmbedder(IndexingEmbedder):
 def embed_chunks_with_failure_handling(
     chunks: list[DocAwareChunk],
     embedder: IndexingEmbedder,
+    stored_embeddings: dict[str, StoredChunkEmbedding] | None = None,
 ) -> tuple[list[IndexChunk], list[ConnectorFailure]]:
     """Tries to embed all chunks in one large batch. If that batch fails for any reason,
     goes document by document to isolate the failure(s).
@@ -233,7 +300,10 @@ def embed_chunks_with_failure_handling(
 
     # First try to embed all chunks in one batch
     try:
-        return embedder.embed_chunks(chunks=chunks), []
+        return (
+            embedder.embed_chunks(chunks=chunks, stored_embeddings=stored_embeddings),
+            [],
+        )
     except Exception:
         logger.exception("Failed to embed chunk batch. Trying individual docs.")
         # wait a couple seconds to let any rate limits or temporary issues resolve
@@ -249,7 +319,9 @@ def embed_chunks_with_failure_handling(
 
     for doc_id, chunks_for_doc in chunks_by_doc.items():
         try:
-            doc_embedded_chunks = embedder.embed_chunks(chunks=chunks_for_doc)
+            doc_embedded_chunks = embedder.embed_chunks(
+                chunks=chunks_for_doc, stored_embeddings=stored_embeddings
+            )
             embedded_chunks.extend(doc_embedded_chunks)
         except Exception as e:
             logger.exception(f"Failed to embed chunks for document '{doc_id}'")
@@ -1,4 +1,9 @@
+import contextvars
+import multiprocessing
 from collections.abc import Callable
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from functools import partial
 from typing import Protocol
 
@@ -8,6 +13,8 @@ from sqlalchemy.orm import Session
 
 from onyx.access.access import get_access_for_documents
 from onyx.access.models import DocumentAccess
+from onyx.configs.app_configs import ENABLE_EMBEDDING_REUSE
+from onyx.configs.app_configs import INDEXING_CHUNKING_NUM_PROCESSES
 from onyx.configs.app_configs import MAX_DOCUMENT_CHARS
 from onyx.configs.constants import DEFAULT_BOOST
 from onyx.connectors.cross_connector_utils.miscellaneous_utils import (
@@ -21,9 +28,7 @@ from onyx.db.document import fetch_chunk_counts_for_documents
 from onyx.db.document import get_documents_by_ids
 from onyx.db.document import mark_document_as_indexed_for_cc_pair__no_commit
 from onyx.db.document import prepare_to_modify_documents
-from onyx.db.document import update_docs_chunk_count__no_commit
-from onyx.db.document import update_docs_last_modified__no_commit
-from onyx.db.document import update_docs_updated_at__no_commit
+from onyx.db.document import update_docs_after_indexing__no_commit
 from onyx.db.document import upsert_document_by_connector_credential_pair
 from onyx.db.document import upsert_documents
 from onyx.db.document_set import fetch_document_sets_for_documents
@@ -38,11 +43,14 @@ from onyx.document_index.interfaces import DocumentIndex
 from onyx.document_index.interfaces import DocumentMetadata
 from onyx.document_index.interfaces import IndexBatchParams
 from onyx.indexing.chunker import Chunker
+from onyx.indexing.chunker import ParallelChunker
 from onyx.indexing.embedder import embed_chunks_with_failure_handling
 from onyx.indexing.embedder import IndexingEmbedder
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
 from onyx.indexing.models import DocAwareChunk
 from onyx.indexing.models import DocMetadataAwareIndexChunk
+from onyx.indexing.models import IndexChunk
+from onyx.indexing.models import StoredChunkEmbedding
 from onyx.indexing.vector_db_insertion import write_chunks_to_vector_db_with_backoff
 from onyx.utils.logger import setup_logger
 from onyx.utils.timing import log_function_time
@@ -177,24 +185,7 @@ def index_doc_batch_with_handler(
         document_ids = [doc.id for doc in document_batch]
         logger.exception(f"Failed to index document batch: {document_ids}")
 
-        index_pipeline_result = IndexingPipelineResult(
-            new_docs=0,
-            total_docs=len(document_batch),
-            total_chunks=0,
-            failures=[
-                ConnectorFailure(
-                    failed_document=DocumentFailure(
-                        document_id=document.id,
-                        document_link=(
-                            document.sections[0].link if document.sections else None
-                        ),
-                    ),
-                    failure_message=str(e),
-                    exception=e,
-                )
-                for document in document_batch
-            ],
-        )
+        index_pipeline_result = _build_failed_batch_result(document_batch, e)
 
     return index_pipeline_result
 
@@ -308,60 +299,92 @@ def filter_documents(document_batch: list[Document]) -> list[Document]:
     return documents
 
 
-@log_function_time(debug_only=True)
-def index_doc_batch(
-    *,
-    document_batch: list[Document],
-    chunker: Chunker,
-    embedder: IndexingEmbedder,
+def _get_indexed_document_ids(ctx: DocumentBatchPrepareContext) -> list[str]:
+    """IDs of the documents being re-indexed that may have chunks in the index. Documents
+    without a chunk count predate the current chunk ID system but are still included."""
+    return [
+        doc.id
+        for doc in ctx.updatable_docs
+        if (db_doc := ctx.id_to_db_doc_map.get(doc.id)) and db_doc.chunk_count != 0
+    ]
+
+
+def _get_stored_embeddings(
+    indexed_document_ids: list[str],
     document_index: DocumentIndex,
-    index_attempt_metadata: IndexAttemptMetadata,
-    db_session: Session,
     tenant_id: str,
-    ignore_time_skip: bool = False,
-    filter_fnc: Callable[[list[Document]], list[Document]] = filter_documents,
-) -> IndexingPipelineResult:
-    """Takes different pieces of the indexing pipeline and applies it to a batch of documents
-    Note that the documents should already be batched at this point so that it does not inflate the
-    memory requirements
+) -> dict[str, StoredChunkEmbedding] | None:
+    """Fetches the embeddings already indexed for the documents being re-indexed."""
+    if not indexed_document_ids:
+        return None
 
-    Returns a tuple where the first element is the number of new docs and the
-    second element is the number of chunks."""
+    try:
+        return document_index.get_stored_embeddings(
+            indexed_document_ids, tenant_id=tenant_id
+        )
+    except Exception:
+        # reuse is only an optimization, embed everything from scratch instead
+        logger.exception("Failed to fetch stored embeddings, re-embedding all chunks")
+        return None
 
-    no_access = DocumentAccess.build(
-        user_emails=[],
-        user_groups=[],
-        external_user_emails=[],
-        external_user_group_ids=[],
-        is_public=False,
+
+def _build_failed_batch_result(
+    document_batch: list[Document], e: Exception
+) -> IndexingPipelineResult:
+    return IndexingPipelineResult(
+        new_docs=0,
+        total_docs=len(document_batch),
+        total_chunks=0,
+        failures=[
+            ConnectorFailure(
+                failed_document=DocumentFailure(
+                    document_id=document.id,
+                    document_link=(
+                        document.sections[0].link if document.sections else None
+                    ),
+                ),
+                failure_message=str(e),
+                exception=e,
+            )
+            for document in document_batch
+        ],
     )
 
-    filtered_documents = filter_fnc(document_batch)
 
-    ctx = index_doc_batch_prepare(
-        documents=filtered_documents,
-        index_attempt_metadata=index_attempt_metadata,
-        ignore_time_skip=ignore_time_skip,
+def _mark_up_to_date_batch_as_indexed(
+    filtered_documents: list[Document],
+    index_attempt_metadata: IndexAttemptMetadata,
+    db_session: Session,
+) -> IndexingPipelineResult:
+    # even though we didn't actually index anything, we should still
+    # mark them as "completed" for the CC Pair in order to make the
+    # counts match
+    mark_document_as_indexed_for_cc_pair__no_commit(
+        connector_id=index_attempt_metadata.connector_id,
+        credential_id=index_attempt_metadata.credential_id,
+        document_ids=[doc.id for doc in filtered_documents],
         db_session=db_session,
     )
-    if not ctx:
-        # even though we didn't actually index anything, we should still
-        # mark them as "completed" for the CC Pair in order to make the
-        # counts match
-        mark_document_as_indexed_for_cc_pair__no_commit(
-            connector_id=index_attempt_metadata.connector_id,
-            credential_id=index_attempt_metadata.credential_id,
-            document_ids=[doc.id for doc in filtered_documents],
-            db_session=db_session,
-        )
-        db_session.commit()
-        return IndexingPipelineResult(
-            new_docs=0,
-            total_docs=len(filtered_documents),
-            total_chunks=0,
-            failures=[],
-        )
+    db_session.commit()
+    return IndexingPipelineResult(
+        new_docs=0,
+        total_docs=len(filtered_documents),
+        total_chunks=0,
+        failures=[],
+    )
+
 
+def chunk_and_embed_doc_batch(
+    *,
+    ctx: DocumentBatchPrepareContext,
+    chunker: Chunker,
+    embedder: IndexingEmbedder,
+    document_index: DocumentIndex,
+    tenant_id: str,
+    indexed_document_ids: list[str],
+) -> tuple[list[IndexChunk], list[ConnectorFailure]]:
+    """Chunks and embeds the documents of a prepared batch. This does not touch the relational
+    DB, so it is safe to run off of the thread that owns the DB session."""
     doc_descriptors = [
         {
             "doc_id": doc.id,
@@ -376,16 +399,50 @@ def index_doc_batch(
     # a common source of failure for the indexing pipeline
     chunks: list[DocAwareChunk] = chunker.chunk(ctx.updatable_docs)
 
+    stored_embeddings = (
+        _get_stored_embeddings(
+            indexed_document_ids=indexed_document_ids,
+            document_index=document_index,
+            tenant_id=tenant_id,
+        )
+        if ENABLE_EMBEDDING_REUSE and chunks
+        else None
+    )
+
     logger.debug("Starting embedding")
-    chunks_with_embeddings, embedding_failures = (
+    return (
         embed_chunks_with_failure_handling(
             chunks=chunks,
             embedder=embedder,
+            stored_embeddings=stored_embeddings,
         )
         if chunks
         else ([], [])
     )
 
+
+def write_doc_batch(
+    *,
+    filtered_documents: list[Document],
+    ctx: DocumentBatchPrepareContext,
+    chunks_with_embeddings: list[IndexChunk],
+    embedding_failures: list[ConnectorFailure],
+    document_index: DocumentIndex,
+    index_attempt_metadata: IndexAttemptMetadata,
+    db_session: Session,
+    tenant_id: str,
+    large_chunks_enabled: bool,
+) -> IndexingPipelineResult:
+    """Writes the embedded chunks of a prepared batch to the document index and records
+    the outcome in Postgres."""
+    no_access = DocumentAccess.build(
+        user_emails=[],
+        user_groups=[],
+        external_user_emails=[],
+        external_user_group_ids=[],
+        is_public=False,
+    )
+
     updatable_ids = [doc.id for doc in ctx.updatable_docs]
 
     # Acquires a lock on the documents so that no other process can modify them
@@ -460,7 +517,7 @@ def index_doc_batch(
                 doc_id_to_previous_chunk_cnt=doc_id_to_previous_chunk_cnt,
                 doc_id_to_new_chunk_cnt=doc_id_to_new_chunk_cnt,
                 tenant_id=tenant_id,
-                large_chunks_enabled=chunker.enable_large_chunks,
+                large_chunks_enabled=large_chunks_enabled,
             ),
         )
 
@@ -472,27 +529,17 @@ def index_doc_batch(
                 f"Successful IDs: {successful_doc_ids}"
             )
 
-        last_modified_ids = []
         ids_to_new_updated_at = {}
         for doc in ctx.updatable_docs:
-            last_modified_ids.append(doc.id)
             # doc_updated_at is the source's idea (on the other end of the connector)
             # of when the doc was last modified
             if doc.doc_updated_at is None:
                 continue
             ids_to_new_updated_at[doc.id] = doc.doc_updated_at
 
-        update_docs_updated_at__no_commit(
-            ids_to_new_updated_at=ids_to_new_updated_at, db_session=db_session
-        )
-
-        update_docs_last_modified__no_commit(
-            document_ids=last_modified_ids, db_session=db_session
-        )
-
-        update_docs_chunk_count__no_commit(
-            document_ids=updatable_ids,
+        update_docs_after_indexing__no_commit(
             doc_id_to_chunk_count=doc_id_to_new_chunk_cnt,
+            ids_to_new_updated_at=ids_to_new_updated_at,
             db_session=db_session,
         )
 
@@ -520,21 +567,91 @@ def index_doc_batch(
     return result
 
 
-def build_indexing_pipeline(
+@log_function_time(debug_only=True)
+def index_doc_batch(
     *,
+    document_batch: list[Document],
+    chunker: Chunker,
     embedder: IndexingEmbedder,
     document_index: DocumentIndex,
+    index_attempt_metadata: IndexAttemptMetadata,
     db_session: Session,
     tenant_id: str,
-    chunker: Chunker | None = None,
     ignore_time_skip: bool = False,
+    filter_fnc: Callable[[list[Document]], list[Document]] = filter_documents,
+) -> IndexingPipelineResult:
+    """Takes different pieces of the indexing pipeline and applies it to a batch of documents
+    Note that the documents should already be batched at this point so that it does not inflate the
+    memory requirements
+
+    Returns a tuple where the first element is the number of new docs and the
+    second element is the number of chunks."""
+    filtered_documents = filter_fnc(document_batch)
+
+    ctx = index_doc_batch_prepare(
+        documents=filtered_documents,
+        index_attempt_metadata=index_attempt_metadata,
+        ignore_time_skip=ignore_time_skip,
+        db_session=db_session,
+    )
+    if not ctx:
+        return _mark_up_to_date_batch_as_indexed(
+            filtered_documents=filtered_documents,
+            index_attempt_metadata=index_attempt_metadata,
+            db_session=db_session,
+        )
+
+    chunks_with_embeddings, embedding_failures = chunk_and_embed_doc_batch(
+        ctx=ctx,
+        chunker=chunker,
+        embedder=embedder,
+        document_index=document_index,
+        tenant_id=tenant_id,
+        indexed_document_ids=(
+            _get_indexed_document_ids(ctx) if ENABLE_EMBEDDING_REUSE else []
+        ),
+    )
+
+    return write_doc_batch(
+        filtered_documents=filtered_documents,
+        ctx=ctx,
+        chunks_with_embeddings=chunks_with_embeddings,
+        embedding_failures=embedding_failures,
+        document_index=document_index,
+        index_attempt_metadata=index_attempt_metadata,
+        db_session=db_session,
+        tenant_id=tenant_id,
+        large_chunks_enabled=chunker.enable_large_chunks,
+    )
+
+
+def build_chunker(
+    embedder: IndexingEmbedder,
+    db_session: Session,
     callback: IndexingHeartbeatInterface | None = None,
-) -> IndexingPipelineProtocol:
-    """Builds a pipeline which takes in a list (batch) of docs and indexes them."""
+    allow_parallel: bool = False,
+) -> Chunker:
+    """If `allow_parallel` and INDEXING_CHUNKING_NUM_PROCESSES is set, the chunker runs a
+    process pool, which the caller must release with `close` once done indexing"""
     search_settings = get_current_search_settings(db_session)
     multipass_config = get_multipass_config(search_settings)
 
-    chunker = chunker or Chunker(
+    if allow_parallel and INDEXING_CHUNKING_NUM_PROCESSES > 0:
+        # daemonic processes (e.g. indexing jobs spawned as daemons) can't have children
+        if not multiprocessing.current_process().daemon:
+            return ParallelChunker(
+                num_processes=INDEXING_CHUNKING_NUM_PROCESSES,
+                tokenizer=embedder.embedding_model.tokenizer,
+                enable_multipass=multipass_config.multipass_indexing,
+                enable_large_chunks=multipass_config.enable_large_chunks,
+                callback=callback,
+            )
+        logger.warning(
+            "INDEXING_CHUNKING_NUM_PROCESSES is set but this process is daemonic, "
+            "chunking in the current process instead"
+        )
+
+    return Chunker(
         tokenizer=embedder.embedding_model.tokenizer,
         enable_multipass=multipass_config.multipass_indexing,
         enable_large_chunks=multipass_config.enable_large_chunks,
@@ -542,6 +659,22 @@ def build_indexing_pipeline(
         callback=callback,
     )
 
+
+def build_indexing_pipeline(
+    *,
+    embedder: IndexingEmbedder,
+    document_index: DocumentIndex,
+    db_session: Session,
+    tenant_id: str,
+    chunker: Chunker | None = None,
+    ignore_time_skip: bool = False,
+    callback: IndexingHeartbeatInterface | None = None,
+) -> IndexingPipelineProtocol:
+    """Builds a pipeline which takes in a list (batch) of docs and indexes them."""
+    chunker = chunker or build_chunker(
+        embedder=embedder, db_session=db_session, callback=callback
+    )
+
     return partial(
         index_doc_batch_with_handler,
         chunker=chunker,
@@ -551,3 +684,170 @@ def build_indexing_pipeline(
         db_session=db_session,
         tenant_id=tenant_id,
     )
+
+
+@dataclass
+class _InFlightDocBatch:
+    document_batch: list[Document]
+    filtered_documents: list[Document]
+    index_attempt_metadata: IndexAttemptMetadata
+    ctx: DocumentBatchPrepareContext | None = None
+    embed_future: Future[tuple[list[IndexChunk], list[ConnectorFailure]]] | None = None
+    # set if the batch finished (or failed) before reaching the embedding step
+    result: IndexingPipelineResult | None = None
+
+
+class PipelinedIndexingRunner:
+    """Indexes batches of documents with the chunking + embedding of each batch overlapping
+    the document index and Postgres writes of the batch before it.
+
+    Everything that touches the DB session (preparing and writing a batch) stays on the
+    calling thread and happens in submission order, only chunking and embedding run on the
+    background thread. As a result, a batch's result is only available once the next batch
+    has been submitted, or after `flush` is called. `flush` must be called before anything
+    that relies on the submitted batches being indexed (e.g. saving a checkpoint)."""
+
+    def __init__(
+        self,
+        *,
+        chunker: Chunker,
+        embedder: IndexingEmbedder,
+        document_index: DocumentIndex,
+        db_session: Session,
+        tenant_id: str,
+        ignore_time_skip: bool = False,
+    ) -> None:
+        self.chunker = chunker
+        self.embedder = embedder
+        self.document_index = document_index
+        self.db_session = db_session
+        self.tenant_id = tenant_id
+        self.ignore_time_skip = ignore_time_skip
+
+        # a single worker bounds the work queued up ahead of the writes to one batch
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._in_flight: _InFlightDocBatch | None = None
+
+    def _start_batch(
+        self,
+        document_batch: list[Document],
+        index_attempt_metadata: IndexAttemptMetadata,
+    ) -> _InFlightDocBatch:
+        filtered_documents = filter_documents(document_batch)
+        batch = _InFlightDocBatch(
+            document_batch=document_batch,
+            filtered_documents=filtered_documents,
+            index_attempt_metadata=index_attempt_metadata,
+        )
+
+        try:
+            batch.ctx = index_doc_batch_prepare(
+                documents=filtered_documents,
+                index_attempt_metadata=index_attempt_metadata,
+                ignore_time_skip=self.ignore_time_skip,
+                db_session=self.db_session,
+            )
+            if not batch.ctx:
+                batch.result = _mark_up_to_date_batch_as_indexed(
+                    filtered_documents=filtered_documents,
+                    index_attempt_metadata=index_attempt_metadata,
+                    db_session=self.db_session,
+                )
+                return batch
+
+            # DB objects must not be read off of the session's thread, so grab
+            # what's needed from them here
+            indexed_document_ids = (
+                _get_indexed_document_ids(batch.ctx) if ENABLE_EMBEDDING_REUSE else []
+            )
+            batch.embed_future = self._executor.submit(
+                contextvars.copy_context().run,
+                partial(
+                    chunk_and_embed_doc_batch,
+                    ctx=batch.ctx,
+                    chunker=self.chunker,
+                    embedder=self.embedder,
+                    document_index=self.document_index,
+                    tenant_id=self.tenant_id,
+                    indexed_document_ids=indexed_document_ids,
+                ),
+            )
+        except Exception as e:
+            document_ids = [doc.id for doc in document_batch]
+            logger.exception(f"Failed to index document batch: {document_ids}")
+            batch.result = _build_failed_batch_result(document_batch, e)
+
+        return batch
+
+    def _finish_batch(self, batch: _InFlightDocBatch) -> IndexingPipelineResult:
+        if batch.result is not None:
+            return batch.result
+
+        if batch.ctx is None or batch.embed_future is None:
+            raise RuntimeError("Document batch was never prepared for indexing")
+
+        try:
+            chunks_with_embeddings, embedding_failures = batch.embed_future.result()
+            return write_doc_batch(
+                filtered_documents=batch.filtered_documents,
+                ctx=batch.ctx,
+                chunks_with_embeddings=chunks_with_embeddings,
+                embedding_failures=embedding_failures,
+                document_index=self.document_index,
+                index_attempt_metadata=batch.index_attempt_metadata,
+                db_session=self.db_session,
+                tenant_id=self.tenant_id,
+                large_chunks_enabled=self.chunker.enable_large_chunks,
+            )
+        except Exception as e:
+            document_ids = [doc.id for doc in batch.document_batch]
+            logger.exception(f"Failed to index document batch: {document_ids}")
+            return _build_failed_batch_result(batch.document_batch, e)
+
+    def submit(
+        self,
+        document_batch: list[Document],
+        index_attempt_metadata: IndexAttemptMetadata,
+    ) -> list[tuple[list[Document], IndexingPipelineResult]]:
+        """Starts indexing the batch and finishes the previously submitted one. Returns the
+        batches that finished, along with their results, in submission order."""
+        # the metadata is mutated by callers between batches
+        batch = self._start_batch(document_batch, index_attempt_metadata.model_copy())
+        finished = self.flush()
+        self._in_flight = batch
+        return finished
+
+    def flush(self) -> list[tuple[list[Document], IndexingPipelineResult]]:
+        """Finishes all submitted batches. Returns them along with their results."""
+        if self._in_flight is None:
+            return []
+
+        batch = self._in_flight
+        self._in_flight = None
+        return [(batch.document_batch, self._finish_batch(batch))]
+
+    def close(self) -> None:
+        self._in_flight = None
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def build_pipelined_indexing_runner(
+    *,
+    embedder: IndexingEmbedder,
+    document_index: DocumentIndex,
+    db_session: Session,
+    tenant_id: str,
+    chunker: Chunker | None = None,
+    ignore_time_skip: bool = False,
+    callback: IndexingHeartbeatInterface | None = None,
+) -> PipelinedIndexingRunner:
+    """Pipelined equivalent of `build_indexing_pipeline`"""
+    return PipelinedIndexingRunner(
+        chunker=chunker
+        or build_chunker(embedder=embedder, db_session=db_session, callback=callback),
+        embedder=embedder,
+        document_index=document_index,
+        db_session=db_session,
+        tenant_id=tenant_id,
+        ignore_time_skip=ignore_time_skip,
+    )
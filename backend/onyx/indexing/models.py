@@ -68,6 +68,18 @@ class DocAwareChunk(BaseChunk):
 class IndexChunk(DocAwareChunk):
     embeddings: ChunkEmbedding
     title_embedding: Embedding | None
+    # Hash of everything that went into producing the embeddings above, stored alongside
+    # the chunk so that unchanged chunks can reuse their vectors when re-indexed
+    content_hash: str | None = None
+
+
+class StoredChunkEmbedding(BaseModel):
+    """Embeddings of a chunk that is already in the document index, keyed by the
+    content hash they were computed from"""
+
+    content_hash: str
+    embeddings: ChunkEmbedding
+    title_embedding: Embedding | None
 
 
 # TODO(rkuo): currently, this extra metadata sent during indexing is just for speed,
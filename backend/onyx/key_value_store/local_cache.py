@@ -0,0 +1,168 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from prometheus_client import Counter
+
+from onyx.configs.app_configs import KV_STORE_LOCAL_CACHE_MAX_SIZE
+from onyx.configs.app_configs import KV_STORE_LOCAL_CACHE_TTL
+from onyx.redis.redis_pool import get_redis_client
+from onyx.utils.logger import setup_logger
+from shared_configs.configs import POSTGRES_DEFAULT_SCHEMA
+
+logger = setup_logger()
+
+# Channels are not tenant prefixed, the tenant is part of each message instead
+KV_STORE_INVALIDATION_CHANNEL = "onyx_kv_store_invalidation"
+# delay before resubscribing after the invalidation listener loses its connection
+_LISTENER_RETRY_INTERVAL = 5.0
+
+KV_STORE_LOCAL_CACHE_LOOKUPS = Counter(
+    "onyx_kv_store_local_cache_lookups",
+    "Key value store lookups served by the in-process cache",
+    ["result"],
+)
+
+
+class KVStoreLocalCache:
+    """Per process LRU cache with a TTL in front of the key value store.
+
+    Values are cached as serialized JSON so that callers can't mutate the cached copy, and
+    keys that don't exist are cached as well since some hot keys (e.g. flags) are usually
+    unset. Writes through any process publish the tenant + key on a Redis channel, every
+    process listens on it and drops its cached copy. If the listener loses its connection
+    it may have missed invalidations, so the whole cache is dropped, otherwise the TTL
+    bounds how stale an entry can get."""
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        # (tenant_id, key) -> (expires_at, serialized value or None if the key is missing)
+        self._entries: OrderedDict[
+            tuple[str, str], tuple[float, str | None]
+        ] = OrderedDict()
+        # bumped on every invalidation, so that values read from Redis / Postgres
+        # while an invalidation came in are not cached
+        self._generation = 0
+        # the process the listener was started in, forked processes need their own
+        self._listener_pid: int | None = None
+
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl > 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, tenant_id: str, key: str) -> tuple[bool, str | None]:
+        """Returns whether the key was cached and, if so, its serialized value (None if
+        the key is known not to exist)."""
+        if not self.enabled:
+            return False, None
+
+        self._ensure_listener()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get((tenant_id, key))
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end((tenant_id, key))
+                    self.hits += 1
+                    KV_STORE_LOCAL_CACHE_LOOKUPS.labels(result="hit").inc()
+                    return True, value
+                del self._entries[(tenant_id, key)]
+            self.misses += 1
+
+        KV_STORE_LOCAL_CACHE_LOOKUPS.labels(result="miss").inc()
+        return False, None
+
+    def set(self, tenant_id: str, key: str, value: str | None, generation: int) -> None:
+        """`generation` must be read before the value was loaded"""
+        if not self.enabled:
+            return
+
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[(tenant_id, key)] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end((tenant_id, key))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, tenant_id: str, key: str) -> None:
+        """Drops the key in this process and notifies all other processes"""
+        if not self.enabled:
+            return
+
+        self._invalidate_local(tenant_id, key)
+        try:
+            get_redis_client(tenant_id=tenant_id).publish(
+                KV_STORE_INVALIDATION_CHANNEL,
+                json.dumps({"tenant_id": tenant_id, "key": key}),
+            )
+        except Exception:
+            logger.exception(f"Failed to publish invalidation for key '{key}'")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def _invalidate_local(self, tenant_id: str, key: str) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.pop((tenant_id, key), None)
+
+    def _ensure_listener(self) -> None:
+        pid = os.getpid()
+        if self._listener_pid == pid:
+            return
+
+        with self._lock:
+            if self._listener_pid == pid:
+                return
+            # anything inherited from a parent process is not being invalidated
+            self._generation += 1
+            self._entries.clear()
+            self._listener_pid = pid
+
+        threading.Thread(
+            target=self._listen, name="kv-store-cache-invalidation", daemon=True
+        ).start()
+
+    def _listen(self) -> None:
+        while True:
+            try:
+                pubsub = get_redis_client(tenant_id=POSTGRES_DEFAULT_SCHEMA).pubsub(
+                    ignore_subscribe_messages=True
+                )
+                pubsub.subscribe(KV_STORE_INVALIDATION_CHANNEL)
+                for message in pubsub.listen():
+                    payload = json.loads(message["data"])
+                    self._invalidate_local(payload["tenant_id"], payload["key"])
+            except Exception:
+                logger.exception(
+                    "Key value store cache invalidation listener failed, "
+                    "dropping the cache and resubscribing"
+                )
+
+            self.clear()
+            time.sleep(_LISTENER_RETRY_INTERVAL)
+
+
+_kv_store_local_cache = KVStoreLocalCache(
+    max_size=KV_STORE_LOCAL_CACHE_MAX_SIZE, ttl=KV_STORE_LOCAL_CACHE_TTL
+)
+
+
+def get_kv_store_local_cache() -> KVStoreLocalCache:
+    return _kv_store_local_cache
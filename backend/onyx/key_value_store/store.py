@@ -13,6 +13,7 @@ from onyx.db.engine import is_valid_schema_name
 from onyx.db.models import KVStore
 from onyx.key_value_store.interface import KeyValueStore
 from onyx.key_value_store.interface import KvKeyNotFoundError
+from onyx.key_value_store.local_cache import get_kv_store_local_cache
 from onyx.redis.redis_pool import get_redis_client
 from onyx.utils.logger import setup_logger
 from onyx.utils.special_types import JSON_ro
@@ -77,18 +78,31 @@ class PgRedisKVStore(KeyValueStore):
                 session.add(obj)
             session.commit()
 
+        get_kv_store_local_cache().invalidate(self.tenant_id, key)
+
     def load(self, key: str) -> JSON_ro:
+        local_cache = get_kv_store_local_cache()
+        is_cached, cached_value = local_cache.get(self.tenant_id, key)
+        if is_cached:
+            if cached_value is None:
+                raise KvKeyNotFoundError
+            return json.loads(cached_value)
+        generation = local_cache.generation
+
         try:
             redis_value = self.redis_client.get(REDIS_KEY_PREFIX + key)
             if redis_value:
                 assert isinstance(redis_value, bytes)
-                return json.loads(redis_value.decode("utf-8"))
+                serialized_value = redis_value.decode("utf-8")
+                local_cache.set(self.tenant_id, key, serialized_value, generation)
+                return json.loads(serialized_value)
         except Exception as e:
             logger.error(f"Failed to get value from Redis for key '{key}': {str(e)}")
 
         with self._get_session() as session:
             obj = session.query(KVStore).filter_by(key=key).first()
             if not obj:
+                local_cache.set(self.tenant_id, key, None, generation)
                 raise KvKeyNotFoundError
 
             if obj.value is not None:
@@ -98,11 +112,13 @@ class PgRedisKVStore(KeyValueStore):
             else:
                 value = None
 
+            serialized_value = json.dumps(value)
             try:
-                self.redis_client.set(REDIS_KEY_PREFIX + key, json.dumps(value))
+                self.redis_client.set(REDIS_KEY_PREFIX + key, serialized_value)
             except Exception as e:
                 logger.error(f"Failed to set value in Redis for key '{key}': {str(e)}")
 
+            local_cache.set(self.tenant_id, key, serialized_value, generation)
             return cast(JSON_ro, value)
 
     def delete(self, key: str) -> None:
@@ -111,8 +127,11 @@ class PgRedisKVStore(KeyValueStore):
         except Exception as e:
             logger.error(f"Failed to delete value from Redis for key '{key}': {str(e)}")
 
-        with self._get_session() as session:
-            result = session.query(KVStore).filter_by(key=key).delete()  # type: ignore
-            if result == 0:
-                raise KvKeyNotFoundError
-            session.commit()
+        try:
+            with self._get_session() as session:
+                result = session.query(KVStore).filter_by(key=key).delete()  # type: ignore
+                if result == 0:
+                    raise KvKeyNotFoundError
+                session.commit()
+        finally:
+            get_kv_store_local_cache().invalidate(self.tenant_id, key)
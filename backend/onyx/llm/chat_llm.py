@@ -276,16 +276,6 @@ class DefaultMultiLLM(LLM):
         self._custom_llm_provider = custom_llm_provider
         self._long_term_logger = long_term_logger
 
-        # This can be used to store the maximum output tokens for this model.
-        # self._max_output_tokens = (
-        #     max_output_tokens
-        #     if max_output_tokens is not None
-        #     else get_llm_max_output_tokens(
-        #         model_map=litellm.model_cost,
-        #         model_name=model_name,
-        #         model_provider=model_provider,
-        #     )
-        # )
         self._custom_config = custom_config
 
         # Create a dictionary for model-specific arguments if it's None
@@ -1,7 +1,7 @@
-import copy
 import json
 from collections.abc import Callable
 from collections.abc import Iterator
+from dataclasses import dataclass
 from typing import Any
 from typing import cast
 
@@ -350,31 +350,6 @@ def test_llm(llm: LLM) -> str | None:
     return error_msg
 
 
-def get_model_map() -> dict:
-    starting_map = copy.deepcopy(cast(dict, litellm.model_cost))
-
-    # NOTE: we could add additional models here in the future,
-    # but for now there is no point. Ollama allows the user to
-    # to specify their desired max context window, and it's
-    # unlikely to be standard across users even for the same model
-    # (it heavily depends on their hardware). For now, we'll just
-    # rely on GEN_AI_MODEL_FALLBACK_MAX_TOKENS to cover this.
-    # for model_name in [
-    #     "llama3.2",
-    #     "llama3.2:1b",
-    #     "llama3.2:3b",
-    #     "llama3.2:11b",
-    #     "llama3.2:90b",
-    # ]:
-    #     starting_map[f"ollama/{model_name}"] = {
-    #         "max_tokens": 128000,
-    #         "max_input_tokens": 128000,
-    #         "max_output_tokens": 128000,
-    #     }
-
-    return starting_map
-
-
 def _strip_extra_provider_from_model_name(model_name: str) -> str:
     return model_name.split("/")[1] if "/" in model_name else model_name
 
@@ -416,8 +391,74 @@ def _find_model_obj(model_map: dict, provider: str, model_name: str) -> dict | N
     return None
 
 
+@dataclass(frozen=True)
+class ModelCapabilities:
+    # max_input_tokens if litellm knows it, otherwise max_tokens
+    max_input_tokens: int | None
+    # max_output_tokens if litellm knows it, otherwise 10% of max_tokens
+    max_output_tokens: int | None
+    supports_vision: bool
+
+
+# (provider, model name) -> capabilities, None if litellm doesn't know the model
+_MODEL_CAPABILITIES: dict[tuple[str, str], ModelCapabilities | None] = {}
+# the litellm model map the capabilities above were resolved from
+_MODEL_CAPABILITIES_SOURCE: dict | None = None
+
+
+def refresh_model_capabilities() -> None:
+    """Drops the resolved model capabilities. Needs to be called if the litellm model
+    map is updated in place (e.g. through `litellm.register_model`), replacing
+    `litellm.model_cost` altogether is picked up automatically."""
+    global _MODEL_CAPABILITIES_SOURCE
+    _MODEL_CAPABILITIES.clear()
+    _MODEL_CAPABILITIES_SOURCE = cast(dict, litellm.model_cost)
+
+
+def _get_max_output_tokens(model_obj: dict) -> int | None:
+    if "max_output_tokens" in model_obj:
+        return model_obj["max_output_tokens"]
+    # Fallback to a fraction of max_tokens if max_output_tokens is not specified
+    if "max_tokens" in model_obj:
+        return int(model_obj["max_tokens"] * 0.1)
+    return None
+
+
+def get_model_capabilities(
+    model_name: str, model_provider: str
+) -> ModelCapabilities | None:
+    """What litellm knows about a model. The name variants are only looked up in the
+    litellm model map (thousands of entries) the first time a model is seen, after
+    that this is a single dict lookup.
+
+    NOTE: we could add additional models to the litellm model map in the future, but
+    for now there is no point. Ollama allows the user to specify their desired max
+    context window, and it's unlikely to be standard across users even for the same
+    model (it heavily depends on their hardware). For now, we'll just rely on
+    GEN_AI_MODEL_FALLBACK_MAX_TOKENS to cover this."""
+    if litellm.model_cost is not _MODEL_CAPABILITIES_SOURCE:
+        refresh_model_capabilities()
+
+    key = (model_provider, model_name)
+    if key not in _MODEL_CAPABILITIES:
+        model_obj = _find_model_obj(
+            cast(dict, litellm.model_cost), model_provider, model_name
+        )
+        _MODEL_CAPABILITIES[key] = (
+            ModelCapabilities(
+                max_input_tokens=model_obj.get(
+                    "max_input_tokens", model_obj.get("max_tokens")
+                ),
+                max_output_tokens=_get_max_output_tokens(model_obj),
+                supports_vision=bool(model_obj.get("supports_vision", False)),
+            )
+            if model_obj
+            else None
+        )
+    return _MODEL_CAPABILITIES[key]
+
+
 def get_llm_max_tokens(
-    model_map: dict,
     model_name: str,
     model_provider: str,
 ) -> int:
@@ -428,26 +469,15 @@ def get_llm_max_tokens(
         return GEN_AI_MAX_TOKENS
 
     try:
-        model_obj = _find_model_obj(
-            model_map,
-            model_provider,
-            model_name,
-        )
-        if not model_obj:
+        model_capabilities = get_model_capabilities(model_name, model_provider)
+        if not model_capabilities:
             raise RuntimeError(
                 f"No litellm entry found for {model_provider}/{model_name}"
             )
 
-        if "max_input_tokens" in model_obj:
-            max_tokens = model_obj["max_input_tokens"]
-            logger.debug(
-                f"Max tokens for {model_name}: {max_tokens} (from max_input_tokens)"
-            )
-            return max_tokens
-
-        if "max_tokens" in model_obj:
-            max_tokens = model_obj["max_tokens"]
-            logger.debug(f"Max tokens for {model_name}: {max_tokens} (from max_tokens)")
+        if model_capabilities.max_input_tokens is not None:
+            max_tokens = model_capabilities.max_input_tokens
+            logger.debug(f"Max tokens for {model_name}: {max_tokens}")
             return max_tokens
 
         logger.error(f"No max tokens found for LLM: {model_name}")
@@ -460,32 +490,22 @@ def get_llm_max_tokens(
 
 
 def get_llm_max_output_tokens(
-    model_map: dict,
     model_name: str,
     model_provider: str,
 ) -> int:
     """Best effort attempt to get the max output tokens for the LLM"""
     try:
-        model_obj = model_map.get(f"{model_provider}/{model_name}")
-        if not model_obj:
-            model_obj = model_map[model_name]
-            logger.debug(f"Using model object for {model_name}")
-        else:
-            logger.debug(f"Using model object for {model_provider}/{model_name}")
+        model_capabilities = get_model_capabilities(model_name, model_provider)
+        if not model_capabilities:
+            raise RuntimeError(
+                f"No litellm entry found for {model_provider}/{model_name}"
+            )
 
-        if "max_output_tokens" in model_obj:
-            max_output_tokens = model_obj["max_output_tokens"]
+        if model_capabilities.max_output_tokens is not None:
+            max_output_tokens = model_capabilities.max_output_tokens
             logger.info(f"Max output tokens for {model_name}: {max_output_tokens}")
             return max_output_tokens
 
-        # Fallback to a fraction of max_tokens if max_output_tokens is not specified
-        if "max_tokens" in model_obj:
-            max_output_tokens = int(model_obj["max_tokens"] * 0.1)
-            logger.info(
-                f"Fallback max output tokens for {model_name}: {max_output_tokens} (10% of max_tokens)"
-            )
-            return max_output_tokens
-
         logger.error(f"No max output tokens found for LLM: {model_name}")
         raise RuntimeError("No max output tokens found for LLM")
     except Exception:
@@ -507,14 +527,10 @@ def get_max_input_tokens(
     # and there is no other interface to get what we want. This should be okay though, since the
     # `model_cost` dict is a named public interface:
     # https://litellm.vercel.app/docs/completion/token_usage#7-model_cost
-    # model_map is  litellm.model_cost
-    litellm_model_map = get_model_map()
-
     input_toks = (
         get_llm_max_tokens(
             model_name=model_name,
             model_provider=model_provider,
-            model_map=litellm_model_map,
         )
         - output_tokens
     )
@@ -526,18 +542,13 @@ def get_max_input_tokens(
 
 
 def model_supports_image_input(model_name: str, model_provider: str) -> bool:
-    model_map = get_model_map()
     try:
-        model_obj = _find_model_obj(
-            model_map,
-            model_provider,
-            model_name,
-        )
-        if not model_obj:
+        model_capabilities = get_model_capabilities(model_name, model_provider)
+        if not model_capabilities:
             raise RuntimeError(
                 f"No litellm entry found for {model_provider}/{model_name}"
             )
-        return model_obj.get("supports_vision", False)
+        return model_capabilities.supports_vision
     except Exception:
         logger.exception(
             f"Failed to get model object for {model_provider}/{model_name}"
@@ -0,0 +1,199 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import cast
+
+from prometheus_client import Counter
+
+from onyx.configs.model_configs import QUERY_EMBEDDING_CACHE_MAX_SIZE
+from onyx.configs.model_configs import QUERY_EMBEDDING_CACHE_REDIS_ENABLED
+from onyx.configs.model_configs import QUERY_EMBEDDING_CACHE_TTL
+from onyx.db.models import SearchSettings
+from onyx.redis.redis_pool import get_redis_client
+from onyx.utils.logger import setup_logger
+from shared_configs.contextvars import get_current_tenant_id
+from shared_configs.model_server_models import Embedding
+
+logger = setup_logger()
+
+_QUERY_EMBEDDING_CACHE_PREFIX = "query_embedding"
+
+QUERY_EMBEDDING_CACHE_LOOKUPS = Counter(
+    "onyx_query_embedding_cache_lookups",
+    "Query embedding cache lookups by the tier that served them",
+    ["result"],
+)
+
+
+def build_query_embedding_namespace(search_settings: SearchSettings) -> str:
+    """Everything that changes the embedding of a query. The search settings id is
+    included so that switching to new search settings never serves stale embeddings."""
+    settings_hash = hashlib.sha256(
+        json.dumps(
+            [
+                search_settings.model_name,
+                search_settings.normalize,
+                search_settings.query_prefix,
+                search_settings.provider_type,
+                search_settings.api_url,
+                search_settings.api_version,
+                search_settings.deployment_name,
+            ],
+            default=str,
+        ).encode()
+    ).hexdigest()[:16]
+    return f"{search_settings.id}:{settings_hash}"
+
+
+class QueryEmbeddingCache:
+    """Bounded LRU cache of query embeddings with a TTL, optionally backed by Redis so
+    that embeddings are shared across API server processes.
+
+    Entries are kept per tenant and per search settings namespace. When a tenant's
+    search settings change, its in-process entries are dropped and its Redis entries
+    simply stop being read and expire."""
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: float,
+        redis_enabled: bool,
+    ) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.redis_enabled = redis_enabled
+
+        self._lock = threading.Lock()
+        # (tenant_id, namespace, query) -> (expires_at, embedding)
+        self._entries: OrderedDict[
+            tuple[str, str, str], tuple[float, Embedding]
+        ] = OrderedDict()
+        self._tenant_namespaces: dict[str, str] = {}
+
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl > 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.local_hits + self.redis_hits + self.misses
+        if not lookups:
+            return 0.0
+        return (self.local_hits + self.redis_hits) / lookups
+
+    @staticmethod
+    def _redis_key(namespace: str, query: str) -> str:
+        query_hash = hashlib.sha256(query.encode()).hexdigest()
+        return f"{_QUERY_EMBEDDING_CACHE_PREFIX}:{namespace}:{query_hash}"
+
+    def _check_namespace(self, tenant_id: str, namespace: str) -> None:
+        """Must be called with the lock held"""
+        previous_namespace = self._tenant_namespaces.get(tenant_id)
+        if previous_namespace == namespace:
+            return
+
+        if previous_namespace is not None:
+            logger.info(
+                f"Search settings changed for tenant {tenant_id}, "
+                "dropping cached query embeddings"
+            )
+            for key in [key for key in self._entries if key[0] == tenant_id]:
+                del self._entries[key]
+        self._tenant_namespaces[tenant_id] = namespace
+
+    def _set_local(
+        self, key: tuple[str, str, str], embedding: Embedding, expires_at: float
+    ) -> None:
+        """Must be called with the lock held"""
+        self._entries[key] = (expires_at, embedding)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def get(self, namespace: str, query: str) -> Embedding | None:
+        if not self.enabled:
+            return None
+
+        tenant_id = get_current_tenant_id()
+        key = (tenant_id, namespace, query)
+        now = time.monotonic()
+
+        with self._lock:
+            self._check_namespace(tenant_id, namespace)
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, embedding = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.local_hits += 1
+                    QUERY_EMBEDDING_CACHE_LOOKUPS.labels(result="local_hit").inc()
+                    return embedding
+                del self._entries[key]
+
+        if self.redis_enabled:
+            try:
+                redis_value = cast(
+                    bytes | None,
+                    get_redis_client(tenant_id=tenant_id).get(
+                        self._redis_key(namespace, query)
+                    ),
+                )
+            except Exception:
+                logger.exception("Failed to read query embedding from Redis")
+                redis_value = None
+
+            if redis_value is not None:
+                embedding = json.loads(redis_value)
+                with self._lock:
+                    self._set_local(key, embedding, now + self.ttl)
+                    self.redis_hits += 1
+                QUERY_EMBEDDING_CACHE_LOOKUPS.labels(result="redis_hit").inc()
+                return embedding
+
+        with self._lock:
+            self.misses += 1
+        QUERY_EMBEDDING_CACHE_LOOKUPS.labels(result="miss").inc()
+        return None
+
+    def set(self, namespace: str, query: str, embedding: Embedding) -> None:
+        if not self.enabled:
+            return
+
+        tenant_id = get_current_tenant_id()
+        with self._lock:
+            self._check_namespace(tenant_id, namespace)
+            self._set_local(
+                (tenant_id, namespace, query), embedding, time.monotonic() + self.ttl
+            )
+
+        if self.redis_enabled:
+            try:
+                get_redis_client(tenant_id=tenant_id).set(
+                    self._redis_key(namespace, query),
+                    json.dumps(embedding),
+                    ex=int(self.ttl),
+                )
+            except Exception:
+                logger.exception("Failed to write query embedding to Redis")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tenant_namespaces.clear()
+
+
+_query_embedding_cache = QueryEmbeddingCache(
+    max_size=QUERY_EMBEDDING_CACHE_MAX_SIZE,
+    ttl=QUERY_EMBEDDING_CACHE_TTL,
+    redis_enabled=QUERY_EMBEDDING_CACHE_REDIS_ENABLED,
+)
+
+
+def get_query_embedding_cache() -> QueryEmbeddingCache:
+    return _query_embedding_cache
@@ -13,6 +13,7 @@ from requests import RequestException
 from requests import Response
 from retry import retry
 
+from onyx.configs.app_configs import EMBEDDING_LENGTH_BUCKETING_ENABLED
 from onyx.configs.app_configs import INDEXING_EMBEDDING_MODEL_NUM_THREADS
 from onyx.configs.app_configs import LARGE_CHUNK_RATIO
 from onyx.configs.app_configs import SKIP_WARM_UP
@@ -160,6 +161,18 @@ class EmbeddingModel:
         max_seq_length: int,
         num_threads: int = INDEXING_EMBEDDING_MODEL_NUM_THREADS,
     ) -> list[Embedding]:
+        # sort the texts by length so that each batch is padded as little as possible,
+        # `sorted_order[i]` is the original position of the i-th sorted text
+        sorted_order: list[int] | None = None
+        if (
+            EMBEDDING_LENGTH_BUCKETING_ENABLED
+            and not self.provider_type
+            and len(texts) > batch_size
+        ):
+            token_counts = [len(self.tokenizer.encode(text)) for text in texts]
+            sorted_order = sorted(range(len(texts)), key=lambda ind: token_counts[ind])
+            texts = [texts[ind] for ind in sorted_order]
+
         text_batches = batch_list(texts, batch_size)
 
         logger.debug(
@@ -236,6 +249,13 @@ class EmbeddingModel:
                 if self.callback:
                     self.callback.progress("_batch_encode_texts", 1)
 
+        if sorted_order is not None:
+            # restore the order the texts were passed in
+            original_order_embeddings: list[Embedding] = [[]] * len(embeddings)
+            for sorted_ind, original_ind in enumerate(sorted_order):
+                original_order_embeddings[original_ind] = embeddings[sorted_ind]
+            embeddings = original_order_embeddings
+
         return embeddings
 
     def encode(
@@ -1,10 +1,14 @@
+import hashlib
 import os
+import threading
 from abc import ABC
 from abc import abstractmethod
+from collections import OrderedDict
 from copy import copy
 
 from transformers import logging as transformer_logging  # type:ignore
 
+from onyx.configs.chat_configs import TOKEN_COUNT_CACHE_MAX_SIZE
 from onyx.configs.model_configs import DOC_EMBEDDING_CONTEXT_SIZE
 from onyx.configs.model_configs import DOCUMENT_ENCODER_MODEL
 from onyx.context.search.models import InferenceChunk
@@ -155,6 +159,31 @@ def get_tokenizer(
     return _check_tokenizer_cache(provider_type, model_name)
 
 
+_TOKEN_COUNT_CACHE: OrderedDict[tuple[BaseTokenizer, bytes], int] = OrderedDict()
+_TOKEN_COUNT_CACHE_LOCK = threading.Lock()
+
+
+def count_tokens(text: str, tokenizer: BaseTokenizer) -> int:
+    """Same as len(tokenizer.encode(text)), but remembers the counts of recently seen
+    texts so that the same text isn't tokenized over and over again."""
+    if TOKEN_COUNT_CACHE_MAX_SIZE <= 0:
+        return len(tokenizer.encode(text))
+
+    key = (tokenizer, hashlib.blake2b(text.encode(), digest_size=16).digest())
+    with _TOKEN_COUNT_CACHE_LOCK:
+        token_count = _TOKEN_COUNT_CACHE.get(key)
+        if token_count is not None:
+            _TOKEN_COUNT_CACHE.move_to_end(key)
+            return token_count
+
+    token_count = len(tokenizer.encode(text))
+    with _TOKEN_COUNT_CACHE_LOCK:
+        _TOKEN_COUNT_CACHE[key] = token_count
+        while len(_TOKEN_COUNT_CACHE) > TOKEN_COUNT_CACHE_MAX_SIZE:
+            _TOKEN_COUNT_CACHE.popitem(last=False)
+    return token_count
+
+
 def tokenizer_trim_content(
     content: str, desired_length: int, tokenizer: BaseTokenizer
 ) -> str:
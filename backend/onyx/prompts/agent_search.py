@@ -496,6 +496,39 @@ Answer:
 """.strip()
 
 
+DOCUMENT_BATCH_VERIFICATION_PROMPT = f"""
+Determine for each of the following numbered document texts whether it contains data or information \
+that is potentially relevant for a question. A document does not have to be fully relevant, but check \
+whether it has some information that would help - possibly in conjunction with other documents - to \
+address the question.
+
+Be careful that you do not use a document where you are not sure whether the text applies to the objects \
+or entities that are relevant for the question. For example, a book about chess could have long passage \
+discussing the psychology of chess without - within the passage - mentioning chess. If now a question \
+is asked about the psychology of football, one could be tempted to use the document as it does discuss \
+psychology in sports. However, it is NOT about football and should not be deemed relevant. Please \
+consider this logic. Judge every document on its own.
+
+DOCUMENT TEXTS:
+{SEPARATOR_LINE}
+{{document_contents}}
+{SEPARATOR_LINE}
+
+Which of these document texts are useful and relevant to answer the following question?
+
+QUESTION:
+{SEPARATOR_LINE}
+{{question}}
+{SEPARATOR_LINE}
+
+Please answer with exactly and only a json object listing the numbers of the relevant documents, \
+like this: {{{{"relevant_documents": [1, 3]}}}}. Use an empty list if no document is relevant. \
+Do NOT include any other text in your response:
+
+Answer:
+""".strip()
+
+
 # Sub-Question Answer Generation
 SUB_QUESTION_RAG_PROMPT = f"""
 Use the context provided below - and only the provided context - to answer the given question. \
@@ -0,0 +1,23 @@
+import uuid
+from typing import cast
+
+from redis import Redis
+
+
+def get_version_stamp(redis_client: Redis, key: str) -> str:
+    """Returns the current value of a version stamp, a random value that is replaced
+    whenever whatever it versions changes, e.g. to invalidate in-process caches across
+    processes. A missing stamp gets a fresh value rather than a fixed initial one, so
+    that anything stamped before Redis lost the key is never current again."""
+    version = cast(bytes | None, redis_client.get(key))
+    if version is not None:
+        return version.decode()
+
+    new_version = uuid.uuid4().hex
+    redis_client.set(key, new_version, nx=True)
+    version = cast(bytes | None, redis_client.get(key))
+    return version.decode() if version is not None else new_version
+
+
+def bump_version_stamp(redis_client: Redis, key: str) -> None:
+    redis_client.set(key, uuid.uuid4().hex)
@@ -22,6 +22,7 @@ from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from ee.onyx.configs.app_configs import SUPER_USERS
+from onyx.access.user_acl_cache import invalidate_user_acls
 from onyx.auth.email_utils import send_user_email_invite
 from onyx.auth.invited_users import get_invited_users
 from onyx.auth.invited_users import write_invited_users
@@ -114,6 +115,7 @@ def set_user_role(
     user_to_update.role = user_role_update_request.new_role
 
     db_session.commit()
+    invalidate_user_acls()
 
 
 @router.get("/manage/users/accepted")
@@ -31,6 +31,7 @@ from onyx.context.search.models import RetrievalDetails
 from onyx.context.search.models import SearchRequest
 from onyx.context.search.pipeline import SearchPipeline
 from onyx.context.search.pipeline import section_relevance_list_impl
+from onyx.context.search.retrieval.retrieval_context import RetrievalContext
 from onyx.db.models import Persona
 from onyx.db.models import User
 from onyx.llm.interfaces import LLM
@@ -156,6 +157,10 @@ class SearchTool(Tool[SearchToolOverrideKwargs]):
                 num_chunk_multiple=num_chunk_multiple, doc_pruning_config=pruning_config
             )
         )
+        # The tool lives for a single chat message, all of its searches (e.g. the
+        # agent search sub-questions) share the search settings, access filters and
+        # the chunks fetched for section expansion
+        self.retrieval_context = RetrievalContext()
 
     @property
     def name(self) -> str:
@@ -336,6 +341,7 @@ class SearchTool(Tool[SearchToolOverrideKwargs]):
             db_session=alternate_db_session or self.db_session,
             prompt_config=self.prompt_config,
             retrieved_sections_callback=retrieved_sections_callback,
+            retrieval_context=self.retrieval_context,
         )
 
         search_query_info = SearchQueryInfo(
@@ -1,7 +1,10 @@
 import contextvars
+import queue
 import threading
 import uuid
 from collections.abc import Callable
+from collections.abc import Generator
+from collections.abc import Iterator
 from concurrent.futures import as_completed
 from concurrent.futures import ThreadPoolExecutor
 from typing import Any
@@ -13,6 +16,7 @@ from onyx.utils.logger import setup_logger
 logger = setup_logger()
 
 R = TypeVar("R")
+T = TypeVar("T")
 
 
 def run_functions_tuples_in_parallel(
@@ -159,3 +163,66 @@ def run_with_timeout(
         task.end()
 
     return task.result
+
+
+_PREFETCH_DONE = object()
+
+
+class _PrefetchFailure:
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+def prefetch_iterator(
+    iterator: Iterator[T], max_prefetch: int
+) -> Generator[T, None, None]:
+    """
+    Consumes an iterator on a background thread, staying up to `max_prefetch` items ahead
+    of the caller. Useful to overlap a slow (e.g. network bound) producer with the work done
+    on each item. Items are yielded in order and exceptions raised by the iterator are
+    re-raised in the caller. If the caller stops early, the background thread stops at the
+    next item and closes the iterator.
+    """
+    items: queue.Queue[Any] = queue.Queue(maxsize=max(max_prefetch, 1))
+    stop_event = threading.Event()
+
+    def _put(item: Any) -> bool:
+        while not stop_event.is_set():
+            try:
+                items.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce() -> None:
+        try:
+            for item in iterator:
+                if not _put(item):
+                    return
+        except BaseException as e:
+            _put(_PrefetchFailure(e))
+            return
+        finally:
+            # a generator stopped early must be finalized on the thread that ran it,
+            # it may hold thread bound resources (e.g. a sqlite connection) across yields
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+        _put(_PREFETCH_DONE)
+
+    # contextvars are propagated so that e.g. the tenant id is set in the producer
+    producer = threading.Thread(
+        target=contextvars.copy_context().run, args=(_produce,), daemon=True
+    )
+    producer.start()
+    try:
+        while True:
+            item = items.get()
+            if item is _PREFETCH_DONE:
+                return
+            if isinstance(item, _PrefetchFailure):
+                raise item.error
+            yield item
+    finally:
+        stop_event.set()
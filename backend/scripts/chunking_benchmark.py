@@ -0,0 +1,108 @@
+"""Benchmarks the Chunker on synthetic documents made up of many short sections, similar to
+Slack threads, spreadsheets or Jira comments.
+
+Basic Usage:
+
+python -m scripts.chunking_benchmark --model nomic-ai/nomic-embed-text-v1
+
+For more options, checkout the bottom of the file.
+"""
+import argparse
+import random
+import statistics
+import time
+
+from onyx.configs.constants import DocumentSource
+from onyx.connectors.models import Document
+from onyx.connectors.models import Section
+from onyx.indexing.chunker import Chunker
+from onyx.natural_language_processing.utils import get_tokenizer
+
+_WORDS = (
+    "the quick brown fox jumps over the lazy dog while the team reviews the "
+    "quarterly roadmap, ships the release and answers customer questions."
+).split()
+
+
+def _build_document(
+    doc_idx: int, num_sections: int, words_per_section: int, rng: random.Random
+) -> Document:
+    sections = [
+        Section(
+            text=" ".join(
+                rng.choice(_WORDS) for _ in range(rng.randint(1, words_per_section))
+            ),
+            link=f"https://example.com/doc_{doc_idx}#section_{section_idx}",
+        )
+        for section_idx in range(num_sections)
+    ]
+    return Document(
+        id=f"doc_{doc_idx}",
+        source=DocumentSource.SLACK,
+        semantic_identifier=f"Document {doc_idx}",
+        title=f"Document {doc_idx}",
+        metadata={"channel": "general"},
+        doc_updated_at=None,
+        sections=sections,
+    )
+
+
+def run_benchmark(
+    model_name: str,
+    num_docs: int,
+    num_sections: int,
+    words_per_section: int,
+    enable_multipass: bool,
+    num_runs: int,
+) -> None:
+    rng = random.Random(0)
+    documents = [
+        _build_document(doc_idx, num_sections, words_per_section, rng)
+        for doc_idx in range(num_docs)
+    ]
+    chunker = Chunker(
+        tokenizer=get_tokenizer(model_name=model_name, provider_type=None),
+        enable_multipass=enable_multipass,
+        enable_large_chunks=enable_multipass,
+    )
+
+    run_times = []
+    num_chunks = 0
+    for run_idx in range(num_runs):
+        start_time = time.monotonic()
+        num_chunks = len(chunker.chunk(documents))
+        run_time = time.monotonic() - start_time
+        run_times.append(run_time)
+        print(f"Run {run_idx + 1}: {run_time:.4f} seconds")
+
+    median_time = statistics.median(run_times)
+    print(
+        f"\n{num_docs} documents x {num_sections} sections -> {num_chunks} chunks"
+        f"\nMedian time: {median_time:.4f} seconds"
+        f"\nSections per second: {num_docs * num_sections / median_time:.0f}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chunker benchmark")
+    parser.add_argument(
+        "--model",
+        type=str,
+        default="nomic-ai/nomic-embed-text-v1",
+        help="Embedding model whose tokenizer is used for chunking",
+    )
+    parser.add_argument("--num-docs", type=int, default=20)
+    parser.add_argument("--num-sections", type=int, default=2000)
+    parser.add_argument("--words-per-section", type=int, default=12)
+    parser.add_argument("--multipass", action="store_true")
+    parser.add_argument("--num-runs", type=int, default=3)
+    args = parser.parse_args()
+
+    run_benchmark(
+        model_name=args.model,
+        num_docs=args.num_docs,
+        num_sections=args.num_sections,
+        words_per_section=args.words_per_section,
+        enable_multipass=args.multipass,
+        num_runs=args.num_runs,
+    )
@@ -0,0 +1,101 @@
+"""Benchmarks the CitationProcessor on long synthetic answers streamed a few characters
+at a time, with citations and code blocks sprinkled in.
+
+Basic Usage:
+
+python -m scripts.citation_processing_benchmark --num-tokens 50000
+
+For more options, checkout the bottom of the file.
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime
+
+from onyx.chat.models import LlmDoc
+from onyx.chat.stream_processing.citation_processing import CitationProcessor
+from onyx.chat.stream_processing.utils import DocumentIdOrderMapping
+from onyx.configs.constants import DocumentSource
+
+_WORDS = (
+    "the quick brown fox jumps over the lazy dog while the team reviews the "
+    "quarterly roadmap, ships the release and answers customer questions."
+).split()
+
+
+def _build_docs(num_docs: int) -> list[LlmDoc]:
+    return [
+        LlmDoc(
+            document_id=f"doc_{doc_idx}",
+            content="Document is a doc",
+            blurb=f"Document #{doc_idx}",
+            semantic_identifier=f"Doc {doc_idx}",
+            source_type=DocumentSource.WEB,
+            metadata={},
+            updated_at=datetime.now(),
+            link=f"https://example.com/{doc_idx}" if doc_idx % 2 == 0 else None,
+            source_links=None,
+            match_highlights=[],
+        )
+        for doc_idx in range(num_docs)
+    ]
+
+
+def _build_tokens(num_tokens: int, num_docs: int, rng: random.Random) -> list[str]:
+    tokens: list[str] = []
+    while len(tokens) < num_tokens:
+        roll = rng.random()
+        if roll < 0.05:
+            tokens += [" [", str(rng.randint(1, num_docs)), "]"]
+        elif roll < 0.06:
+            tokens += ["\n```\n", "x = arr[1]", "\n```\n"]
+        else:
+            tokens.append(" " + rng.choice(_WORDS))
+    return tokens
+
+
+def run_benchmark(num_tokens: int, num_docs: int, num_runs: int) -> None:
+    docs = _build_docs(num_docs)
+    doc_id_to_rank_map = DocumentIdOrderMapping(
+        order_mapping={doc.document_id: rank for rank, doc in enumerate(docs, 1)}
+    )
+    tokens = _build_tokens(num_tokens, num_docs, random.Random(0))
+
+    run_times = []
+    for run_idx in range(num_runs):
+        processor = CitationProcessor(
+            context_docs=docs,
+            final_doc_id_to_rank_map=doc_id_to_rank_map,
+            display_doc_id_to_rank_map=doc_id_to_rank_map,
+        )
+        start_time = time.monotonic()
+        for token in tokens:
+            for _ in processor.process_token(token):
+                pass
+        for _ in processor.process_token(None):
+            pass
+        run_time = time.monotonic() - start_time
+        run_times.append(run_time)
+        print(f"Run {run_idx + 1}: {run_time:.4f} seconds")
+
+    median_time = statistics.median(run_times)
+    print(
+        f"\n{len(tokens)} tokens"
+        f"\nMedian time: {median_time:.4f} seconds"
+        f"\nMicroseconds per token: {median_time / len(tokens) * 1e6:.2f}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CitationProcessor benchmark")
+    parser.add_argument("--num-tokens", type=int, default=50000)
+    parser.add_argument("--num-docs", type=int, default=20)
+    parser.add_argument("--num-runs", type=int, default=3)
+    args = parser.parse_args()
+
+    run_benchmark(
+        num_tokens=args.num_tokens,
+        num_docs=args.num_docs,
+        num_runs=args.num_runs,
+    )
@@ -54,6 +54,17 @@ MIN_THREADS_ML_MODELS = int(os.environ.get("MIN_THREADS_ML_MODELS") or 1)
 # or intent classification
 INDEXING_ONLY = os.environ.get("INDEXING_ONLY", "").lower() == "true"
 
+# If set, concurrent embedding and reranking requests against the same local model are
+# merged into a single batch. An idle model waits up to MODEL_SERVER_BATCH_WINDOW_MS for
+# other requests to join, and a batch holds at most MODEL_SERVER_MAX_BATCH_SIZE texts
+MODEL_SERVER_MICRO_BATCHING_ENABLED = (
+    os.environ.get("MODEL_SERVER_MICRO_BATCHING_ENABLED", "").lower() == "true"
+)
+MODEL_SERVER_BATCH_WINDOW_MS = float(
+    os.environ.get("MODEL_SERVER_BATCH_WINDOW_MS") or 2
+)
+MODEL_SERVER_MAX_BATCH_SIZE = int(os.environ.get("MODEL_SERVER_MAX_BATCH_SIZE") or 64)
+
 # The process needs to have this for the log file to write to
 # otherwise, it will not create additional log files
 LOG_FILE_NAME = os.environ.get("LOG_FILE_NAME") or "onyx"
@@ -0,0 +1,203 @@
+"""
+This file contains tests for the maintained per cc pair document counts:
+- Increments / decrements, including for cc pairs that don't have a count row yet
+- Indexing and deleting documents keeps the counts up to date
+- Reconciling fixes counts that have drifted
+"""
+from uuid import uuid4
+
+from sqlalchemy import select
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from onyx.background.celery.tasks.periodic.tasks import reconcile_document_counts_task
+from onyx.db.document import adjust_document_counts_for_cc_pairs__no_commit
+from onyx.db.document import delete_documents_by_connector_credential_pair__no_commit
+from onyx.db.document import get_document_counts_for_cc_pairs
+from onyx.db.document import mark_document_as_indexed_for_cc_pair__no_commit
+from onyx.db.document import reconcile_document_count_for_cc_pair
+from onyx.db.document import upsert_document_by_connector_credential_pair
+from onyx.db.document import upsert_documents
+from onyx.db.engine import get_session_context_manager
+from onyx.db.models import DocumentCountByConnectorCredentialPair
+from onyx.document_index.interfaces import DocumentMetadata
+from onyx.server.documents.models import ConnectorCredentialPairIdentifier
+from onyx.server.documents.models import DocumentSource
+from shared_configs.configs import POSTGRES_DEFAULT_SCHEMA
+from tests.integration.common_utils.managers.cc_pair import CCPairManager
+from tests.integration.common_utils.managers.user import UserManager
+from tests.integration.common_utils.test_models import DATestCCPair
+
+
+def _create_cc_pairs(num_cc_pairs: int) -> list[DATestCCPair]:
+    admin_user = UserManager.create(name="admin_user")
+    return [
+        CCPairManager.create_from_scratch(
+            source=DocumentSource.INGESTION_API,
+            user_performing_action=admin_user,
+        )
+        for _ in range(num_cc_pairs)
+    ]
+
+
+def _get_document_count(db_session: Session, cc_pair: DATestCCPair) -> int | None:
+    return db_session.scalar(
+        select(DocumentCountByConnectorCredentialPair.document_count).where(
+            DocumentCountByConnectorCredentialPair.connector_id == cc_pair.connector_id,
+            DocumentCountByConnectorCredentialPair.credential_id
+            == cc_pair.credential_id,
+        )
+    )
+
+
+def _set_document_count(
+    db_session: Session, cc_pair: DATestCCPair, document_count: int
+) -> None:
+    db_session.execute(
+        update(DocumentCountByConnectorCredentialPair)
+        .where(
+            DocumentCountByConnectorCredentialPair.connector_id == cc_pair.connector_id,
+            DocumentCountByConnectorCredentialPair.credential_id
+            == cc_pair.credential_id,
+        )
+        .values(document_count=document_count)
+    )
+    db_session.commit()
+
+
+def _add_documents(
+    db_session: Session, cc_pair: DATestCCPair, num_docs: int
+) -> list[str]:
+    doc_ids = [f"test-doc-{uuid4()}" for _ in range(num_docs)]
+    upsert_documents(
+        db_session,
+        [
+            DocumentMetadata(
+                connector_id=cc_pair.connector_id,
+                credential_id=cc_pair.credential_id,
+                document_id=doc_id,
+                semantic_identifier=doc_id,
+                first_link=f"https://example.com/{doc_id}",
+            )
+            for doc_id in doc_ids
+        ],
+    )
+    upsert_document_by_connector_credential_pair(
+        db_session, cc_pair.connector_id, cc_pair.credential_id, doc_ids
+    )
+    return doc_ids
+
+
+def test_adjust_document_counts(reset: None) -> None:
+    cc_pair_1, cc_pair_2 = _create_cc_pairs(2)
+    cc_pair_1_key = (cc_pair_1.connector_id, cc_pair_1.credential_id)
+    cc_pair_2_key = (cc_pair_2.connector_id, cc_pair_2.credential_id)
+
+    with get_session_context_manager() as db_session:
+        # no count rows yet, the first adjustment creates them
+        assert _get_document_count(db_session, cc_pair_1) is None
+        assert _get_document_count(db_session, cc_pair_2) is None
+
+        adjust_document_counts_for_cc_pairs__no_commit(
+            db_session, {cc_pair_1_key: 3, cc_pair_2_key: 2}
+        )
+        db_session.commit()
+        assert _get_document_count(db_session, cc_pair_1) == 3
+        assert _get_document_count(db_session, cc_pair_2) == 2
+
+        adjust_document_counts_for_cc_pairs__no_commit(
+            db_session, {cc_pair_1_key: 1, cc_pair_2_key: -2}
+        )
+        # zero deltas are skipped
+        adjust_document_counts_for_cc_pairs__no_commit(db_session, {cc_pair_1_key: 0})
+        adjust_document_counts_for_cc_pairs__no_commit(db_session, {})
+        db_session.commit()
+        assert _get_document_count(db_session, cc_pair_1) == 4
+        assert _get_document_count(db_session, cc_pair_2) == 0
+
+        # cc pairs without documents are left out
+        assert list(
+            get_document_counts_for_cc_pairs(
+                db_session,
+                [
+                    ConnectorCredentialPairIdentifier(
+                        connector_id=cc_pair.connector_id,
+                        credential_id=cc_pair.credential_id,
+                    )
+                    for cc_pair in [cc_pair_1, cc_pair_2]
+                ],
+            )
+        ) == [(cc_pair_1.connector_id, cc_pair_1.credential_id, 4)]
+
+
+def test_document_counts_follow_indexing_and_deletion(reset: None) -> None:
+    (cc_pair,) = _create_cc_pairs(1)
+
+    with get_session_context_manager() as db_session:
+        doc_ids = _add_documents(db_session, cc_pair, num_docs=3)
+        # added but not indexed yet
+        assert _get_document_count(db_session, cc_pair) is None
+
+        mark_document_as_indexed_for_cc_pair__no_commit(
+            db_session, cc_pair.connector_id, cc_pair.credential_id, doc_ids[:2]
+        )
+        db_session.commit()
+        assert _get_document_count(db_session, cc_pair) == 2
+
+        # re-indexing documents doesn't count them again
+        mark_document_as_indexed_for_cc_pair__no_commit(
+            db_session, cc_pair.connector_id, cc_pair.credential_id, doc_ids[:2]
+        )
+        db_session.commit()
+        assert _get_document_count(db_session, cc_pair) == 2
+
+        # only the indexed document counts
+        delete_documents_by_connector_credential_pair__no_commit(
+            db_session,
+            doc_ids[1:],
+            ConnectorCredentialPairIdentifier(
+                connector_id=cc_pair.connector_id,
+                credential_id=cc_pair.credential_id,
+            ),
+        )
+        db_session.commit()
+        assert _get_document_count(db_session, cc_pair) == 1
+
+
+def test_reconcile_fixes_drifted_document_counts(reset: None) -> None:
+    cc_pair_1, cc_pair_2 = _create_cc_pairs(2)
+
+    with get_session_context_manager() as db_session:
+        for cc_pair in [cc_pair_1, cc_pair_2]:
+            doc_ids = _add_documents(db_session, cc_pair, num_docs=3)
+            mark_document_as_indexed_for_cc_pair__no_commit(
+                db_session, cc_pair.connector_id, cc_pair.credential_id, doc_ids[:2]
+            )
+            db_session.commit()
+
+        _set_document_count(db_session, cc_pair_1, 10)
+        assert (
+            reconcile_document_count_for_cc_pair(
+                db_session, cc_pair_1.connector_id, cc_pair_1.credential_id
+            )
+            == -8
+        )
+        assert _get_document_count(db_session, cc_pair_1) == 2
+
+        # counts that are right are left as is
+        assert (
+            reconcile_document_count_for_cc_pair(
+                db_session, cc_pair_1.connector_id, cc_pair_1.credential_id
+            )
+            == 0
+        )
+
+        # the periodic task reconciles every cc pair
+        _set_document_count(db_session, cc_pair_1, 0)
+        _set_document_count(db_session, cc_pair_2, 5)
+
+    reconcile_document_counts_task(tenant_id=POSTGRES_DEFAULT_SCHEMA)
+
+    with get_session_context_manager() as db_session:
+        assert _get_document_count(db_session, cc_pair_1) == 2
+        assert _get_document_count(db_session, cc_pair_2) == 2
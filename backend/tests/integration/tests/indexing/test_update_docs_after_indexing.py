@@ -0,0 +1,89 @@
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from uuid import uuid4
+
+from sqlalchemy import select
+from sqlalchemy import update
+
+from onyx.db.document import update_docs_after_indexing__no_commit
+from onyx.db.document import upsert_documents
+from onyx.db.engine import get_session_context_manager
+from onyx.db.models import Document as DbDocument
+from onyx.document_index.interfaces import DocumentMetadata
+
+
+def test_update_docs_after_indexing(reset: None) -> None:
+    doc_ids = [f"test-doc-{uuid4()}" for _ in range(3)]
+    long_ago = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    original_doc_updated_at = long_ago + timedelta(days=1)
+    new_doc_updated_at = long_ago + timedelta(days=2)
+
+    with get_session_context_manager() as db_session:
+        upsert_documents(
+            db_session,
+            [
+                DocumentMetadata(
+                    connector_id=1,
+                    credential_id=1,
+                    document_id=doc_id,
+                    semantic_identifier=doc_id,
+                    first_link=f"https://example.com/{doc_id}",
+                )
+                for doc_id in doc_ids
+            ],
+        )
+        # every document starts out with its own values
+        for doc_num, doc_id in enumerate(doc_ids):
+            db_session.execute(
+                update(DbDocument)
+                .where(DbDocument.id == doc_id)
+                .values(
+                    chunk_count=doc_num,
+                    doc_updated_at=original_doc_updated_at,
+                    last_modified=long_ago + timedelta(hours=doc_num),
+                    last_synced=long_ago + timedelta(minutes=doc_num),
+                )
+            )
+        db_session.commit()
+
+        # nothing to update
+        update_docs_after_indexing__no_commit(
+            doc_id_to_chunk_count={}, ids_to_new_updated_at={}, db_session=db_session
+        )
+
+        before_update = datetime.now(timezone.utc)
+        update_docs_after_indexing__no_commit(
+            doc_id_to_chunk_count={doc_ids[0]: 7, doc_ids[1]: 11},
+            ids_to_new_updated_at={doc_ids[0]: new_doc_updated_at},
+            db_session=db_session,
+        )
+        db_session.commit()
+
+    with get_session_context_manager() as db_session:
+        documents = {
+            document.id: document
+            for document in db_session.scalars(
+                select(DbDocument).where(DbDocument.id.in_(doc_ids))
+            )
+        }
+
+    first_doc, second_doc, untouched_doc = (documents[doc_id] for doc_id in doc_ids)
+
+    assert first_doc.chunk_count == 7
+    assert first_doc.doc_updated_at == new_doc_updated_at
+
+    assert second_doc.chunk_count == 11
+    # no new doc_updated_at from the connector, the existing one is kept
+    assert second_doc.doc_updated_at == original_doc_updated_at
+
+    for doc_num, document in enumerate([first_doc, second_doc]):
+        assert document.last_modified is not None
+        assert document.last_modified >= before_update
+        # only indexing related fields change
+        assert document.last_synced == long_ago + timedelta(minutes=doc_num)
+
+    assert untouched_doc.chunk_count == 2
+    assert untouched_doc.doc_updated_at == original_doc_updated_at
+    assert untouched_doc.last_modified == long_ago + timedelta(hours=2)
+    assert untouched_doc.last_synced == long_ago + timedelta(minutes=2)
@@ -0,0 +1,77 @@
+import threading
+from typing import Any
+
+import pytest
+
+from ee.onyx.external_permissions.salesforce import utils as salesforce_utils
+from ee.onyx.external_permissions.salesforce.utils import (
+    get_objects_access_for_user_id,
+)
+
+
+class _FakeSalesforceClient:
+    def __init__(
+        self, readable_record_ids: set[str], concurrent_queries: int = 1
+    ) -> None:
+        self.readable_record_ids = readable_record_ids
+        self.queried_record_ids: list[list[str]] = []
+        self._lock = threading.Lock()
+        # only passes once this many queries are running at the same time
+        self._barrier = threading.Barrier(concurrent_queries, timeout=5)
+
+    def query_all(self, query: str) -> dict[str, Any]:
+        record_ids_str = query.split("IN (")[1].split(")")[0]
+        record_ids = [record_id.strip("'") for record_id in record_ids_str.split(",")]
+        with self._lock:
+            self.queried_record_ids.append(record_ids)
+        self._barrier.wait()
+        return {
+            "records": [
+                {
+                    "RecordId": record_id,
+                    "HasReadAccess": record_id in self.readable_record_ids,
+                }
+                # records the user can't see at all are not returned
+                for record_id in record_ids
+                if record_id != "missing"
+            ]
+        }
+
+
+@pytest.fixture(autouse=True)
+def _clear_object_access_cache() -> None:
+    salesforce_utils._OBJECT_ACCESS_CACHE.clear()
+
+
+def test_objects_access_is_queried_in_batches() -> None:
+    record_ids = [f"record{i}" for i in range(450)] + ["missing"]
+    client = _FakeSalesforceClient(
+        readable_record_ids={"record0", "record449"}, concurrent_queries=3
+    )
+
+    object_access = get_objects_access_for_user_id(
+        client, "user1", record_ids + ["record0"]  # type: ignore[arg-type]
+    )
+
+    assert object_access == {
+        record_id: record_id in ("record0", "record449") for record_id in record_ids
+    }
+    assert sorted(len(batch) for batch in client.queried_record_ids) == [51, 200, 200]
+
+
+def test_objects_access_is_cached_per_user(monkeypatch: pytest.MonkeyPatch) -> None:
+    client = _FakeSalesforceClient(readable_record_ids={"record1"})
+
+    get_objects_access_for_user_id(client, "user1", ["record1"])  # type: ignore[arg-type]
+    object_access = get_objects_access_for_user_id(
+        client, "user1", ["record1", "record2"]  # type: ignore[arg-type]
+    )
+    assert object_access == {"record1": True, "record2": False}
+    assert client.queried_record_ids == [["record1"], ["record2"]]
+
+    get_objects_access_for_user_id(client, "user2", ["record1"])  # type: ignore[arg-type]
+    assert client.queried_record_ids[-1] == ["record1"]
+
+    monkeypatch.setattr(salesforce_utils, "SALESFORCE_OBJECT_ACCESS_CACHE_TTL", 0)
+    get_objects_access_for_user_id(client, "user1", ["record1"])  # type: ignore[arg-type]
+    assert len(client.queried_record_ids) == 4
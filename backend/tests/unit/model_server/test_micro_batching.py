@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from model_server.micro_batching import MicroBatcher
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_coalesced() -> None:
+    batches: list[list[str]] = []
+
+    def process_batch(texts: list[str]) -> list[str]:
+        batches.append(texts)
+        return [text.upper() for text in texts]
+
+    batcher = MicroBatcher(
+        name="test", process_batch=process_batch, max_batch_size=10, batch_window=0.01
+    )
+
+    results = await asyncio.gather(
+        batcher.submit(["a", "b"]), batcher.submit(["c"]), batcher.submit(["d", "e"])
+    )
+
+    assert results == [["A", "B"], ["C"], ["D", "E"]]
+    assert batches == [["a", "b", "c", "d", "e"]]
+
+
+@pytest.mark.asyncio
+async def test_batches_are_capped_at_max_batch_size() -> None:
+    batches: list[list[int]] = []
+
+    def process_batch(items: list[int]) -> list[int]:
+        batches.append(items)
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(
+        name="test", process_batch=process_batch, max_batch_size=3, batch_window=0.01
+    )
+
+    results = await asyncio.gather(
+        batcher.submit([1, 2]), batcher.submit([3, 4]), batcher.submit([5])
+    )
+
+    assert results == [[2, 4], [6, 8], [10]]
+    assert batches == [[1, 2], [3, 4, 5]]
+
+
+@pytest.mark.asyncio
+async def test_failing_request_does_not_fail_the_rest_of_the_batch() -> None:
+    def process_batch(texts: list[str]) -> list[str]:
+        if "bad" in texts:
+            raise ValueError("bad input")
+        return texts
+
+    batcher = MicroBatcher(
+        name="test", process_batch=process_batch, max_batch_size=10, batch_window=0.01
+    )
+
+    good_result, bad_result = await asyncio.gather(
+        batcher.submit(["good"]), batcher.submit(["bad"]), return_exceptions=True
+    )
+
+    assert good_result == ["good"]
+    assert isinstance(bad_result, ValueError)
@@ -0,0 +1,62 @@
+from typing import Any
+from unittest.mock import patch
+from uuid import uuid4
+
+from onyx.access.user_acl_cache import UserAclCache
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.values: dict[str, bytes] = {}
+
+    def get(self, key: str) -> bytes | None:
+        return self.values.get(key)
+
+    def set(self, key: str, value: Any, nx: bool = False) -> None:
+        if nx and key in self.values:
+            return
+        self.values[key] = str(value).encode()
+
+
+def test_user_acl_cache_entries_are_dropped_when_the_version_changes() -> None:
+    cache = UserAclCache(max_size=10, ttl=60)
+    redis_client = _FakeRedis()
+    user_id = uuid4()
+
+    with patch(
+        "onyx.access.user_acl_cache.get_redis_client", return_value=redis_client
+    ):
+        version = cache.get_version("tenant")
+        assert version is not None
+        assert cache.get_version("tenant") == version
+
+        cache.set("tenant", user_id, version, {"PUBLIC", "group:a"})
+        cached_acl = cache.get("tenant", user_id, version)
+        assert cached_acl == {"PUBLIC", "group:a"}
+        # callers get their own copy
+        cached_acl.add("group:b")
+        assert cache.get("tenant", user_id, version) == {"PUBLIC", "group:a"}
+        assert cache.get("other_tenant", user_id, version) is None
+
+        # e.g. an external group sync in another process
+        UserAclCache(max_size=0, ttl=0).invalidate("tenant")
+        new_version = cache.get_version("tenant")
+        assert new_version is not None and new_version != version
+        assert cache.get("tenant", user_id, new_version) is None
+
+        # the key got lost, entries stamped before must not come back
+        cache.set("tenant", user_id, new_version, {"PUBLIC"})
+        redis_client.values.clear()
+        assert cache.get_version("tenant") not in (None, version, new_version)
+
+    assert cache.hits == 2
+    assert cache.misses == 2
+
+
+def test_user_acl_cache_is_not_used_without_redis() -> None:
+    cache = UserAclCache(max_size=10, ttl=60)
+    with patch(
+        "onyx.access.user_acl_cache.get_redis_client",
+        side_effect=ConnectionError("no redis"),
+    ):
+        assert cache.get_version("tenant") is None
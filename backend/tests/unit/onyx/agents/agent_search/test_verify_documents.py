@@ -0,0 +1,102 @@
+from unittest.mock import MagicMock
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from onyx.agents.agent_search.deep_search.shared.expanded_retrieval.nodes.verify_documents import (
+    verify_documents,
+)
+from onyx.agents.agent_search.deep_search.shared.expanded_retrieval.states import (
+    DocVerificationInput,
+)
+from onyx.configs.constants import DocumentSource
+from onyx.context.search.models import InferenceChunk
+from onyx.context.search.models import InferenceSection
+from onyx.llm.chat_llm import LLMTimeoutError
+from onyx.llm.interfaces import LLM
+from onyx.llm.interfaces import LLMConfig
+
+
+def _section(document_id: str) -> InferenceSection:
+    chunk = InferenceChunk(
+        chunk_id=0,
+        document_id=document_id,
+        semantic_identifier=document_id,
+        title=document_id,
+        blurb=document_id,
+        content=f"{document_id} content",
+        source_links={0: "fake_link"},
+        section_continuation=False,
+        source_type=DocumentSource.WEB,
+        boost=0,
+        recency_bias=1.0,
+        score=1.0,
+        hidden=False,
+        metadata={},
+        match_highlights=[],
+        updated_at=None,
+    )
+    return InferenceSection(
+        center_chunk=chunk, chunks=[chunk], combined_content=chunk.content
+    )
+
+
+def _verify(
+    documents: list[InferenceSection], fast_llm: MagicMock
+) -> list[InferenceSection]:
+    graph_config = MagicMock()
+    graph_config.tooling.fast_llm = fast_llm
+    update = verify_documents(
+        DocVerificationInput(
+            retrieved_documents_to_verify=documents,
+            question="What is the question?",
+            base_search=False,
+            log_messages=[],
+        ),
+        {"metadata": {"config": graph_config}},
+    )
+    return update.verified_documents
+
+
+@pytest.fixture
+def fast_llm() -> MagicMock:
+    mock_llm_obj = MagicMock(spec=LLM)
+    mock_llm_obj.config = LLMConfig(
+        model_provider="openai",
+        model_name="gpt-4o",
+        temperature=0.0,
+    )
+    return mock_llm_obj
+
+
+def test_verify_single_document(fast_llm: MagicMock) -> None:
+    document = _section("doc1")
+
+    fast_llm.invoke.return_value = AIMessage(content="yes")
+    assert _verify([document], fast_llm) == [document]
+
+    fast_llm.invoke.return_value = AIMessage(content="no")
+    assert _verify([document], fast_llm) == []
+
+
+def test_verify_document_batch_in_one_call(fast_llm: MagicMock) -> None:
+    documents = [_section(f"doc{doc_num}") for doc_num in range(1, 5)]
+    fast_llm.invoke.return_value = AIMessage(
+        content='```json\n{"relevant_documents": [1, 3, 7]}\n```'
+    )
+
+    assert _verify(documents, fast_llm) == [documents[0], documents[2]]
+    assert fast_llm.invoke.call_count == 1
+    prompt = fast_llm.invoke.call_args.kwargs["prompt"][0].content
+    for doc_num in range(1, 5):
+        assert f"Document {doc_num}:\ndoc{doc_num} content" in prompt
+
+
+def test_verify_document_batch_falls_back_to_relevant(fast_llm: MagicMock) -> None:
+    documents = [_section("doc1"), _section("doc2")]
+
+    fast_llm.invoke.return_value = AIMessage(content="Documents 1 and 2")
+    assert _verify(documents, fast_llm) == documents
+
+    fast_llm.invoke.side_effect = LLMTimeoutError("timed out")
+    assert _verify(documents, fast_llm) == documents
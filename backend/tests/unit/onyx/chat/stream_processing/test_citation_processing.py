@@ -1,3 +1,4 @@
+import random
 from datetime import datetime
 
 import pytest
@@ -5,7 +6,9 @@ import pytest
 from onyx.chat.models import CitationInfo
 from onyx.chat.models import LlmDoc
 from onyx.chat.models import OnyxAnswerPiece
+from onyx.chat.stream_processing.citation_processing import _CodeBlockTracker
 from onyx.chat.stream_processing.citation_processing import CitationProcessor
+from onyx.chat.stream_processing.citation_processing import in_code_block
 from onyx.chat.stream_processing.utils import DocumentIdOrderMapping
 from onyx.configs.constants import DocumentSource
 
@@ -436,3 +439,39 @@ def test_citation_extraction(
     ] == expected_citations, (
         f"Test '{test_name}' failed: Citations do not match expected output."
     )
+
+
+def test_code_block_tracker_matches_in_code_block() -> None:
+    rng = random.Random(0)
+    for _ in range(500):
+        tracker = _CodeBlockTracker()
+        llm_out = ""
+        for _ in range(rng.randint(1, 30)):
+            token = "".join(
+                rng.choice(["`", "`", "``", "a", "\n", " "])
+                for _ in range(rng.randint(1, 5))
+            )
+            tracker.feed(token)
+            llm_out += token
+            assert tracker.in_code_block == in_code_block(llm_out), repr(llm_out)
+
+
+def test_citations_in_long_answer(
+    mock_data: tuple[list[LlmDoc], dict[str, int]],
+) -> None:
+    tokens = []
+    for _ in range(200):
+        tokens += ["Some ", "text ", "[", "1", "]", ". More ", "text [", "3", "]. "]
+    tokens += ["```\n", "x = arr[1]", "\n```", " Done [", "5", "]"]
+
+    final_answer_text, citations = process_text(tokens, mock_data)
+
+    assert final_answer_text.count("[[1]](https://0.com)") == 200
+    assert final_answer_text.count("[[2]]()") == 200
+    assert "```plaintext\nx = arr[1]\n```" in final_answer_text
+    assert final_answer_text.endswith("Done [[3]](https://2.com)")
+    assert [citation.document_id for citation in citations] == [
+        "doc_0",
+        "doc_1",
+        "doc_2",
+    ]
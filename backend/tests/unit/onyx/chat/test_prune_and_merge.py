@@ -1,9 +1,13 @@
 import pytest
 
+from onyx.chat import prune_and_merge
+from onyx.chat.prune_and_merge import _apply_pruning
 from onyx.chat.prune_and_merge import _merge_sections
 from onyx.configs.constants import DocumentSource
 from onyx.context.search.models import InferenceChunk
 from onyx.context.search.models import InferenceSection
+from onyx.llm.interfaces import LLMConfig
+from onyx.natural_language_processing.utils import BaseTokenizer
 
 
 # This large test accounts for all of the following:
@@ -228,3 +232,72 @@ def test_merge_minimal_sections(
     merged_sections = _merge_sections(sections)
     assert merged_sections[0].combined_content == expected_content
     assert merged_sections[0].center_chunk == expected_center_chunk
+
+
+class _WordTokenizer(BaseTokenizer):
+    def __init__(self) -> None:
+        self.num_encoded = 0
+        self.vocab: list[str] = []
+
+    def encode(self, string: str) -> list[int]:
+        self.num_encoded += 1
+        tokens = []
+        for word in string.split():
+            if word not in self.vocab:
+                self.vocab.append(word)
+            tokens.append(self.vocab.index(word))
+        return tokens
+
+    def tokenize(self, string: str) -> list[str]:
+        return string.split()
+
+    def decode(self, tokens: list[int]) -> str:
+        return " ".join(self.vocab[token] for token in tokens)
+
+
+def test_pruning_trims_copies_and_reuses_token_counts(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    tokenizer = _WordTokenizer()
+    monkeypatch.setattr(prune_and_merge, "get_tokenizer", lambda **kwargs: tokenizer)
+    monkeypatch.setattr(prune_and_merge, "DOC_EMBEDDING_CONTEXT_SIZE", 10)
+
+    long_content = " ".join(f"word{i}" for i in range(200))
+    sections = [
+        InferenceSection(
+            center_chunk=DOC_1_TOP_CHUNK,
+            chunks=[DOC_1_TOP_CHUNK],
+            combined_content=long_content,
+        ),
+        InferenceSection(
+            center_chunk=DOC_2_TOP_CHUNK,
+            chunks=[DOC_2_TOP_CHUNK],
+            combined_content="short",
+        ),
+    ]
+
+    def _prune() -> list[InferenceSection]:
+        return _apply_pruning(
+            sections=sections,
+            section_relevance_list=None,
+            token_limit=1000,
+            is_manually_selected_docs=False,
+            use_sections=False,
+            using_tool_message=False,
+            llm_config=LLMConfig(
+                model_provider="openai", model_name="gpt-4o", temperature=0
+            ),
+        )
+
+    pruned_sections = _prune()
+    assert pruned_sections[0].combined_content == " ".join(
+        f"word{i}" for i in range(10)
+    )
+    assert pruned_sections[1] is sections[1]
+    # the caller's sections are left alone
+    assert sections[0].combined_content == long_content
+
+    # the second pass only tokenizes the long section again to trim it
+    num_encoded = tokenizer.num_encoded
+    assert _prune() == pruned_sections
+    assert tokenizer.num_encoded == num_encoded + 1
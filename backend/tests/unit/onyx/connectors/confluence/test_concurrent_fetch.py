@@ -0,0 +1,106 @@
+import re
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+
+from onyx.connectors.confluence import connector as confluence_connector
+from onyx.connectors.confluence.connector import ConfluenceConnector
+from onyx.connectors.models import Document
+
+_NUM_PAGES = 5
+
+
+def _confluence_object(
+    object_id: str, object_type: str, container_id: str | None = None
+) -> dict[str, Any]:
+    confluence_object: dict[str, Any] = {
+        "id": object_id,
+        "type": object_type,
+        "title": f"{object_type} {object_id}",
+        "_links": {"webui": f"/{object_type}/{object_id}"},
+        "body": {"storage": {"value": f"<p>{object_type} {object_id} body</p>"}},
+        "space": {"name": "Space"},
+        "version": {"when": "2024-01-01T00:00:00.000Z"},
+    }
+    if container_id is not None:
+        confluence_object["container"] = {"id": container_id}
+    return confluence_object
+
+
+class _FakeConfluenceClient:
+    """Every page has two comments and pages with an even id have an attachment"""
+
+    def __init__(self) -> None:
+        self.cql_queries: list[str] = []
+
+    def paginated_cql_retrieval(
+        self, cql: str, expand: str | None = None, limit: int | None = None
+    ) -> Iterator[dict[str, Any]]:
+        self.cql_queries.append(cql)
+        if cql.startswith("type=page"):
+            for page_number in range(_NUM_PAGES):
+                yield _confluence_object(str(page_number), "page")
+            return
+
+        object_type = cql.split(" ")[0].removeprefix("type=")
+        for page_id in re.findall(r"container='(\d+)'", cql):
+            if object_type == "comment":
+                for comment_number in range(2):
+                    yield _confluence_object(
+                        f"{page_id}-{comment_number}", "comment", page_id
+                    )
+            elif int(page_id) % 2 == 0:
+                yield _confluence_object(f"{page_id}-a", "attachment", page_id)
+
+
+def _fetch_docs(
+    fetch_concurrency: int, monkeypatch: pytest.MonkeyPatch
+) -> tuple[list[Document], _FakeConfluenceClient]:
+    monkeypatch.setattr(
+        confluence_connector,
+        "attachment_to_content",
+        lambda confluence_client, attachment: f"attachment {attachment['id']}",
+    )
+    connector = ConfluenceConnector(
+        wiki_base="https://example.atlassian.net",
+        is_cloud=True,
+        batch_size=3,
+        labels_to_skip=[],
+        fetch_concurrency=fetch_concurrency,
+    )
+    client = _FakeConfluenceClient()
+    connector._confluence_client = client  # type: ignore
+    return [doc for batch in connector.load_from_state() for doc in batch], client
+
+
+def test_concurrent_fetch_matches_serial_fetch(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    serial_docs, serial_client = _fetch_docs(1, monkeypatch)
+    concurrent_docs, concurrent_client = _fetch_docs(4, monkeypatch)
+
+    assert sorted(serial_docs, key=lambda doc: doc.id) == sorted(
+        concurrent_docs, key=lambda doc: doc.id
+    )
+    id_to_doc = {doc.id: doc for doc in concurrent_docs}
+    page_text = id_to_doc["https://example.atlassian.net/wiki/page/3"].sections[0].text
+    assert "Comment:\ncomment 3-0 body" in page_text
+    assert "Comment:\ncomment 3-1 body" in page_text
+
+    # one query for the pages, then a comment and an attachment query per batch of
+    # pages instead of per page
+    assert len(serial_client.cql_queries) == 1 + 2 * _NUM_PAGES
+    assert len(concurrent_client.cql_queries) == 1 + 2 * 2
+
+    # attachments come right after their page
+    assert [doc.semantic_identifier for doc in concurrent_docs] == [
+        "page 0",
+        "attachment 0-a",
+        "page 1",
+        "page 2",
+        "attachment 2-a",
+        "page 3",
+        "page 4",
+        "attachment 4-a",
+    ]
@@ -5,8 +5,11 @@ import shutil
 from onyx.connectors.salesforce.sqlite_functions import find_ids_by_type
 from onyx.connectors.salesforce.sqlite_functions import get_affected_parent_ids_by_type
 from onyx.connectors.salesforce.sqlite_functions import get_child_ids
+from onyx.connectors.salesforce.sqlite_functions import get_child_ids_for_parents
 from onyx.connectors.salesforce.sqlite_functions import get_record
+from onyx.connectors.salesforce.sqlite_functions import get_records
 from onyx.connectors.salesforce.sqlite_functions import init_db
+from onyx.connectors.salesforce.sqlite_functions import shared_db_connection
 from onyx.connectors.salesforce.sqlite_functions import update_sf_db_with_csv
 from onyx.connectors.salesforce.utils import BASE_DATA_PATH
 from onyx.connectors.salesforce.utils import get_object_type_path
@@ -733,8 +736,50 @@ def _test_get_affected_parent_ids() -> None:
     print("All get_affected_parent_ids tests passed successfully!")
 
 
-def test_salesforce_sqlite() -> None:
-    _clear_sf_db()
+def _test_duplicate_rows_and_batched_lookups() -> None:
+    """
+    Tests that the last row wins when a record shows up more than once in a CSV and
+    that the batched lookups agree with the single record ones.
+    """
+    contacts = [
+        {
+            "Id": _VALID_SALESFORCE_IDS[41],
+            "AccountId": _VALID_SALESFORCE_IDS[0],
+            "LastName": "First Version",
+        },
+        {
+            "Id": _VALID_SALESFORCE_IDS[42],
+            "AccountId": _VALID_SALESFORCE_IDS[0],
+            "LastName": "Other Contact",
+        },
+        {
+            "Id": _VALID_SALESFORCE_IDS[41],
+            "AccountId": _VALID_SALESFORCE_IDS[1],
+            "LastName": "Second Version",
+        },
+    ]
+    _create_csv_file("Contact", contacts, "duplicate_contacts.csv")
+
+    record = get_record(_VALID_SALESFORCE_IDS[41])
+    assert record is not None
+    assert record.data["LastName"] == "Second Version"
+    assert _VALID_SALESFORCE_IDS[41] not in get_child_ids(_VALID_SALESFORCE_IDS[0])
+    assert _VALID_SALESFORCE_IDS[41] in get_child_ids(_VALID_SALESFORCE_IDS[1])
+
+    parent_ids = [_VALID_SALESFORCE_IDS[0], _VALID_SALESFORCE_IDS[1], "missing"]
+    parent_id_to_child_ids = get_child_ids_for_parents(parent_ids)
+    assert "missing" not in parent_id_to_child_ids
+    for parent_id in parent_ids[:2]:
+        assert parent_id_to_child_ids[parent_id] == get_child_ids(parent_id)
+
+    records = get_records([_VALID_SALESFORCE_IDS[41], _VALID_SALESFORCE_IDS[42], "x"])
+    assert set(records) == {_VALID_SALESFORCE_IDS[41], _VALID_SALESFORCE_IDS[42]}
+    for object_id, batched_record in records.items():
+        assert batched_record == get_record(object_id)
+        assert batched_record.type == "Contact"
+
+
+def _test_all() -> None:
     init_db()
     _create_csv_with_example_data()
     _test_query()
@@ -743,4 +788,18 @@ def test_salesforce_sqlite() -> None:
     _test_account_with_children()
     _test_relationship_updates()
     _test_get_affected_parent_ids()
+    _test_duplicate_rows_and_batched_lookups()
+
+
+def test_salesforce_sqlite() -> None:
+    _clear_sf_db()
+    _test_all()
+    _clear_sf_db()
+
+
+def test_salesforce_sqlite_shared_connection() -> None:
+    _clear_sf_db()
+    with shared_db_connection() as conn:
+        _test_all()
+        assert not conn.in_transaction
     _clear_sf_db()
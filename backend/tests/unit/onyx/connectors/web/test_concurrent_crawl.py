@@ -0,0 +1,158 @@
+import threading
+from collections.abc import Generator
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from unittest.mock import MagicMock
+
+import pytest
+
+from onyx.configs.constants import DocumentSource
+from onyx.connectors.models import Document
+from onyx.connectors.models import Section
+from onyx.connectors.web import connector as web_connector
+from onyx.connectors.web.connector import _CrawledPage
+from onyx.connectors.web.connector import _CrawlWorkerClients
+from onyx.connectors.web.connector import _HostRateLimiter
+from onyx.connectors.web.connector import WebConnector
+
+_FILLER = "Some static documentation text that doesn't need a browser. " * 10
+
+_PAGES = {
+    "/docs/": ["/docs/a", "/docs/b"],
+    "/docs/a": ["/docs/b", "/docs/c", "/other"],
+    "/docs/b": ["/docs/"],
+    "/docs/c": ["/docs/missing"],
+}
+
+
+class _DocsSiteHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        links = _PAGES.get(self.path)
+        if links is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        anchors = "".join(f'<a href="{link}">{link}</a>' for link in links)
+        body = (
+            f"<html><head><title>{self.path}</title></head>"
+            f"<body><p>{_FILLER}</p>{anchors}</body></html>"
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def docs_site() -> Generator[str, None, None]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _DocsSiteHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_concurrent_crawl_of_static_site(
+    docs_site: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(web_connector, "WEB_CONNECTOR_MAX_CONCURRENT_PAGES", 3)
+    monkeypatch.setattr(web_connector, "WEB_CONNECTOR_MIN_HOST_REQUEST_INTERVAL", 0)
+
+    rendered_urls: list[str] = []
+
+    def _record_render(
+        self: WebConnector, url: str, base_url: str, context: object
+    ) -> _CrawledPage:
+        rendered_urls.append(url)
+        return _CrawledPage(url=url, final_url=url, error="rendered")
+
+    monkeypatch.setattr(WebConnector, "_render_page", _record_render)
+    # no browser is started
+    monkeypatch.setattr(
+        _CrawlWorkerClients, "get_browser_context", lambda self: MagicMock()
+    )
+
+    connector = WebConnector(base_url=f"{docs_site}/docs/", batch_size=2)
+    batches = list(connector.load_from_state())
+
+    # static pages and missing pages are never rendered in a browser
+    assert rendered_urls == []
+    assert all(len(batch) <= 2 for batch in batches)
+    documents = [doc for batch in batches for doc in batch]
+    # /docs/missing is a 404 and /other is outside of the base url
+    assert sorted(doc.id for doc in documents) == [
+        f"{docs_site}/docs/",
+        f"{docs_site}/docs/a",
+        f"{docs_site}/docs/b",
+        f"{docs_site}/docs/c",
+    ]
+    assert all(_FILLER.strip() in doc.sections[0].text for doc in documents)
+
+
+def test_concurrent_crawl_skips_redirects_to_visited_pages(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(web_connector, "WEB_CONNECTOR_MAX_CONCURRENT_PAGES", 2)
+    monkeypatch.setattr(web_connector, "WEB_CONNECTOR_MIN_HOST_REQUEST_INTERVAL", 0)
+
+    base_url = "https://docs.example.com/"
+    crawled_pages = {
+        base_url: _CrawledPage(
+            url=base_url,
+            final_url=base_url,
+            internal_links={f"{base_url}b", f"{base_url}moved"},
+        ),
+        f"{base_url}b": _CrawledPage(url=f"{base_url}b", final_url=f"{base_url}b"),
+        # e.g. the page changed between the two fetches
+        f"{base_url}moved": _CrawledPage(
+            url=f"{base_url}moved",
+            final_url=f"{base_url}b",
+            internal_links={f"{base_url}only-linked-from-the-redirect"},
+        ),
+    }
+    for crawled_page in crawled_pages.values():
+        crawled_page.document = Document(
+            id=crawled_page.final_url,
+            sections=[Section(link=crawled_page.final_url, text="text")],
+            source=DocumentSource.WEB,
+            semantic_identifier=crawled_page.final_url,
+            metadata={},
+        )
+
+    crawled_urls: list[str] = []
+
+    def _fake_crawl_page(
+        self: WebConnector, url: str, base_url: str, clients: object
+    ) -> _CrawledPage:
+        crawled_urls.append(url)
+        return crawled_pages.get(url) or _CrawledPage(
+            url=url, final_url=url, error="not found"
+        )
+
+    monkeypatch.setattr(WebConnector, "_crawl_page", _fake_crawl_page)
+
+    connector = WebConnector(base_url=base_url, batch_size=10)
+    documents = [doc for batch in connector.load_from_state() for doc in batch]
+
+    assert sorted(crawled_urls) == sorted(crawled_pages)
+    assert sorted(doc.id for doc in documents) == [base_url, f"{base_url}b"]
+
+
+def test_host_rate_limiter_caps_in_flight_pages_per_host() -> None:
+    rate_limiter = _HostRateLimiter(max_in_flight_per_host=2, min_request_interval=0)
+
+    assert rate_limiter.try_acquire("a.com")
+    assert rate_limiter.try_acquire("a.com")
+    assert not rate_limiter.try_acquire("a.com")
+    assert rate_limiter.try_acquire("b.com")
+
+    rate_limiter.release("a.com")
+    assert rate_limiter.try_acquire("a.com")
@@ -0,0 +1,122 @@
+from typing import Any
+
+from onyx.configs.constants import DocumentSource
+from onyx.context.search.models import IndexFilters
+from onyx.context.search.models import InferenceChunkUncleaned
+from onyx.context.search.retrieval.chunk_cache import RetrievedChunkCache
+from onyx.document_index.interfaces import VespaChunkRequest
+
+# document id -> number of chunks in the document
+_DOC_CHUNK_COUNTS = {"doc1": 10, "doc2": 3}
+
+
+def _make_chunk(document_id: str, chunk_id: int) -> InferenceChunkUncleaned:
+    return InferenceChunkUncleaned(
+        chunk_id=chunk_id,
+        document_id=document_id,
+        semantic_identifier=document_id,
+        title=None,
+        blurb=f"{document_id}_{chunk_id}",
+        content=f"{document_id} content {chunk_id}",
+        source_links=None,
+        section_continuation=False,
+        source_type=DocumentSource.WEB,
+        boost=0,
+        recency_bias=1.0,
+        score=None,
+        hidden=False,
+        metadata={},
+        match_highlights=[],
+        updated_at=None,
+        metadata_suffix=None,
+    )
+
+
+class _FakeDocumentIndex:
+    def __init__(self) -> None:
+        self.requests: list[list[tuple[str, int | None, int | None]]] = []
+
+    def id_based_retrieval(
+        self,
+        chunk_requests: list[VespaChunkRequest],
+        filters: IndexFilters,
+        **kwargs: Any,
+    ) -> list[InferenceChunkUncleaned]:
+        self.requests.append(
+            [
+                (request.document_id, request.min_chunk_ind, request.max_chunk_ind)
+                for request in chunk_requests
+            ]
+        )
+        chunks: list[InferenceChunkUncleaned] = []
+        for request in chunk_requests:
+            num_chunks = _DOC_CHUNK_COUNTS.get(request.document_id, 0)
+            max_chunk_ind = (
+                num_chunks - 1
+                if request.max_chunk_ind is None
+                else min(request.max_chunk_ind, num_chunks - 1)
+            )
+            chunks.extend(
+                _make_chunk(request.document_id, chunk_id)
+                for chunk_id in range(request.min_chunk_ind or 0, max_chunk_ind + 1)
+            )
+        return chunks
+
+
+def _chunk_ids(chunks: list[Any]) -> list[tuple[str, int]]:
+    return [(chunk.document_id, chunk.chunk_id) for chunk in chunks]
+
+
+def test_only_uncached_parts_are_fetched() -> None:
+    document_index = _FakeDocumentIndex()
+    chunk_cache = RetrievedChunkCache()
+
+    def _retrieve(*requests: tuple[str, int | None, int | None]) -> list[Any]:
+        return chunk_cache.retrieve(
+            document_index=document_index,  # type: ignore
+            chunk_requests=[
+                VespaChunkRequest(
+                    document_id=document_id,
+                    min_chunk_ind=min_chunk_ind,
+                    max_chunk_ind=max_chunk_ind,
+                )
+                for document_id, min_chunk_ind, max_chunk_ind in requests
+            ],
+        )
+
+    assert _chunk_ids(_retrieve(("doc1", 0, 3))) == [("doc1", i) for i in range(4)]
+    assert _chunk_ids(_retrieve(("doc1", 2, 5), ("doc2", 1, 5))) == [
+        ("doc1", 2),
+        ("doc1", 3),
+        ("doc1", 4),
+        ("doc1", 5),
+        ("doc2", 1),
+        ("doc2", 2),
+    ]
+    # the range past the end of doc2 is known to be empty, a missing document is not
+    assert _chunk_ids(_retrieve(("doc2", 2, 4), ("doc1", 1, 4), ("doc3", 0, 1))) == [
+        ("doc2", 2)
+    ] + [("doc1", i) for i in range(1, 5)]
+    assert _chunk_ids(_retrieve(("doc2", None, None))) == [
+        ("doc2", i) for i in range(3)
+    ]
+
+    assert document_index.requests == [
+        [("doc1", 0, 3)],
+        [("doc1", 4, 5), ("doc2", 1, 5)],
+        [("doc3", 0, 1)],
+        [("doc2", None, None)],
+    ]
+
+
+def test_returned_chunks_are_copies() -> None:
+    document_index = _FakeDocumentIndex()
+    chunk_cache = RetrievedChunkCache()
+    request = VespaChunkRequest(document_id="doc2", min_chunk_ind=0, max_chunk_ind=2)
+
+    chunks = chunk_cache.retrieve(document_index, [request])  # type: ignore
+    chunks[0].score = 100
+
+    chunks = chunk_cache.retrieve(document_index, [request])  # type: ignore
+    assert chunks[0].score is None
+    assert len(document_index.requests) == 1
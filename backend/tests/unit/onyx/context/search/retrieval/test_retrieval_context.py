@@ -0,0 +1,50 @@
+from typing import Any
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+
+from onyx.context.search.retrieval import retrieval_context as retrieval_context_module
+from onyx.context.search.retrieval.retrieval_context import RetrievalContext
+
+
+def test_lookups_are_done_once_per_request(monkeypatch: pytest.MonkeyPatch) -> None:
+    search_settings = MagicMock()
+    settings_lookups: list[Any] = []
+    acl_lookups: list[Any] = []
+
+    def fake_get_current_search_settings(db_session: Any) -> MagicMock:
+        settings_lookups.append(db_session)
+        return search_settings
+
+    def fake_build_access_filters_for_user(user: Any, session: Any) -> list[str]:
+        acl_lookups.append(user)
+        return ["PUBLIC"] if user is None else [f"user_email:{user.email}"]
+
+    monkeypatch.setattr(
+        retrieval_context_module,
+        "get_current_search_settings",
+        fake_get_current_search_settings,
+    )
+    monkeypatch.setattr(
+        retrieval_context_module,
+        "build_access_filters_for_user",
+        fake_build_access_filters_for_user,
+    )
+
+    retrieval_context = RetrievalContext()
+    user = MagicMock(id=uuid4(), email="a@example.com")
+    for _ in range(3):
+        assert retrieval_context.get_search_settings(MagicMock()) is search_settings
+        acl_filters = retrieval_context.get_access_filters(user, MagicMock())
+        assert acl_filters == ["user_email:a@example.com"]
+        # callers get their own copy
+        acl_filters.append("mutated")
+        assert retrieval_context.get_access_filters(None, MagicMock()) == ["PUBLIC"]
+
+    assert len(settings_lookups) == 1
+    assert acl_lookups == [user, None]
+
+    # another request starts from scratch
+    RetrievalContext().get_search_settings(MagicMock())
+    assert len(settings_lookups) == 2
@@ -0,0 +1,68 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from onyx.context.search.retrieval import search_runner
+from onyx.context.search.retrieval.search_runner import doc_index_retrieval
+from onyx.context.search.retrieval.search_runner import get_query_embeddings
+from onyx.natural_language_processing.query_embedding_cache import (
+    QueryEmbeddingCache,
+)
+
+
+@pytest.fixture
+def embedding_model(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
+    model = MagicMock()
+    model.encode.side_effect = lambda texts, text_type: [
+        [float(len(text))] for text in texts
+    ]
+    monkeypatch.setattr(
+        search_runner.EmbeddingModel, "from_db_model", MagicMock(return_value=model)
+    )
+    monkeypatch.setattr(
+        search_runner,
+        "get_query_embedding_cache",
+        lambda: QueryEmbeddingCache(max_size=10, ttl=60, redis_enabled=False),
+    )
+    return model
+
+
+def test_queries_are_embedded_in_one_request(embedding_model: MagicMock) -> None:
+    embeddings = get_query_embeddings(["a", "bb", "a"], MagicMock())
+
+    assert embeddings == [[1.0], [2.0], [1.0]]
+    embedding_model.encode.assert_called_once()
+    assert embedding_model.encode.call_args.args[0] == ["a", "bb"]
+
+
+def test_retrieval_reuses_the_query_embedding(
+    embedding_model: MagicMock, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    query_embedding_cache = QueryEmbeddingCache(
+        max_size=10, ttl=60, redis_enabled=False
+    )
+    monkeypatch.setattr(
+        search_runner, "get_query_embedding_cache", lambda: query_embedding_cache
+    )
+    search_settings = MagicMock()
+    document_index = MagicMock()
+    document_index.hybrid_retrieval.return_value = []
+    query = MagicMock()
+    query.query = "what is onyx"
+
+    for _ in range(2):
+        assert (
+            doc_index_retrieval(
+                query=query,
+                document_index=document_index,
+                db_session=MagicMock(),
+                search_settings=search_settings,
+            )
+            == []
+        )
+
+    embedding_model.encode.assert_called_once()
+    assert [
+        call.kwargs["query_embedding"]
+        for call in document_index.hybrid_retrieval.call_args_list
+    ] == [[12.0], [12.0]]
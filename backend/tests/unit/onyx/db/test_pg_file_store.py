@@ -0,0 +1,58 @@
+import io
+import zipfile
+
+from onyx.db.pg_file_store import _LargeObjectReader
+
+
+class _FakeLargeObject:
+    """Mimics the subset of psycopg2's lobject used for reading"""
+
+    def __init__(self, content: bytes) -> None:
+        self._content = io.BytesIO(content)
+        self.closed = False
+        self.read_sizes: list[int] = []
+
+    def read(self, size: int = -1) -> bytes:
+        self.read_sizes.append(size)
+        return self._content.read(size)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        return self._content.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._content.tell()
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def test_large_object_reader_streams_in_buffered_reads() -> None:
+    content = bytes(range(256)) * 64
+    large_object = _FakeLargeObject(content)
+
+    with io.BufferedReader(
+        _LargeObjectReader(large_object), buffer_size=1024  # type: ignore[arg-type]
+    ) as file:
+        assert file.read(10) == content[:10]
+        file.seek(-20, io.SEEK_END)
+        assert file.read(20) == content[-20:]
+        file.seek(0)
+        assert b"".join(iter(lambda: file.read(100), b"")) == content
+
+    assert large_object.closed
+    # reads go to the large object in buffer sized pieces, never all at once
+    assert max(large_object.read_sizes) <= 1024
+
+
+def test_large_object_reader_supports_zip_files() -> None:
+    zip_buffer = io.BytesIO()
+    with zipfile.ZipFile(zip_buffer, "w") as zip_file:
+        zip_file.writestr("a.txt", "first file")
+        zip_file.writestr("b.txt", "second file")
+
+    file = io.BufferedReader(
+        _LargeObjectReader(_FakeLargeObject(zip_buffer.getvalue()))  # type: ignore[arg-type]
+    )
+    with zipfile.ZipFile(file) as zip_file:
+        assert zip_file.read("b.txt") == b"second file"
+        assert zip_file.read("a.txt") == b"first file"
@@ -0,0 +1,166 @@
+import json
+import struct
+
+import httpx
+import pytest
+
+from onyx.access.models import DocumentAccess
+from onyx.configs.constants import DocumentSource
+from onyx.connectors.models import Document
+from onyx.connectors.models import Section
+from onyx.document_index.vespa.indexing_utils import _parse_stored_chunk_embedding
+from onyx.document_index.vespa.indexing_utils import _tensor_to_hex
+from onyx.document_index.vespa.indexing_utils import feed_vespa_chunks
+from onyx.document_index.vespa.indexing_utils import get_stored_chunk_embeddings
+from onyx.indexing.models import ChunkEmbedding
+from onyx.indexing.models import DocMetadataAwareIndexChunk
+
+
+def _make_chunk(doc_id: str, chunk_id: int) -> DocMetadataAwareIndexChunk:
+    document = Document(
+        id=doc_id,
+        source=DocumentSource.WEB,
+        semantic_identifier=doc_id,
+        metadata={},
+        doc_updated_at=None,
+        sections=[Section(text="Some text", link="link")],
+    )
+    return DocMetadataAwareIndexChunk(
+        chunk_id=chunk_id,
+        blurb="Some text",
+        content="Some text",
+        source_links={0: "link"},
+        section_continuation=False,
+        source_document=document,
+        title_prefix="",
+        metadata_suffix_semantic="",
+        metadata_suffix_keyword="",
+        mini_chunk_texts=None,
+        large_chunk_id=None,
+        large_chunk_reference_ids=[],
+        embeddings=ChunkEmbedding(
+            full_embedding=[0.5, -1.0, 2.0], mini_chunk_embeddings=[[1.0, 0.0, 0.0]]
+        ),
+        title_embedding=[0.25, 0.25, 0.25],
+        tenant_id="public",
+        access=DocumentAccess.build(
+            user_emails=[],
+            user_groups=[],
+            external_user_emails=[],
+            external_user_group_ids=[],
+            is_public=True,
+        ),
+        document_sets=set(),
+        boost=0,
+    )
+
+
+def test_tensor_to_hex_round_trips() -> None:
+    values = [0.5, -1.0, 2.0, 3.1415927]
+    hex_str = _tensor_to_hex(values)
+
+    assert len(hex_str) == len(values) * 8
+    unpacked = struct.unpack(f">{len(values)}f", bytes.fromhex(hex_str))
+    assert list(unpacked) == pytest.approx(values)
+
+
+def test_feed_vespa_chunks_reports_per_document_results() -> None:
+    bodies: list[dict] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        bodies.append(json.loads(request.content))
+        return httpx.Response(200, json={})
+
+    chunks = [_make_chunk("doc_a", 0), _make_chunk("doc_a", 1), _make_chunk("doc_b", 0)]
+    with httpx.Client(transport=httpx.MockTransport(handler)) as http_client:
+        results = feed_vespa_chunks(
+            chunks=chunks,
+            index_name="test_index",
+            http_client=http_client,
+            multitenant=False,
+            max_in_flight=2,
+        )
+
+    assert results["doc_a"].chunks_fed == 2
+    assert results["doc_b"].chunks_fed == 1
+    assert all(result.success for result in results.values())
+
+    assert len(bodies) == 3
+    fields = bodies[0]["fields"]
+    assert fields["embeddings"]["blocks"]["full_chunk"] == _tensor_to_hex(
+        [0.5, -1.0, 2.0]
+    )
+    assert fields["embeddings"]["blocks"]["mini_chunk_0"] == _tensor_to_hex(
+        [1.0, 0.0, 0.0]
+    )
+    assert fields["title_embedding"] == {"values": _tensor_to_hex([0.25, 0.25, 0.25])}
+
+
+def test_parse_stored_chunk_embedding_short_value_format() -> None:
+    stored_embedding = _parse_stored_chunk_embedding(
+        {
+            "content_hash": "abc",
+            "embeddings": {
+                "mini_chunk_10": [3.0],
+                "full_chunk": [1.0],
+                "mini_chunk_2": [2.0],
+            },
+            "title_embedding": [0.5],
+        }
+    )
+
+    assert stored_embedding is not None
+    assert stored_embedding.content_hash == "abc"
+    assert stored_embedding.embeddings.full_embedding == [1.0]
+    assert stored_embedding.embeddings.mini_chunk_embeddings == [[2.0], [3.0]]
+    assert stored_embedding.title_embedding == [0.5]
+
+    # chunks indexed before content hashes were stored can't be reused
+    assert _parse_stored_chunk_embedding({"embeddings": {"full_chunk": [1.0]}}) is None
+
+
+def test_get_stored_chunk_embeddings_visits_each_document_once() -> None:
+    def _stored_chunk(content_hash: str) -> dict:
+        return {
+            "fields": {
+                "content_hash": content_hash,
+                "embeddings": {"full_chunk": [1.0]},
+            }
+        }
+
+    requests: list[httpx.Request] = []
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        selection = request.url.params["selection"]
+        if "doc1" in selection and "continuation" not in request.url.params:
+            return httpx.Response(
+                200,
+                json={"documents": [_stored_chunk("a")], "continuation": "next"},
+            )
+        if "doc1" in selection:
+            return httpx.Response(200, json={"documents": [_stored_chunk("b")]})
+        # chunks indexed before content hashes were stored are skipped
+        return httpx.Response(
+            200, json={"documents": [{"fields": {"embeddings": {"full_chunk": [1.0]}}}]}
+        )
+
+    with httpx.Client(transport=httpx.MockTransport(_handler)) as http_client:
+        stored_embeddings = get_stored_chunk_embeddings(
+            document_ids=["doc1", "doc'2"],
+            index_name="danswer_chunk",
+            http_client=http_client,
+        )
+
+    assert set(stored_embeddings) == {"a", "b"}
+    # one visit per document, plus the continuation of doc1
+    assert sorted(request.url.params["selection"] for request in requests) == [
+        "danswer_chunk.document_id=='doc1'",
+        "danswer_chunk.document_id=='doc1'",
+        r"danswer_chunk.document_id=='doc\'2'",
+    ]
+    assert all(
+        request.url.params["fieldSet"]
+        == "danswer_chunk:content_hash,embeddings,title_embedding"
+        for request in requests
+    )
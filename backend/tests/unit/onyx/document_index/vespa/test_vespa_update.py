@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+
+import httpx
+import pytest
+import retry.api
+
+from onyx.document_index.vespa.index import _VespaUpdateRequest
+from onyx.document_index.vespa.index import VespaIndex
+
+
+@pytest.fixture(autouse=True)
+def _no_retry_delay(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(retry.api, "time", SimpleNamespace(sleep=lambda _: None))
+
+
+def _apply_update(
+    responses: list[httpx.Response | Exception], requests: list[httpx.Request]
+) -> None:
+    """Applies one update, Vespa answers with `responses` in order"""
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        response = responses[len(requests) - 1]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    with httpx.Client(transport=httpx.MockTransport(_handler)) as http_client:
+        VespaIndex._apply_updates_batched(
+            [
+                _VespaUpdateRequest(
+                    document_id="doc1",
+                    url="http://vespa/document/v1/doc1",
+                    update_request={"fields": {}},
+                )
+            ],
+            http_client,
+        )
+
+
+def test_update_retries_connection_errors_and_server_errors() -> None:
+    requests: list[httpx.Request] = []
+    responses: list[httpx.Response | Exception] = [
+        httpx.ConnectError("connection refused"),
+        httpx.Response(503),
+        httpx.Response(200),
+    ]
+    _apply_update(responses, requests)
+    assert len(requests) == 3
+
+    requests = []
+    with pytest.raises(httpx.HTTPStatusError):
+        _apply_update([httpx.Response(429)] * 3, requests)
+    assert len(requests) == 3
+
+
+def test_update_does_not_retry_client_errors() -> None:
+    requests: list[httpx.Request] = []
+    with pytest.raises(httpx.HTTPStatusError) as exc_info:
+        _apply_update([httpx.Response(400)], requests)
+    assert exc_info.value.response.status_code == 400
+    assert len(requests) == 1
@@ -1,10 +1,17 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 
 from onyx.configs.constants import DocumentSource
+from onyx.configs.constants import SECTION_SEPARATOR
 from onyx.connectors.models import Document
 from onyx.connectors.models import Section
+from onyx.indexing.chunker import _init_chunking_worker
 from onyx.indexing.chunker import Chunker
+from onyx.indexing.chunker import ParallelChunker
 from onyx.indexing.embedder import DefaultIndexingEmbedder
+from onyx.natural_language_processing.utils import BaseTokenizer
 from tests.unit.onyx.indexing.conftest import MockHeartbeat
 
 
@@ -81,3 +88,154 @@ def test_chunker_heartbeat(
 
     assert mock_heartbeat.call_count == 1
     assert len(chunks) > 0
+
+
+class _SeparatorUndercountingTokenizer(BaseTokenizer):
+    """Counts the section separator as free on its own but not within a text, so that the
+    running token count of a chunk is lower than its actual token count"""
+
+    def encode(self, string: str) -> list[int]:
+        return [0] * len(self.tokenize(string))
+
+    def tokenize(self, string: str) -> list[str]:
+        if string == SECTION_SEPARATOR:
+            return []
+        return re.findall(r"\S+|\s", string)
+
+    def decode(self, tokens: list[int]) -> str:
+        raise NotImplementedError
+
+
+def _build_many_section_document() -> Document:
+    return Document(
+        id="test_doc",
+        source=DocumentSource.SLACK,
+        semantic_identifier="Test Document",
+        metadata={},
+        doc_updated_at=None,
+        sections=[
+            Section(text=f"Message number {i} " + "word " * (i % 7), link=f"link{i}")
+            for i in range(500)
+        ],
+    )
+
+
+@pytest.mark.parametrize("use_undercounting_tokenizer", [False, True])
+def test_chunk_document_matches_exact_token_counts(
+    embedder: DefaultIndexingEmbedder, use_undercounting_tokenizer: bool
+) -> None:
+    tokenizer = (
+        _SeparatorUndercountingTokenizer()
+        if use_undercounting_tokenizer
+        else embedder.embedding_model.tokenizer
+    )
+    chunker = Chunker(tokenizer=tokenizer, enable_multipass=True)
+    document = _build_many_section_document()
+
+    chunks = chunker._chunk_document(
+        document,
+        title_prefix="",
+        metadata_suffix_semantic="",
+        metadata_suffix_keyword="",
+        content_token_limit=300,
+    )
+    exact_chunks = chunker._chunk_document_sections(
+        document,
+        title_prefix="",
+        metadata_suffix_semantic="",
+        metadata_suffix_keyword="",
+        content_token_limit=300,
+        exact_token_counts=True,
+    )
+
+    assert len(chunks) > 1
+    assert [chunk.model_dump() for chunk in chunks] == [
+        chunk.model_dump() for chunk in exact_chunks
+    ]
+
+
+def test_parallel_chunker_matches_chunker(
+    embedder: DefaultIndexingEmbedder, mock_heartbeat: MockHeartbeat
+) -> None:
+    documents = [
+        Document(
+            id=f"test_doc_{i}",
+            source=DocumentSource.WEB,
+            semantic_identifier=f"Test Document {i}",
+            metadata={},
+            doc_updated_at=None,
+            sections=[
+                Section(text="This is a section of a document. " * (i * 20), link="l")
+            ],
+        )
+        for i in range(1, 8)
+    ]
+    chunker = Chunker(tokenizer=embedder.embedding_model.tokenizer)
+    parallel_chunker = ParallelChunker(
+        num_processes=2,
+        tokenizer=embedder.embedding_model.tokenizer,
+        callback=mock_heartbeat,
+    )
+    # threads stand in for the worker processes, the sharding / ordering is the same
+    parallel_chunker._executor = ThreadPoolExecutor(  # type: ignore[assignment]
+        max_workers=1,
+        initializer=_init_chunking_worker,
+        initargs=(parallel_chunker._chunker_kwargs,),
+    )
+
+    try:
+        parallel_chunks = parallel_chunker.chunk(documents)
+    finally:
+        parallel_chunker.close()
+
+    assert [chunk.model_dump() for chunk in parallel_chunks] == [
+        chunk.model_dump() for chunk in chunker.chunk(documents)
+    ]
+    assert all(
+        chunk.source_document is documents[int(chunk.source_document.id[-1]) - 1]
+        for chunk in parallel_chunks
+    )
+    assert mock_heartbeat.call_count == len(documents)
+
+
+def test_parallel_chunker_in_worker_processes(
+    embedder: DefaultIndexingEmbedder, mock_heartbeat: MockHeartbeat
+) -> None:
+    documents = [
+        Document(
+            id=f"test_doc_{i}",
+            source=DocumentSource.WEB,
+            semantic_identifier=f"Test Document {i}",
+            metadata={"tags": ["tag1"]},
+            doc_updated_at=None,
+            sections=[
+                Section(text="This is a section of a document. " * (i * 20), link="l")
+            ],
+        )
+        for i in range(1, 5)
+    ]
+    chunker = Chunker(tokenizer=embedder.embedding_model.tokenizer)
+    # the chunker settings and documents are pickled to spawned worker processes
+    parallel_chunker = ParallelChunker(
+        num_processes=2,
+        tokenizer=embedder.embedding_model.tokenizer,
+        callback=mock_heartbeat,
+    )
+
+    try:
+        parallel_chunks = parallel_chunker.chunk(documents)
+        # the workers are reused for the next batch
+        assert len(parallel_chunker.chunk(documents[:2])) == len(
+            chunker.chunk(documents[:2])
+        )
+    finally:
+        parallel_chunker.close()
+
+    assert parallel_chunker._executor is None
+    assert [chunk.model_dump() for chunk in parallel_chunks] == [
+        chunk.model_dump() for chunk in chunker.chunk(documents)
+    ]
+    assert all(
+        chunk.source_document is documents[int(chunk.source_document.id[-1]) - 1]
+        for chunk in parallel_chunks
+    )
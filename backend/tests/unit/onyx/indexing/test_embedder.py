@@ -11,6 +11,7 @@ from onyx.indexing.embedder import DefaultIndexingEmbedder
 from onyx.indexing.models import ChunkEmbedding
 from onyx.indexing.models import DocAwareChunk
 from onyx.indexing.models import IndexChunk
+from onyx.indexing.models import StoredChunkEmbedding
 from shared_configs.enums import EmbeddingProvider
 from shared_configs.enums import EmbedTextType
 
@@ -89,3 +90,76 @@ def test_default_indexing_embedder_embed_chunks(mock_embedding_model: Mock) -> N
         ["Test Document"],
         text_type=EmbedTextType.PASSAGE,
     )
+
+
+def _make_chunk(chunk_id: int, content: str, source_doc: Document) -> DocAwareChunk:
+    return DocAwareChunk(
+        chunk_id=chunk_id,
+        blurb=content,
+        content=content,
+        source_links={0: "link1"},
+        section_continuation=False,
+        source_document=source_doc,
+        title_prefix="",
+        metadata_suffix_semantic="",
+        metadata_suffix_keyword="",
+        mini_chunk_texts=None,
+        large_chunk_reference_ids=[],
+        large_chunk_id=None,
+    )
+
+
+def test_default_indexing_embedder_reuses_stored_embeddings(
+    mock_embedding_model: Mock,
+) -> None:
+    embedder = DefaultIndexingEmbedder(
+        model_name="test-model",
+        normalize=True,
+        query_prefix=None,
+        passage_prefix=None,
+        provider_type=EmbeddingProvider.OPENAI,
+    )
+    source_doc = Document(
+        id="test_doc",
+        source=DocumentSource.WEB,
+        semantic_identifier="Test Document",
+        metadata={},
+        doc_updated_at=None,
+        sections=[Section(text="Unchanged chunk. Edited chunk.", link="link1")],
+    )
+    unchanged_chunk = _make_chunk(0, "Unchanged chunk", source_doc)
+    edited_chunk = _make_chunk(1, "Edited chunk", source_doc)
+
+    unchanged_hash = embedder.get_chunk_content_hash(unchanged_chunk)
+    assert unchanged_hash != embedder.get_chunk_content_hash(edited_chunk)
+
+    stored_embeddings = {
+        unchanged_hash: StoredChunkEmbedding(
+            content_hash=unchanged_hash,
+            embeddings=ChunkEmbedding(
+                full_embedding=[1.0, 1.0, 1.0], mini_chunk_embeddings=[]
+            ),
+            title_embedding=[7.0, 8.0, 9.0],
+        )
+    }
+    mock_embedding_model.return_value.encode.side_effect = [[[4.0, 5.0, 6.0]]]
+
+    result = embedder.embed_chunks(
+        [unchanged_chunk, edited_chunk], stored_embeddings=stored_embeddings
+    )
+
+    assert [chunk.embeddings.full_embedding for chunk in result] == [
+        [1.0, 1.0, 1.0],
+        [4.0, 5.0, 6.0],
+    ]
+    # the title embedding came along with the reused chunk, so it isn't embedded again
+    assert all(chunk.title_embedding == [7.0, 8.0, 9.0] for chunk in result)
+    assert [chunk.content_hash for chunk in result] == [
+        unchanged_hash,
+        embedder.get_chunk_content_hash(edited_chunk),
+    ]
+    mock_embedding_model.return_value.encode.assert_called_once_with(
+        texts=["Edited chunk"],
+        text_type=EmbedTextType.PASSAGE,
+        large_chunks_present=False,
+    )
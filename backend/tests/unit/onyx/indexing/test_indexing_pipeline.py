@@ -1,10 +1,19 @@
+import threading
+from typing import Any
 from typing import List
+from unittest.mock import MagicMock
+
+import pytest
 
 from onyx.configs.app_configs import MAX_DOCUMENT_CHARS
 from onyx.connectors.models import Document
 from onyx.connectors.models import DocumentSource
+from onyx.connectors.models import IndexAttemptMetadata
 from onyx.connectors.models import Section
+from onyx.indexing import indexing_pipeline
 from onyx.indexing.indexing_pipeline import filter_documents
+from onyx.indexing.indexing_pipeline import IndexingPipelineResult
+from onyx.indexing.indexing_pipeline import PipelinedIndexingRunner
 
 
 def create_test_document(
@@ -118,3 +127,124 @@ def test_filter_documents_multiple_documents() -> None:
 def test_filter_documents_empty_batch() -> None:
     result = filter_documents([])
     assert len(result) == 0
+
+
+class _FakeIndexing:
+    """Stands in for the DB / embedding / document index steps of the pipeline"""
+
+    def __init__(self, failing_doc_ids: set[str]) -> None:
+        self.failing_doc_ids = failing_doc_ids
+        self.written_batches: list[list[str]] = []
+        self.write_threads: set[threading.Thread] = set()
+
+    def prepare(self, documents: list[Document], **kwargs: Any) -> MagicMock:
+        ctx = MagicMock()
+        ctx.updatable_docs = documents
+        return ctx
+
+    def chunk_and_embed(self, ctx: MagicMock, **kwargs: Any) -> tuple[list, list]:
+        for document in ctx.updatable_docs:
+            if document.id in self.failing_doc_ids:
+                raise ValueError(f"Failed to embed {document.id}")
+        return [], []
+
+    def write(
+        self, filtered_documents: list[Document], **kwargs: Any
+    ) -> IndexingPipelineResult:
+        self.written_batches.append([document.id for document in filtered_documents])
+        self.write_threads.add(threading.current_thread())
+        return IndexingPipelineResult(
+            new_docs=len(filtered_documents),
+            total_docs=len(filtered_documents),
+            total_chunks=0,
+            failures=[],
+        )
+
+
+@pytest.fixture
+def fake_indexing(monkeypatch: pytest.MonkeyPatch) -> _FakeIndexing:
+    fake_indexing = _FakeIndexing(failing_doc_ids={"bad_doc"})
+    monkeypatch.setattr(indexing_pipeline, "ENABLE_EMBEDDING_REUSE", False)
+    monkeypatch.setattr(
+        indexing_pipeline, "index_doc_batch_prepare", fake_indexing.prepare
+    )
+    monkeypatch.setattr(
+        indexing_pipeline, "chunk_and_embed_doc_batch", fake_indexing.chunk_and_embed
+    )
+    monkeypatch.setattr(indexing_pipeline, "write_doc_batch", fake_indexing.write)
+    return fake_indexing
+
+
+def test_pipelined_runner_finishes_batches_in_order(
+    fake_indexing: _FakeIndexing,
+) -> None:
+    runner = PipelinedIndexingRunner(
+        chunker=MagicMock(),
+        embedder=MagicMock(),
+        document_index=MagicMock(),
+        db_session=MagicMock(),
+        tenant_id="public",
+    )
+    metadata = IndexAttemptMetadata(connector_id=1, credential_id=1)
+    batches = [
+        [create_test_document(doc_id=f"doc_{batch}_{i}") for i in range(2)]
+        for batch in range(3)
+    ]
+
+    try:
+        # a batch is only finished once the next one is submitted
+        assert runner.submit(batches[0], metadata) == []
+        finished = runner.submit(batches[1], metadata)
+        finished += runner.submit(batches[2], metadata)
+        finished += runner.flush()
+        assert runner.flush() == []
+    finally:
+        runner.close()
+
+    assert [batch for batch, _ in finished] == batches
+    assert all(result.total_docs == 2 for _, result in finished)
+    assert fake_indexing.written_batches == [
+        [document.id for document in batch] for batch in batches
+    ]
+    # writes use the DB session, so they stay on the calling thread
+    assert fake_indexing.write_threads == {threading.current_thread()}
+
+
+def test_pipelined_runner_reports_failed_batches(
+    fake_indexing: _FakeIndexing,
+) -> None:
+    runner = PipelinedIndexingRunner(
+        chunker=MagicMock(),
+        embedder=MagicMock(),
+        document_index=MagicMock(),
+        db_session=MagicMock(),
+        tenant_id="public",
+    )
+    metadata = IndexAttemptMetadata(connector_id=1, credential_id=1)
+    failing_batch = [create_test_document(doc_id="bad_doc")] + [
+        create_test_document(doc_id="doc_1")
+    ]
+    next_batch = [create_test_document(doc_id="doc_2")]
+
+    try:
+        runner.submit(failing_batch, metadata)
+        finished = runner.submit(next_batch, metadata) + runner.flush()
+    finally:
+        runner.close()
+
+    (_, failed_result), (_, next_result) = finished
+    # the whole batch fails, the error is reported for each of its documents
+    assert failed_result.total_docs == 2
+    assert [
+        failure.failed_document.document_id
+        for failure in failed_result.failures
+        if failure.failed_document
+    ] == ["bad_doc", "doc_1"]
+    assert all(
+        isinstance(failure.exception, ValueError)
+        and "Failed to embed bad_doc" in failure.failure_message
+        for failure in failed_result.failures
+    )
+    # the batches after it are still indexed
+    assert next_result.failures == []
+    assert fake_indexing.written_batches == [["doc_2"]]
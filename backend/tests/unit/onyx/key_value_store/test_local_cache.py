@@ -0,0 +1,55 @@
+import json
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from onyx.key_value_store.local_cache import KV_STORE_INVALIDATION_CHANNEL
+from onyx.key_value_store.local_cache import KVStoreLocalCache
+
+
+def _build_cache() -> KVStoreLocalCache:
+    cache = KVStoreLocalCache(max_size=2, ttl=60)
+    # don't start the pub/sub listener
+    cache._ensure_listener = lambda: None  # type: ignore[method-assign]
+    return cache
+
+
+def test_kv_store_local_cache_is_tenant_scoped_and_caches_missing_keys() -> None:
+    cache = _build_cache()
+
+    cache.set("tenant_a", "key", json.dumps({"a": 1}), cache.generation)
+    cache.set("tenant_a", "missing_key", None, cache.generation)
+
+    assert cache.get("tenant_a", "key") == (True, '{"a": 1}')
+    assert cache.get("tenant_a", "missing_key") == (True, None)
+    assert cache.get("tenant_b", "key") == (False, None)
+    assert cache.hits == 2
+    assert cache.misses == 1
+
+
+def test_kv_store_local_cache_skips_values_loaded_during_invalidation() -> None:
+    cache = _build_cache()
+
+    generation = cache.generation
+    # another process updates the key while this one loads the old value
+    cache._invalidate_local("tenant", "key")
+    cache.set("tenant", "key", '"stale"', generation)
+
+    assert cache.get("tenant", "key") == (False, None)
+
+
+def test_kv_store_local_cache_invalidate_publishes() -> None:
+    cache = _build_cache()
+    cache.set("tenant", "key", '"value"', cache.generation)
+
+    redis_client = MagicMock()
+    with patch(
+        "onyx.key_value_store.local_cache.get_redis_client",
+        return_value=redis_client,
+    ):
+        cache.invalidate("tenant", "key")
+
+    assert cache.get("tenant", "key") == (False, None)
+    redis_client.publish.assert_called_once_with(
+        KV_STORE_INVALIDATION_CHANNEL,
+        json.dumps({"tenant_id": "tenant", "key": "key"}),
+    )
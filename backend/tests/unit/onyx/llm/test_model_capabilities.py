@@ -0,0 +1,71 @@
+import litellm  # type: ignore
+import pytest
+
+from onyx.configs.model_configs import GEN_AI_MODEL_FALLBACK_MAX_TOKENS
+from onyx.llm import utils as llm_utils
+from onyx.llm.utils import get_llm_max_output_tokens
+from onyx.llm.utils import get_max_input_tokens
+from onyx.llm.utils import get_model_capabilities
+from onyx.llm.utils import model_supports_image_input
+from onyx.llm.utils import refresh_model_capabilities
+
+
+@pytest.fixture
+def model_cost(monkeypatch: pytest.MonkeyPatch) -> dict:
+    model_cost = {
+        "openai/gpt-4o": {
+            "max_input_tokens": 128000,
+            "max_output_tokens": 16384,
+            "supports_vision": True,
+        },
+        "llama3.2": {"max_tokens": 8000},
+    }
+    monkeypatch.setattr(litellm, "model_cost", model_cost)
+    monkeypatch.setattr(llm_utils, "GEN_AI_MAX_TOKENS", None)
+    return model_cost
+
+
+def test_model_name_variants_are_resolved(model_cost: dict) -> None:
+    assert get_max_input_tokens("gpt-4o", "openai", output_tokens=1000) == 127000
+    # extra provider prefix from a custom proxy
+    assert get_max_input_tokens("proxy/gpt-4o", "openai", output_tokens=0) == 128000
+    # ollama style tags, max_tokens is used when there is no max_input_tokens
+    assert get_max_input_tokens("llama3.2:3b", "ollama", output_tokens=0) == 8000
+
+    assert model_supports_image_input("gpt-4o", "openai")
+    assert not model_supports_image_input("llama3.2", "ollama")
+    assert not model_supports_image_input("unknown-model", "openai")
+    assert (
+        get_max_input_tokens("unknown-model", "openai", output_tokens=0)
+        == GEN_AI_MODEL_FALLBACK_MAX_TOKENS
+    )
+
+    assert get_llm_max_output_tokens("gpt-4o", "openai") == 16384
+    # 10% of max_tokens when there is no max_output_tokens
+    assert get_llm_max_output_tokens("llama3.2:3b", "ollama") == 800
+    assert (
+        get_llm_max_output_tokens("unknown-model", "openai")
+        == GEN_AI_MODEL_FALLBACK_MAX_TOKENS
+    )
+
+
+def test_capabilities_are_memoized_until_refreshed(
+    model_cost: dict, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    capabilities = get_model_capabilities("gpt-4o", "openai")
+    assert capabilities is not None
+    assert capabilities.max_input_tokens == 128000
+
+    model_cost["openai/gpt-4o"] = {"max_input_tokens": 200000}
+    assert get_model_capabilities("gpt-4o", "openai") is capabilities
+
+    refresh_model_capabilities()
+    capabilities = get_model_capabilities("gpt-4o", "openai")
+    assert capabilities is not None
+    assert capabilities.max_input_tokens == 200000
+
+    # replacing the litellm model map is picked up without a refresh
+    monkeypatch.setattr(litellm, "model_cost", {"gpt-4o": {"max_input_tokens": 1000}})
+    capabilities = get_model_capabilities("gpt-4o", "openai")
+    assert capabilities is not None
+    assert capabilities.max_input_tokens == 1000
@@ -0,0 +1,43 @@
+from unittest.mock import patch
+
+from onyx.natural_language_processing.query_embedding_cache import (
+    QueryEmbeddingCache,
+)
+
+
+def test_query_embedding_cache_evicts_least_recently_used() -> None:
+    cache = QueryEmbeddingCache(max_size=2, ttl=60, redis_enabled=False)
+
+    cache.set("settings", "first", [1.0])
+    cache.set("settings", "second", [2.0])
+    # touch "first" so that "second" is the least recently used
+    assert cache.get("settings", "first") == [1.0]
+    cache.set("settings", "third", [3.0])
+
+    assert cache.get("settings", "second") is None
+    assert cache.get("settings", "first") == [1.0]
+    assert cache.get("settings", "third") == [3.0]
+    assert cache.local_hits == 3
+    assert cache.misses == 1
+    assert cache.hit_rate == 0.75
+
+
+def test_query_embedding_cache_expires_entries() -> None:
+    cache = QueryEmbeddingCache(max_size=10, ttl=60, redis_enabled=False)
+
+    with patch(
+        "onyx.natural_language_processing.query_embedding_cache.time.monotonic",
+        side_effect=[0.0, 30.0, 61.0],
+    ):
+        cache.set("settings", "query", [1.0])
+        assert cache.get("settings", "query") == [1.0]
+        assert cache.get("settings", "query") is None
+
+
+def test_query_embedding_cache_drops_entries_when_search_settings_change() -> None:
+    cache = QueryEmbeddingCache(max_size=10, ttl=60, redis_enabled=False)
+
+    cache.set("old_settings", "query", [1.0])
+    assert cache.get("new_settings", "query") is None
+    # entries for the previous search settings are gone, not just shadowed
+    assert cache.get("old_settings", "query") is None
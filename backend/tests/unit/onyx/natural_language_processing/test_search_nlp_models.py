@@ -0,0 +1,55 @@
+from unittest.mock import Mock
+from unittest.mock import patch
+
+from onyx.natural_language_processing.search_nlp_models import EmbeddingModel
+from shared_configs.enums import EmbedTextType
+from shared_configs.model_server_models import EmbedRequest
+from shared_configs.model_server_models import EmbedResponse
+
+
+def test_length_bucketing_restores_original_order() -> None:
+    tokenizer = Mock()
+    tokenizer.encode.side_effect = lambda text: text.split()
+
+    with patch(
+        "onyx.natural_language_processing.search_nlp_models.get_tokenizer",
+        return_value=tokenizer,
+    ):
+        model = EmbeddingModel(
+            server_host="localhost",
+            server_port=9000,
+            model_name="test-model",
+            normalize=True,
+            query_prefix=None,
+            passage_prefix=None,
+            api_key=None,
+            api_url=None,
+            provider_type=None,
+        )
+
+    batches: list[list[str]] = []
+
+    def fake_request(embed_request: EmbedRequest) -> EmbedResponse:
+        batches.append(embed_request.texts)
+        return EmbedResponse(
+            embeddings=[[float(len(text.split()))] for text in embed_request.texts]
+        )
+
+    texts = ["a b c d", "a", "a b c d e f", "a b", "a b c"]
+    with (
+        patch(
+            "onyx.natural_language_processing.search_nlp_models.EMBEDDING_LENGTH_BUCKETING_ENABLED",
+            True,
+        ),
+        patch.object(model, "_make_model_server_request", side_effect=fake_request),
+    ):
+        embeddings = model._batch_encode_texts(
+            texts=texts,
+            text_type=EmbedTextType.PASSAGE,
+            batch_size=2,
+            max_seq_length=512,
+        )
+
+    # similar length texts are batched together
+    assert batches == [["a", "a b"], ["a b c", "a b c d"], ["a b c d e f"]]
+    assert embeddings == [[4.0], [1.0], [6.0], [2.0], [3.0]]
@@ -0,0 +1,48 @@
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from onyx.configs.constants import OnyxCeleryTask
+from onyx.redis.redis_document_set import RedisDocumentSet
+
+
+def _generate_tasks(doc_ids: list[str], batch_size: int) -> tuple[MagicMock, int]:
+    celery_app = MagicMock()
+    db_session = MagicMock()
+    db_session.scalars.return_value.yield_per.return_value = doc_ids
+
+    with patch("onyx.redis.redis_document_set.VESPA_SYNC_BATCH_SIZE", batch_size):
+        rds = RedisDocumentSet("public", 1)
+        result = rds.generate_tasks(
+            max_tasks=1024,
+            celery_app=celery_app,
+            db_session=db_session,
+            redis_client=MagicMock(),
+            lock=MagicMock(),
+            tenant_id="public",
+        )
+
+    assert result is not None
+    return celery_app, result[0]
+
+
+def test_generate_tasks_one_task_per_document_by_default() -> None:
+    celery_app, num_tasks = _generate_tasks(["a", "b", "c"], batch_size=1)
+
+    assert num_tasks == 3
+    for call in celery_app.send_task.call_args_list:
+        assert call.args[0] == OnyxCeleryTask.VESPA_METADATA_SYNC_TASK
+
+
+def test_generate_tasks_batches_documents() -> None:
+    celery_app, num_tasks = _generate_tasks(["a", "b", "c", "d", "e"], batch_size=2)
+
+    assert num_tasks == 3
+    calls = celery_app.send_task.call_args_list
+    assert [call.args[0] for call in calls] == [
+        OnyxCeleryTask.VESPA_METADATA_SYNC_BATCH_TASK,
+        OnyxCeleryTask.VESPA_METADATA_SYNC_BATCH_TASK,
+        OnyxCeleryTask.VESPA_METADATA_SYNC_TASK,
+    ]
+    assert calls[0].kwargs["kwargs"]["document_ids"] == ["a", "b"]
+    assert calls[1].kwargs["kwargs"]["document_ids"] == ["c", "d"]
+    assert calls[2].kwargs["kwargs"]["document_id"] == "e"
@@ -1,7 +1,10 @@
+import threading
 import time
+from collections.abc import Iterator
 
 import pytest
 
+from onyx.utils.threadpool_concurrency import prefetch_iterator
 from onyx.utils.threadpool_concurrency import run_with_timeout
 
 
@@ -59,3 +62,67 @@ def test_run_with_timeout_with_args_and_kwargs() -> None:
     # Test with positional and keyword args
     result2 = run_with_timeout(1.0, complex_function, x=5, y=3, multiply=True)
     assert result2 == 15
+
+
+def test_prefetch_iterator_preserves_order() -> None:
+    """Test that prefetched items come back in order"""
+    assert list(prefetch_iterator(iter(range(50)), max_prefetch=2)) == list(range(50))
+
+
+def test_prefetch_iterator_propagates_exceptions() -> None:
+    """Test that the items before an exception are yielded, then the exception is raised"""
+
+    def failing_generator() -> Iterator[int]:
+        yield 1
+        yield 2
+        raise ValueError("Test error")
+
+    results: list[int] = []
+    with pytest.raises(ValueError, match="Test error"):
+        for item in prefetch_iterator(failing_generator(), max_prefetch=1):
+            results.append(item)
+    assert results == [1, 2]
+
+
+def test_prefetch_iterator_stops_producer_early() -> None:
+    """Test that the producer stops once the consumer stops consuming"""
+    produced: list[int] = []
+
+    def generator() -> Iterator[int]:
+        for i in range(100):
+            produced.append(i)
+            yield i
+
+    prefetched = prefetch_iterator(generator(), max_prefetch=1)
+    assert next(prefetched) == 0
+    prefetched.close()
+
+    time.sleep(1)
+    assert len(produced) < 5
+
+
+def test_prefetch_iterator_closes_generator_on_producer_thread() -> None:
+    """Test that a generator stopped early is finalized on the thread that ran it"""
+    producer_threads: list[threading.Thread] = []
+    finalizing_threads: list[threading.Thread] = []
+    finalized = threading.Event()
+
+    def generator() -> Iterator[int]:
+        producer_threads.append(threading.current_thread())
+        try:
+            for i in range(100):
+                yield i
+        finally:
+            finalizing_threads.append(threading.current_thread())
+            finalized.set()
+
+    # the caller keeps a reference, so the generator isn't finalized by dropping it
+    gen = generator()
+    prefetched = prefetch_iterator(gen, max_prefetch=1)
+    assert next(prefetched) == 0
+    prefetched.close()
+
+    assert finalized.wait(timeout=5)
+    del gen
+    assert finalizing_threads == producer_threads
+    assert producer_threads[0] is not threading.current_thread()